@@ -1,417 +1,2025 @@
-# 🎯 Project: Library Management System with OOP
-
-import json
-from datetime import datetime, timedelta
-
-# ------------ Book class (from your sample, slightly adjusted) ------------
-
-class Book:
-    """Represents a book in the library"""
-
-    def __init__(self, title, author, isbn, year=None):
-        self.title = title
-        self.author = author
-        self.isbn = isbn
-        self.year = year
-        self.available = True
-        self.borrowed_by = None
-        self.due_date = None
-        self.date_added = datetime.now().strftime('%Y-%m-%d')
-
-    def check_out(self, member_id, loan_period=14):
-        """Check out the book to a member"""
-        if not self.available:
-            return False, "Book is already checked out"
-
-        self.available = False
-        self.borrowed_by = member_id
-        self.due_date = (datetime.now() + timedelta(days=loan_period)).strftime('%Y-%m-%d')
-        return True, f"Book checked out successfully. Due date: {self.due_date}"
-
-    def return_book(self):
-        """Return the book to the library"""
-        if self.available:
-            return False, "Book is already available"
-
-        was_overdue = self.is_overdue()
-        self.available = True
-        self.borrowed_by = None
-        self.due_date = None
-
-        if was_overdue:
-            return True, "Book returned (was overdue)"
-        return True, "Book returned successfully"
-
-    def is_overdue(self):
-        """Check if the book is overdue"""
-        if self.due_date and not self.available:
-            due_date = datetime.strptime(self.due_date, '%Y-%m-%d')
-            return datetime.now() > due_date
-        return False
-
-    def days_overdue(self):
-        """Calculate days overdue"""
-        if self.is_overdue():
-            due_date = datetime.strptime(self.due_date, '%Y-%m-%d')
-            return (datetime.now() - due_date).days
-        return 0
-
-    def to_dict(self):
-        """Convert book to dictionary for serialization"""
-        return {
-            'title': self.title,
-            'author': self.author,
-            'isbn': self.isbn,
-            'year': self.year,
-            'available': self.available,
-            'borrowed_by': self.borrowed_by,
-            'due_date': self.due_date,
-            'date_added': self.date_added
-        }
-
-    @classmethod
-    def from_dict(cls, data):
-        """Create Book instance from dictionary"""
-        book = cls(
-            title=data['title'],
-            author=data['author'],
-            isbn=data['isbn'],
-            year=data.get('year')
-        )
-        book.available = data['available']
-        book.borrowed_by = data.get('borrowed_by')
-        book.due_date = data.get('due_date')
-        book.date_added = data.get('date_added', datetime.now().strftime('%Y-%m-%d'))
-        return book
-
-    def __str__(self):
-        status = "Available" if self.available else f"Borrowed by {self.borrowed_by} (Due: {self.due_date})"
-        return f"{self.title} by {self.author} ({self.isbn}) - {status}"
-
-
-# ------------ Member class ------------
-
-class Member:
-    """Represents a library member"""
-
-    MAX_BORROW = 5
-
-    def __init__(self, name, member_id):
-        self.name = name
-        self.member_id = member_id
-        self.borrowed_books = []  # list of ISBNs
-
-    def can_borrow(self):
-        return len(self.borrowed_books) < self.MAX_BORROW
-
-    def borrow_book(self, isbn):
-        if not self.can_borrow():
-            return False, f"Borrow limit reached ({self.MAX_BORROW} books)."
-        if isbn in self.borrowed_books:
-            return False, "This book is already borrowed by this member."
-        self.borrowed_books.append(isbn)
-        return True, "Book added to member's borrowed list."
-
-    def return_book(self, isbn):
-        if isbn in self.borrowed_books:
-            self.borrowed_books.remove(isbn)
-            return True, "Book removed from member's borrowed list."
-        return False, "This member did not borrow that book."
-
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'member_id': self.member_id,
-            'borrowed_books': self.borrowed_books
-        }
-
-    @classmethod
-    def from_dict(cls, data):
-        m = cls(data['name'], data['member_id'])
-        m.borrowed_books = data.get('borrowed_books', [])
-        return m
-
-    def __str__(self):
-        return f"{self.member_id} - {self.name} (Borrowed: {len(self.borrowed_books)} books)"
-
-
-# ------------ Library class ------------
-
-class Library:
-    """Main library manager"""
-
-    BOOKS_FILE = "books.json"
-    MEMBERS_FILE = "members.json"
-
-    def __init__(self):
-        self.books = {}   # isbn -> Book
-        self.members = {} # member_id -> Member
-        self.load_data()
-
-    # ----- Persistence -----
-
-    def load_data(self):
-        # Load books
-        try:
-            with open(self.BOOKS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                for b in data:
-                    book = Book.from_dict(b)
-                    self.books[book.isbn] = book
-        except FileNotFoundError:
-            self.books = {}
-        except json.JSONDecodeError:
-            self.books = {}
-
-        # Load members
-        try:
-            with open(self.MEMBERS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                for m in data:
-                    member = Member.from_dict(m)
-                    self.members[member.member_id] = member
-        except FileNotFoundError:
-            self.members = {}
-        except json.JSONDecodeError:
-            self.members = {}
-
-    def save_data(self):
-        # Save books
-        books_list = [b.to_dict() for b in self.books.values()]
-        with open(self.BOOKS_FILE, "w", encoding="utf-8") as f:
-            json.dump(books_list, f, indent=2)
-
-        # Save members
-        members_list = [m.to_dict() for m in self.members.values()]
-        with open(self.MEMBERS_FILE, "w", encoding="utf-8") as f:
-            json.dump(members_list, f, indent=2)
-
-    # ----- Book & member management -----
-
-    def add_book(self):
-        title = input("Enter title: ").strip()
-        author = input("Enter author: ").strip()
-        isbn = input("Enter ISBN: ").strip()
-        year_input = input("Enter year (optional): ").strip()
-        year = int(year_input) if year_input else None
-
-        if isbn in self.books:
-            print("Book with this ISBN already exists.")
-            return
-
-        book = Book(title, author, isbn, year)
-        self.books[isbn] = book
-        print("Book added successfully.")
-
-    def register_member(self):
-        name = input("Enter member name: ").strip()
-        member_id = input("Enter member ID: ").strip()
-
-        if member_id in self.members:
-            print("Member ID already exists.")
-            return
-
-        member = Member(name, member_id)
-        self.members[member_id] = member
-        print("Member registered successfully.")
-
-    def find_book(self, keyword, mode="title"):
-        """Search by title, author or isbn"""
-        results = []
-        keyword_lower = keyword.lower()
-        for book in self.books.values():
-            if mode == "title" and keyword_lower in book.title.lower():
-                results.append(book)
-            elif mode == "author" and keyword_lower in book.author.lower():
-                results.append(book)
-            elif mode == "isbn" and keyword_lower in book.isbn.lower():
-                results.append(book)
-        return results
-
-    def borrow_book(self):
-        member_id = input("Enter member ID: ").strip()
-        isbn = input("Enter book ISBN: ").strip()
-
-        if member_id not in self.members:
-            print("Member not found.")
-            return
-        if isbn not in self.books:
-            print("Book not found.")
-            return
-
-        member = self.members[member_id]
-        book = self.books[isbn]
-
-        if not book.available:
-            print("Book is already checked out.")
-            return
-
-        if not member.can_borrow():
-            print(f"Member has reached the maximum borrow limit ({Member.MAX_BORROW}).")
-            return
-
-        ok_member, msg_member = member.borrow_book(isbn)
-        if not ok_member:
-            print(msg_member)
-            return
-
-        ok_book, msg_book = book.check_out(member_id)
-        print(msg_book)
-
-    def return_book(self):
-        member_id = input("Enter member ID: ").strip()
-        isbn = input("Enter book ISBN: ").strip()
-
-        if member_id not in self.members:
-            print("Member not found.")
-            return
-        if isbn not in self.books:
-            print("Book not found.")
-            return
-
-        member = self.members[member_id]
-        book = self.books[isbn]
-
-        ok_member, msg_member = member.return_book(isbn)
-        if not ok_member:
-            print(msg_member)
-            return
-
-        ok_book, msg_book = book.return_book()
-        print(msg_book)
-        if book.days_overdue() > 0:
-            print(f"Book was overdue by {book.days_overdue()} days.")
-
-    def view_all_books(self):
-        if not self.books:
-            print("No books in library.")
-            return
-        for book in self.books.values():
-            print(book)
-
-    def view_all_members(self):
-        if not self.members:
-            print("No members registered.")
-            return
-        for member in self.members.values():
-            print(member)
-
-    def view_overdue_books(self):
-        found = False
-        for book in self.books.values():
-            if book.is_overdue():
-                found = True
-                print(f"{book} - Overdue by {book.days_overdue()} days")
-        if not found:
-            print("No overdue books.")
-
-    def stats(self):
-        total = len(self.books)
-        available = sum(1 for b in self.books.values() if b.available)
-        borrowed = total - available
-        print(f"Total books: {total}")
-        print(f"Available books: {available}")
-        print(f"Borrowed books: {borrowed}")
-
-    # ----- Menu -----
-
-    def menu(self):
-        print("================================")
-        print("      LIBRARY MANAGEMENT SYSTEM ")
-        print("================================")
-        print(f"Loaded {len(self.books)} books from file")
-        print(f"Loaded {len(self.members)} members from file\n")
-
-        while True:
-            print("1. Add New Book")
-            print("2. Register New Member")
-            print("3. Borrow Book")
-            print("4. Return Book")
-            print("5. Search Books")
-            print("6. View All Books")
-            print("7. View All Members")
-            print("8. View Overdue Books")
-            print("9. View Statistics")
-            print("10. Save & Exit")
-            print("0. Exit Without Saving")
-
-            choice = input("Enter your choice: ").strip()
-
-            if choice == "1":
-                self.add_book()
-            elif choice == "2":
-                self.register_member()
-            elif choice == "3":
-                self.borrow_book()
-            elif choice == "4":
-                self.return_book()
-            elif choice == "5":
-                self.search_menu()
-            elif choice == "6":
-                self.view_all_books()
-            elif choice == "7":
-                self.view_all_members()
-            elif choice == "8":
-                self.view_overdue_books()
-            elif choice == "9":
-                self.stats()
-            elif choice == "10":
-                self.save_data()
-                print("Data saved. Goodbye!")
-                break
-            elif choice == "0":
-                print("Goodbye (no save)!")
-                break
-            else:
-                print("Invalid choice, please try again.")
-
-    def search_menu(self):
-        print("\nSearch books by:")
-        print("1. Title")
-        print("2. Author")
-        print("3. ISBN")
-        print("4. Show all available books")
-
-        option = input("Enter search option: ").strip()
-
-        if option == "1":
-            keyword = input("Enter title to search: ")
-            results = self.find_book(keyword, mode="title")
-        elif option == "2":
-            keyword = input("Enter author to search: ")
-            results = self.find_book(keyword, mode="author")
-        elif option == "3":
-            keyword = input("Enter ISBN to search: ")
-            results = self.find_book(keyword, mode="isbn")
-        elif option == "4":
-            results = [b for b in self.books.values() if b.available]
-            keyword = "all available books"
-        else:
-            print("Invalid option.")
-            return
-
-        if option != "4":
-            print(f"\nSearch Results for '{keyword}':")
-        else:
-            print("\nAvailable books:")
-
-        print("----------------------------------------")
-        if not results:
-            print("No books found.")
-        else:
-            for i, b in enumerate(results, start=1):
-                status = "Available" if b.available else f"Borrowed by {b.borrowed_by} (Due: {b.due_date})"
-                print(f"{i}. {b.title}")
-                print(f"   Author: {b.author}")
-                print(f"   ISBN: {b.isbn}")
-                if b.year:
-                    print(f"   Year: {b.year}")
-                print(f"   Status: {status}\n")
-            print(f"Found {len(results)} books.\n")
-
-
-# ------------ Run system ------------
-
-if __name__ == "__main__":
-    lib = Library()
-    lib.menu()
+# 🎯 Project: Library Management System with OOP
+
+import csv
+import gc
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from collections import Counter
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+# ------------ Book class (from your sample, slightly adjusted) ------------
+
+_ORDINALS = {}
+
+
+def _ordinal(day):
+    """Date ordinal for a date or 'YYYY-MM-DD' string; one shared int object per day"""
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    ordinal = day.toordinal()
+    return _ORDINALS.setdefault(ordinal, ordinal)
+
+
+class Book:
+    """Represents a book in the library"""
+
+    # Slots and integer date ordinals keep large catalogs small in memory;
+    # due_date/date_added are still read and written as 'YYYY-MM-DD' strings.
+    # __weakref__ lets SQLite storage cache books without keeping them alive
+    __slots__ = ("title", "author", "isbn", "year", "available", "borrowed_by",
+                 "due_ordinal", "added_ordinal", "library", "__weakref__")
+
+    def __init__(self, title, author, isbn, year=None):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.year = year
+        self.available = True
+        self.borrowed_by = None
+        self.due_ordinal = None
+        self.added_ordinal = _ordinal(date.today())
+        self.library = None  # owning Library, told about check-outs and returns
+
+    @property
+    def due_date(self):
+        return None if self.due_ordinal is None else date.fromordinal(self.due_ordinal).isoformat()
+
+    @due_date.setter
+    def due_date(self, value):
+        self.due_ordinal = _ordinal(value) if value else None
+
+    @property
+    def date_added(self):
+        return date.fromordinal(self.added_ordinal).isoformat()
+
+    @date_added.setter
+    def date_added(self, value):
+        self.added_ordinal = _ordinal(value)
+
+    def check_out(self, member_id, loan_period=14):
+        """Check out the book to a member"""
+        if not self.available:
+            return False, "Book is already checked out"
+
+        self.available = False
+        self.borrowed_by = member_id
+        self.due_ordinal = _ordinal(date.today() + timedelta(days=loan_period))
+        if self.library is not None:
+            self.library._book_checked_out(self)
+        return True, f"Book checked out successfully. Due date: {self.due_date}"
+
+    def return_book(self):
+        """Return the book to the library"""
+        if self.available:
+            return False, "Book is already available"
+
+        was_overdue = self.is_overdue()
+        if self.library is not None:
+            self.library._book_returned(self)  # while borrowed_by/due date are still set
+        self.available = True
+        self.borrowed_by = None
+        self.due_ordinal = None
+
+        if was_overdue:
+            return True, "Book returned (was overdue)"
+        return True, "Book returned successfully"
+
+    def is_overdue(self):
+        """Check if the book is overdue"""
+        if self.due_ordinal is not None and not self.available:
+            return datetime.now() > datetime.fromordinal(self.due_ordinal)
+        return False
+
+    def days_overdue(self, as_of=None):
+        """Calculate days overdue (as of now, or of the given datetime)"""
+        if self.due_ordinal is not None and not self.available:
+            late = (as_of or datetime.now()) - datetime.fromordinal(self.due_ordinal)
+            if late > timedelta(0):
+                return late.days
+        return 0
+
+    def to_dict(self):
+        """Convert book to dictionary for serialization"""
+        return {
+            'title': self.title,
+            'author': self.author,
+            'isbn': self.isbn,
+            'year': self.year,
+            'available': self.available,
+            'borrowed_by': self.borrowed_by,
+            'due_date': self.due_date,
+            'date_added': self.date_added
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create Book instance from dictionary"""
+        book = cls(
+            title=data['title'],
+            author=data['author'],
+            isbn=data['isbn'],
+            year=data.get('year')
+        )
+        book.available = data['available']
+        book.borrowed_by = data.get('borrowed_by')
+        book.due_date = data.get('due_date')
+        if data.get('date_added'):
+            book.date_added = data['date_added']
+        return book
+
+    def __str__(self):
+        status = "Available" if self.available else f"Borrowed by {self.borrowed_by} (Due: {self.due_date})"
+        return f"{self.title} by {self.author} ({self.isbn}) - {status}"
+
+
+# ------------ Member class ------------
+
+class Member:
+    """Represents a library member"""
+
+    __slots__ = ("name", "member_id", "borrowed_books", "__weakref__")
+
+    MAX_BORROW = 5
+    MAX_HOLDS = 10
+
+    def __init__(self, name, member_id):
+        self.name = name
+        self.member_id = member_id
+        self.borrowed_books = set()  # ISBNs
+
+    def can_borrow(self):
+        return len(self.borrowed_books) < self.MAX_BORROW
+
+    def borrow_book(self, isbn):
+        if not self.can_borrow():
+            return False, f"Borrow limit reached ({self.MAX_BORROW} books)."
+        if isbn in self.borrowed_books:
+            return False, "This book is already borrowed by this member."
+        self.borrowed_books.add(isbn)
+        return True, "Book added to member's borrowed list."
+
+    def return_book(self, isbn):
+        if isbn in self.borrowed_books:
+            self.borrowed_books.discard(isbn)
+            return True, "Book removed from member's borrowed list."
+        return False, "This member did not borrow that book."
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'member_id': self.member_id,
+            'borrowed_books': sorted(self.borrowed_books)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        m = cls(data['name'], data['member_id'])
+        m.borrowed_books = set(data.get('borrowed_books', []))
+        return m
+
+    def __str__(self):
+        return f"{self.member_id} - {self.name} (Borrowed: {len(self.borrowed_books)} books)"
+
+
+# ------------ Streaming helpers ------------
+
+BOOK_FIELDS = ("title", "author", "isbn", "year", "available", "borrowed_by", "due_date", "date_added")
+
+
+def write_json_list(f, items, indent=None):
+    """Write dicts as a JSON array one at a time (same text as json.dump of the list).
+
+    Returns the number of items written.
+    """
+    count = 0
+    f.write("[")
+    for item in items:
+        if indent:
+            text = json.dumps(item, indent=indent).replace("\n", "\n" + " " * indent)
+            f.write(("\n" if count == 0 else ",\n") + " " * indent + text)
+        else:
+            f.write(("" if count == 0 else ",") + json.dumps(item, separators=(",", ":")))
+        count += 1
+    if indent and count:
+        f.write("\n")
+    f.write("]")
+    return count
+
+
+def isbn_is_valid(isbn):
+    """Check the ISBN-10 or ISBN-13 check digit (isbn without hyphens or spaces)"""
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        digits = [int(c) for c in isbn[:9]] + [10 if isbn[9] == "X" else int(isbn[9])]
+        return sum((10 - i) * d for i, d in enumerate(digits)) % 11 == 0
+    if len(isbn) == 13 and isbn.isdigit():
+        return sum((3 if i % 2 else 1) * int(c) for i, c in enumerate(isbn)) % 10 == 0
+    return False
+
+
+# ------------ Search index ------------
+
+class SearchIndex:
+    """Trigram inverted index over book titles, authors and ISBNs"""
+
+    FIELDS = ("title", "author", "isbn")
+    GRAM = 3
+    START, END = "\x02", "\x03"  # field boundaries, so prefixes and short values get grams
+
+    def __init__(self):
+        self.postings = {field: {} for field in self.FIELDS}  # field -> gram -> set of ISBNs
+        self.values = {}  # isbn -> {field: lowercased value}
+
+    @classmethod
+    def _split(cls, text):
+        return {text[i:i + cls.GRAM] for i in range(len(text) - cls.GRAM + 1)}
+
+    def _grams(self, text):
+        return self._split(self.START + text + self.END)
+
+    def add(self, book):
+        """Index a book (re-indexes it if the ISBN is already present)"""
+        if book.isbn in self.values:
+            self.remove(book.isbn)
+        values = {field: str(getattr(book, field) or "").lower() for field in self.FIELDS}
+        self.values[book.isbn] = values
+        for field, text in values.items():
+            postings = self.postings[field]
+            for gram in self._grams(text):
+                postings.setdefault(gram, set()).add(book.isbn)
+
+    def remove(self, isbn):
+        """Drop a book from the index"""
+        values = self.values.pop(isbn, None)
+        if values is None:
+            return
+        for field, text in values.items():
+            postings = self.postings[field]
+            for gram in self._grams(text):
+                isbns = postings.get(gram)
+                if isbns is not None:
+                    isbns.discard(isbn)
+                    if not isbns:
+                        del postings[gram]
+
+    def rebuild(self, books):
+        """Rebuild the whole index from an iterable of books"""
+        self.postings = {field: {} for field in self.FIELDS}
+        self.values = {}
+        for book in books:
+            self.add(book)
+
+    def _candidates(self, field, term, prefix=False):
+        """ISBNs that may match term in field (a superset, verified by the caller)"""
+        if not term:
+            return set(self.values)
+        postings = self.postings[field]
+        if prefix:
+            term = self.START + term
+        grams = self._split(term)
+        if not grams:
+            # Term shorter than a gram: union every gram that contains it
+            result = set()
+            for gram, isbns in postings.items():
+                if gram.startswith(term) if prefix else term in gram:
+                    result |= isbns
+            return result
+
+        sets = []
+        for gram in grams:
+            isbns = postings.get(gram)
+            if not isbns:
+                return set()
+            sets.append(isbns)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for isbns in sets[1:]:
+            result &= isbns
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _score(text, term):
+        """Rank a single match: exact > prefix > word start > anywhere"""
+        if text == term:
+            return 3
+        if text.startswith(term):
+            return 2
+        if (" " + term) in text:
+            return 1
+        return 0
+
+    @staticmethod
+    def _rank(scores, key, offset=0, limit=None):
+        """ISBNs of scores ranked offset .. offset + limit by key (to the end if limit is None).
+
+        A page only needs the best offset + limit matches: O(n log k) instead of a full sort.
+        """
+        if limit is None:
+            return sorted(scores, key=key)[offset:]
+        return heapq.nsmallest(offset + limit, scores, key=key)[offset:]
+
+    def search(self, query, mode="title", match="substring"):
+        """Return ranked ISBNs for a query.
+
+        mode:  "title", "author", "isbn" or "any" (all three fields)
+        match: "substring" - the whole query appears in the field
+               "prefix"    - the field starts with the query
+               "terms"     - every whitespace-separated term appears (AND)
+        """
+        return self.search_page(query, mode, match)[0]
+
+    def search_page(self, query, mode="title", match="substring", offset=0, limit=None):
+        """Ranked ISBNs offset .. offset + limit for a query, plus the total number of matches"""
+        fields = self.FIELDS if mode == "any" else (mode,)
+        if fields[0] not in self.FIELDS:
+            raise ValueError(f"Unknown search mode: {mode}")
+        query = query.lower()
+        terms = (query.split() if match == "terms" else None) or [query]
+        prefix = match == "prefix"
+
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for field in fields:
+                for isbn in self._candidates(field, term, prefix):
+                    text = self.values[isbn][field]
+                    if text.startswith(term) if prefix else term in text:
+                        score = self._score(text, term)
+                        if score > term_scores.get(isbn, -1):
+                            term_scores[isbn] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {isbn: scores[isbn] + score
+                          for isbn, score in term_scores.items() if isbn in scores}
+            if not scores:
+                return [], 0
+
+        ranked = self._rank(scores, lambda isbn: (-scores[isbn], self.values[isbn]["title"], isbn),
+                            offset, limit)
+        return ranked, len(scores)
+
+
+# ------------ Due date index ------------
+
+class DueDateIndex:
+    """Min-heap of (due date ordinal, ISBN) over borrowed books, for overdue lookups"""
+
+    def __init__(self):
+        self.heap = []
+        self.due = {}  # isbn -> due ordinal of its current loan; heap entries not matching are stale
+
+    def add(self, isbn, ordinal):
+        self.due[isbn] = ordinal
+        heapq.heappush(self.heap, (ordinal, isbn))
+        if len(self.heap) > 2 * len(self.due) + 64:
+            self.rebuild_heap()
+
+    def discard(self, isbn):
+        # The heap entry is skipped lazily and dropped at the next rebuild
+        self.due.pop(isbn, None)
+
+    def rebuild(self, books):
+        """Rebuild from an iterable of books"""
+        self.due = {book.isbn: book.due_ordinal
+                    for book in books if not book.available and book.due_ordinal is not None}
+        self.rebuild_heap()
+
+    def rebuild_heap(self):
+        self.heap = [(ordinal, isbn) for isbn, ordinal in self.due.items()]
+        heapq.heapify(self.heap)
+
+    def due_before(self, cutoff):
+        """ISBNs due before the cutoff ordinal, earliest first"""
+        return list(self.iter_due_before(cutoff))
+
+    def iter_due_before(self, cutoff):
+        """Yield the ISBNs due before the cutoff ordinal, earliest first (ties by ISBN).
+
+        Walks the heap in order with a frontier heap of the children reached so far: the
+        first k matches cost O(k log k) however many more there are, so a page can stop early.
+        Don't change the index while iterating.
+        """
+        heap = self.heap
+        seen = set()
+        frontier = [(heap[0], 0)] if heap and heap[0][0] < cutoff else []
+        while frontier:
+            (ordinal, isbn), i = heapq.heappop(frontier)
+            if self.due.get(isbn) == ordinal and isbn not in seen:
+                seen.add(isbn)
+                yield isbn
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap) and heap[child][0] < cutoff:
+                    heapq.heappush(frontier, (heap[child], child))
+
+
+# ------------ Statistics counters ------------
+
+def _decrement(counter, key, n=1):
+    counter[key] -= n
+    if counter[key] <= 0:
+        del counter[key]
+
+
+class LibraryCounters:
+    """Running totals kept up to date as books are added, removed, lent and returned,
+    so statistics never have to scan the catalog"""
+
+    def __init__(self):
+        self.total = 0
+        self.available = 0
+        self.members = 0
+        self.holds = 0
+        self.member_loans = Counter()     # member_id -> books on loan
+        self.author_holdings = Counter()  # author -> books in the catalog
+        self.due_counts = Counter()       # due ordinal -> books due back that day
+        # Loans due before this ordinal are counted in overdue; advance() moves it with the clock
+        self.overdue_cutoff = _ordinal(date.today()) + 1
+        self.overdue = 0
+
+    def add(self, author, available=True, borrowed_by=None, due_ordinal=None, n=1):
+        """Count n books (n > 1 for grouped rows when rebuilding)"""
+        self.total += n
+        self.available += n
+        self.author_holdings[author] += n
+        if not available:
+            self.lend(borrowed_by, due_ordinal, n)
+
+    def remove(self, author, n=1):
+        """Uncount available books leaving the catalog"""
+        self.total -= n
+        self.available -= n
+        _decrement(self.author_holdings, author, n)
+
+    def lend(self, member_id, due_ordinal, n=1):
+        self.available -= n
+        if member_id is not None:
+            self.member_loans[member_id] += n
+        if due_ordinal is not None:
+            self.due_counts[due_ordinal] += n
+            if due_ordinal < self.overdue_cutoff:
+                self.overdue += n
+
+    def give_back(self, member_id, due_ordinal, n=1):
+        self.available += n
+        if member_id is not None:
+            _decrement(self.member_loans, member_id, n)
+        if due_ordinal is not None:
+            _decrement(self.due_counts, due_ordinal, n)
+            if due_ordinal < self.overdue_cutoff:
+                self.overdue -= n
+
+    def advance(self, cutoff):
+        """Move the overdue cutoff forward to the given ordinal (one step per day passed)"""
+        if cutoff <= self.overdue_cutoff:
+            return
+        days = range(self.overdue_cutoff, cutoff)
+        if len(days) > len(self.due_counts):
+            days = [day for day in self.due_counts if self.overdue_cutoff <= day < cutoff]
+        self.overdue += sum(self.due_counts.get(day, 0) for day in days)
+        self.overdue_cutoff = cutoff
+
+    def overdue_before(self, cutoff):
+        """Loans due before any cutoff ordinal (one pass over the distinct due dates)"""
+        return sum(n for day, n in self.due_counts.items() if day < cutoff)
+
+    @classmethod
+    def from_books(cls, books, members, holds=0, cutoff=None):
+        """Count from scratch: books is an iterable of
+        (author, available, borrowed_by, due_ordinal, n) groups"""
+        counters = cls()
+        if cutoff is not None:
+            counters.overdue_cutoff = cutoff
+        counters.members = members
+        counters.holds = holds
+        for author, available, borrowed_by, due_ordinal, n in books:
+            counters.add(author, available, borrowed_by, due_ordinal, n)
+        return counters
+
+
+# ------------ Hold queues ------------
+
+class HoldQueues:
+    """Per-ISBN reservation queues: highest priority first, first come first served within a priority.
+
+    Each queue is a heap of (-priority, seq, member_id), so placing, cancelling and serving a
+    hold are O(log n). Cancelled holds stay in the heap until they reach the top (or the heap
+    is rebuilt), like the due-date index.
+    """
+
+    def __init__(self):
+        self.queues = {}     # isbn -> heap of (-priority, seq, member_id)
+        self.entries = {}    # (isbn, member_id) -> (priority, seq) of live holds
+        self.by_member = {}  # member_id -> set of ISBNs on hold
+        self.sizes = {}      # isbn -> number of live holds
+        self.last_seq = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def add(self, isbn, member_id, priority=0, seq=None):
+        """Queue a hold; returns its sequence number"""
+        if seq is None:
+            seq = self.last_seq + 1
+        self.last_seq = max(self.last_seq, seq)
+        if self.entries.get((isbn, member_id)) == (priority, seq):
+            return seq  # already queued (a replayed journal record the snapshot covers)
+        if (isbn, member_id) not in self.entries:
+            self.sizes[isbn] = self.sizes.get(isbn, 0) + 1
+            self.by_member.setdefault(member_id, set()).add(isbn)
+        self.entries[(isbn, member_id)] = (priority, seq)
+        heap = self.queues.setdefault(isbn, [])
+        heapq.heappush(heap, (-priority, seq, member_id))
+        return seq
+
+    def cancel(self, isbn, member_id):
+        """Drop a hold; returns False if there was none"""
+        if self.entries.pop((isbn, member_id), None) is None:
+            return False
+        isbns = self.by_member[member_id]
+        isbns.discard(isbn)
+        if not isbns:
+            del self.by_member[member_id]
+        self.sizes[isbn] -= 1
+        if not self.sizes[isbn]:
+            del self.sizes[isbn]
+            self.queues.pop(isbn, None)
+        elif len(self.queues[isbn]) > 2 * self.sizes[isbn] + 16:
+            self._rebuild(isbn)
+        return True
+
+    def clear(self, isbn):
+        """Drop every hold on a book; returns how many there were"""
+        members = {m for (_, _, m) in self.queues.get(isbn, ()) if (isbn, m) in self.entries}
+        for member_id in members:
+            self.cancel(isbn, member_id)
+        return len(members)
+
+    def _live(self, isbn, entry):
+        return self.entries.get((isbn, entry[2])) == (-entry[0], entry[1])
+
+    def _rebuild(self, isbn):
+        heap = [entry for entry in self.queues[isbn] if self._live(isbn, entry)]
+        heapq.heapify(heap)
+        self.queues[isbn] = heap
+
+    def first(self, isbn, accept=None):
+        """The first member in the queue for whom accept(member_id) is true (all if None).
+
+        Skipped holds keep their place: O((k + 1) log n) for k skipped or cancelled entries.
+        """
+        heap = self.queues.get(isbn)
+        if not heap:
+            return None
+        skipped = []
+        found = None
+        while heap:
+            entry = heap[0]
+            if not self._live(isbn, entry):
+                heapq.heappop(heap)  # cancelled: drop it for good
+                continue
+            if accept is None or accept(entry[2]):
+                found = entry[2]
+                break
+            skipped.append(heapq.heappop(heap))
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return found
+
+    def count(self, isbn):
+        """Live holds on a book"""
+        return self.sizes.get(isbn, 0)
+
+    def queue(self, isbn):
+        """Member IDs waiting for a book, in serving order"""
+        return [entry[2] for entry in sorted(self.queues.get(isbn, ())) if self._live(isbn, entry)]
+
+    def position(self, isbn, member_id):
+        """1-based place of a member in a book's queue, or None"""
+        key = self.entries.get((isbn, member_id))
+        if key is None:
+            return None
+        mine = (-key[0], key[1])
+        return 1 + sum(1 for entry in self.queues[isbn]
+                       if entry[:2] < mine and self._live(isbn, entry))
+
+    def holds_of(self, member_id):
+        return sorted(self.by_member.get(member_id, ()))
+
+    def records(self):
+        """Every live hold as a dict, for snapshots"""
+        for (isbn, member_id), (priority, seq) in self.entries.items():
+            yield {'isbn': isbn, 'member_id': member_id, 'priority': priority, 'seq': seq}
+
+
+# ------------ Journal ------------
+
+class Journal:
+    """Append-only log of library changes, one compact JSON record per line"""
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.records = 0  # records appended since the last snapshot
+        self._file = None
+        self._lock = threading.Lock()       # serializes writes to the file
+        self._sync_lock = threading.Lock()  # one fsync at a time, shared by waiting writers
+        self._written = 0  # append_many calls flushed to the OS
+        self._synced = 0   # ... and how many of those an fsync has covered
+
+    def replay(self):
+        """Yield every complete record; a torn final line (crash mid-write) is cut off"""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        good_offset = 0
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                good_offset += len(line)
+                self.records += 1
+                yield record
+        if good_offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_offset)
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Append records with a single flush (and fsync)"""
+        lines = [json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in records]
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            self.records += len(lines)
+            self._written += 1
+            ticket = self._written
+            fd = self._file.fileno()
+        if self.fsync:
+            # Group commit: one fsync covers every write flushed before it started, so
+            # threads that queued up behind it return without syncing again
+            with self._sync_lock:
+                if self._synced < ticket:
+                    target = self._written
+                    os.fsync(fd)
+                    self._synced = target
+
+    def reset(self):
+        """Empty the journal once its records are covered by a snapshot"""
+        with self._sync_lock, self._lock:
+            self._close()
+            with open(self.path, "wb") as f:
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.records = 0
+            self._synced = self._written
+
+    def close(self):
+        with self._sync_lock, self._lock:
+            self._close()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ------------ SQLite storage ------------
+
+def _fold(text):
+    return text.lower() if isinstance(text, str) else text
+
+
+class SQLiteStorage:
+    """Keeps books and members in a SQLite database, indexed for the library's queries"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS books (
+            isbn        TEXT PRIMARY KEY,
+            title       TEXT NOT NULL,
+            author      TEXT NOT NULL,
+            year        INTEGER,
+            available   INTEGER NOT NULL DEFAULT 1,
+            borrowed_by TEXT,
+            due_date    TEXT,
+            date_added  TEXT
+        );
+        CREATE INDEX IF NOT EXISTS books_author ON books (author);
+        CREATE INDEX IF NOT EXISTS books_borrowed_by ON books (borrowed_by);
+        CREATE INDEX IF NOT EXISTS books_due_date ON books (due_date);
+        CREATE TABLE IF NOT EXISTS members (
+            member_id   TEXT PRIMARY KEY,
+            name        TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS holds (
+            isbn        TEXT NOT NULL,
+            member_id   TEXT NOT NULL,
+            priority    INTEGER NOT NULL DEFAULT 0,
+            seq         INTEGER NOT NULL,
+            PRIMARY KEY (isbn, member_id)
+        );
+        CREATE INDEX IF NOT EXISTS holds_queue ON holds (isbn, priority DESC, seq);
+        CREATE INDEX IF NOT EXISTS holds_member ON holds (member_id);
+    """
+    # Trigram full-text index so substring searches don't scan the table, one row per book (same
+    # rowid). It holds lowercased text (fold, registered on the connection): SQLite's LIKE only
+    # ignores case for ASCII
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(isbn, title, author, tokenize='trigram');
+        CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts (rowid, isbn, title, author)
+            VALUES (new.rowid, fold(new.isbn), fold(new.title), fold(new.author));
+        END;
+        CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+            DELETE FROM books_fts WHERE rowid = old.rowid;
+        END;
+    """
+    # Databases before version 1 indexed the original-case text
+    FTS_DROP = """
+        DROP TRIGGER IF EXISTS books_fts_insert;
+        DROP TRIGGER IF EXISTS books_fts_delete;
+        DROP TABLE IF EXISTS books_fts;
+    """
+    FTS_VERSION = 1
+    BOOK_COLUMNS = BOOK_FIELDS
+
+    def __init__(self, path):
+        self.path = path
+        # autocommit (batches use BEGIN); one connection shared by all threads, serialized by lock
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.create_function("fold", 1, _fold, deterministic=True)
+        self.conn.executescript(self.SCHEMA)
+        try:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < self.FTS_VERSION:
+                self.conn.executescript(self.FTS_DROP + self.FTS_SCHEMA +
+                                        "INSERT INTO books_fts (rowid, isbn, title, author) "
+                                        "SELECT rowid, fold(isbn), fold(title), fold(author) FROM books;"
+                                        f"PRAGMA user_version = {self.FTS_VERSION};")
+            else:
+                self.conn.executescript(self.FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 trigram support: fall back to LIKE on the books table
+            self.fts = False
+
+    # ----- Rows <-> objects -----
+
+    def _book_from_row(self, row):
+        data = dict(zip(self.BOOK_COLUMNS, row))
+        data["available"] = bool(data["available"])
+        return Book.from_dict(data)
+
+    def _book_params(self, data):
+        return (data["isbn"], data["title"], data["author"], data.get("year"),
+                int(data.get("available", True)), data.get("borrowed_by"),
+                data.get("due_date"), data.get("date_added"))
+
+    def _fetch(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _iterate(self, sql, params=(), page=1000):
+        """Yield rows a page at a time, holding the lock only while fetching"""
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(page)
+            if not rows:
+                return
+            yield from rows
+
+    def get_book(self, isbn):
+        rows = self._fetch(f"SELECT {', '.join(self.BOOK_COLUMNS)} FROM books WHERE isbn = ?", (isbn,))
+        return self._book_from_row(rows[0]) if rows else None
+
+    def get_member(self, member_id):
+        rows = self._fetch("SELECT name FROM members WHERE member_id = ?", (member_id,))
+        if not rows:
+            return None
+        member = Member(rows[0][0], member_id)
+        member.borrowed_books = {isbn for (isbn,) in self._fetch(
+            "SELECT isbn FROM books WHERE borrowed_by = ?", (member_id,))}
+        return member
+
+    def iter_books(self, where="", params=()):
+        for row in self._iterate(f"SELECT {', '.join(self.BOOK_COLUMNS)} FROM books {where}", params):
+            yield self._book_from_row(row)
+
+    def iter_members(self):
+        for (member_id,) in self._iterate("SELECT member_id FROM members"):
+            member = self.get_member(member_id)
+            if member is not None:
+                yield member
+
+    def exists(self, table, key):
+        column = "isbn" if table == "books" else "member_id"
+        return bool(self._fetch(f"SELECT 1 FROM {table} WHERE {column} = ?", (key,)))
+
+    def count(self, table):
+        return self._fetch(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+    # ----- Writes -----
+
+    def write(self, record):
+        """Apply one change record (same shape as the journal's) to the database"""
+        with self.lock:
+            self._write(record)
+
+    def _write(self, record):
+        op = record["op"]
+        if op == "add_book":
+            self.conn.execute("INSERT INTO books (isbn, title, author, year, available, borrowed_by, "
+                              "due_date, date_added) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              self._book_params(record["book"]))
+        elif op == "remove_book":
+            self.conn.execute("DELETE FROM books WHERE isbn = ?", (record["isbn"],))
+        elif op == "add_member":
+            self.conn.execute("INSERT INTO members (member_id, name) VALUES (?, ?)",
+                              (record["member"]["member_id"], record["member"]["name"]))
+        elif op == "borrow":
+            self.conn.execute("UPDATE books SET available = 0, borrowed_by = ?, due_date = ? WHERE isbn = ?",
+                              (record["member_id"], record["due_date"], record["isbn"]))
+        elif op == "return":
+            self.conn.execute("UPDATE books SET available = 1, borrowed_by = NULL, due_date = NULL "
+                              "WHERE isbn = ?", (record["isbn"],))
+        elif op == "hold":
+            self.conn.execute("INSERT INTO holds (isbn, member_id, priority, seq) VALUES (?, ?, ?, ?)",
+                              (record["isbn"], record["member_id"], record["priority"], record["seq"]))
+        elif op == "cancel_hold":
+            self.conn.execute("DELETE FROM holds WHERE isbn = ? AND member_id = ?",
+                              (record["isbn"], record["member_id"]))
+        elif op == "clear_holds":
+            self.conn.execute("DELETE FROM holds WHERE isbn = ?", (record["isbn"],))
+
+    def write_many(self, records):
+        """Apply a batch of change records in one transaction"""
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for record in records:
+                    self._write(record)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def existing_isbns(self, isbns):
+        """The subset of isbns already in the books table"""
+        isbns = list(isbns)
+        found = set()
+        for i in range(0, len(isbns), 500):  # stay under SQLite's bound-parameter limit
+            chunk = isbns[i:i + 500]
+            found.update(isbn for (isbn,) in self._fetch(
+                f"SELECT isbn FROM books WHERE isbn IN ({', '.join('?' * len(chunk))})", chunk))
+        return found
+
+    def import_records(self, books, members, holds=()):
+        """Bulk-load book, member and hold dicts in a single transaction (existing keys are replaced)"""
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for data in books:
+                    self.conn.execute("DELETE FROM books WHERE isbn = ?", (data["isbn"],))
+                    self.conn.execute("INSERT INTO books (isbn, title, author, year, available, borrowed_by, "
+                                      "due_date, date_added) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                      self._book_params(data))
+                self.conn.executemany("INSERT OR REPLACE INTO members (member_id, name) VALUES (?, ?)",
+                                      ((m["member_id"], m["name"]) for m in members))
+                self.conn.executemany("INSERT OR REPLACE INTO holds (isbn, member_id, priority, seq) "
+                                      "VALUES (?, ?, ?, ?)",
+                                      ((h["isbn"], h["member_id"], h.get("priority", 0), h["seq"]) for h in holds))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    # ----- Indexed queries -----
+
+    def search(self, query, mode="title", match="substring"):
+        """Same contract as SearchIndex.search, answered from the (trigram) index"""
+        return self.search_page(query, mode, match)[0]
+
+    def search_page(self, query, mode="title", match="substring", offset=0, limit=None):
+        """Same contract as SearchIndex.search_page"""
+        fields = SearchIndex.FIELDS if mode == "any" else (mode,)
+        if fields[0] not in SearchIndex.FIELDS:
+            raise ValueError(f"Unknown search mode: {mode}")
+        query = query.lower()
+        terms = (query.split() if match == "terms" else None) or [query]
+        prefix = match == "prefix"
+
+        # LIKE narrows the candidates ('%' and '_' in a term only widen it); Python verifies
+        clauses, params = [], []
+        column = "f.{}" if self.fts else "fold(b.{})"  # books_fts already holds lowercased text
+        for term in terms:
+            clauses.append("(" + " OR ".join(f"{column.format(field)} LIKE ?" for field in fields) + ")")
+            params.extend([term + "%" if prefix else f"%{term}%"] * len(fields))
+        source = "books_fts f JOIN books b ON b.rowid = f.rowid" if self.fts else "books b"
+        rows = self._fetch(f"SELECT b.isbn, b.title, b.author FROM {source} WHERE {' AND '.join(clauses)}", params)
+
+        scores, titles = {}, {}
+        for isbn, title, author in rows:
+            values = {"isbn": isbn.lower(), "title": title.lower(), "author": author.lower()}
+            total = 0
+            for term in terms:
+                best = -1
+                for field in fields:
+                    text = values[field]
+                    if text.startswith(term) if prefix else term in text:
+                        best = max(best, SearchIndex._score(text, term))
+                if best < 0:
+                    break
+                total += best
+            else:
+                scores[isbn], titles[isbn] = total, values["title"]
+        ranked = SearchIndex._rank(scores, lambda isbn: (-scores[isbn], titles[isbn], isbn), offset, limit)
+        return ranked, len(scores)
+
+    def overdue_books(self, cutoff, offset=0, limit=-1):
+        """Borrowed books due before the cutoff date (YYYY-MM-DD), earliest first
+        (limit -1: all of them)"""
+        return self.iter_books("WHERE available = 0 AND due_date < ? ORDER BY due_date, isbn "
+                               "LIMIT ? OFFSET ?", (cutoff, limit, offset))
+
+    def counts(self):
+        """Return (total, available) book counts"""
+        total, available = self._fetch("SELECT COUNT(*), SUM(available) FROM books")[0]
+        return total, available or 0
+
+    # ----- Holds -----
+
+    def hold(self, isbn, member_id):
+        """(priority, seq) of a member's hold on a book, or None"""
+        rows = self._fetch("SELECT priority, seq FROM holds WHERE isbn = ? AND member_id = ?", (isbn, member_id))
+        return rows[0] if rows else None
+
+    def first_hold(self, isbn, accept=None):
+        """Same contract as HoldQueues.first, walking the holds_queue index"""
+        for (member_id,) in self._iterate("SELECT member_id FROM holds WHERE isbn = ? "
+                                          "ORDER BY priority DESC, seq", (isbn,), page=16):
+            if accept is None or accept(member_id):
+                return member_id
+        return None
+
+    def hold_count(self, isbn):
+        return self._fetch("SELECT COUNT(*) FROM holds WHERE isbn = ?", (isbn,))[0][0]
+
+    def hold_queue(self, isbn):
+        return [m for (m,) in self._fetch("SELECT member_id FROM holds WHERE isbn = ? "
+                                          "ORDER BY priority DESC, seq", (isbn,))]
+
+    def hold_position(self, isbn, member_id):
+        key = self.hold(isbn, member_id)
+        if key is None:
+            return None
+        priority, seq = key
+        return 1 + self._fetch("SELECT COUNT(*) FROM holds WHERE isbn = ? AND "
+                               "(priority > ? OR (priority = ? AND seq < ?))",
+                               (isbn, priority, priority, seq))[0][0]
+
+    def holds_of(self, member_id):
+        return [isbn for (isbn,) in self._fetch("SELECT isbn FROM holds WHERE member_id = ? ORDER BY isbn",
+                                                (member_id,))]
+
+    def last_hold_seq(self):
+        return self._fetch("SELECT COALESCE(MAX(seq), 0) FROM holds")[0][0]
+
+    def counter_groups(self):
+        """(author, available, borrowed_by, due_ordinal, n) groups for LibraryCounters.from_books"""
+        rows = self._fetch("SELECT author, available, borrowed_by, due_date, COUNT(*) FROM books "
+                           "GROUP BY author, available, borrowed_by, due_date")
+        return [(author, bool(available), borrowed_by, _ordinal(due) if due else None, n)
+                for author, available, borrowed_by, due, n in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class LazyRecords:
+    """Dict-like view of a SQLite table that only builds objects when they are accessed
+
+    Objects are cached weakly: while any caller holds one (e.g. in the middle of a checkout),
+    everyone gets that same object, so in-place changes aren't split. Every change is written
+    to the database as it happens, so once nobody holds an object it is dropped and later
+    rebuilt from its row, and memory stays proportional to what is in use.
+    """
+
+    def __init__(self, store, table, load, iterate, attach=None):
+        self.store = store
+        self.table = table
+        self._load = load        # key -> object or None
+        self._iterate = iterate  # () -> iterator of objects
+        self._attach = attach    # called on every object before it is handed out
+        self._cache = weakref.WeakValueDictionary()  # key -> object handed out and still in use
+
+    def __contains__(self, key):
+        return key in self._cache or self.store.exists(self.table, key)
+
+    def __getitem__(self, key):
+        obj = self._cache.get(key)
+        if obj is None:
+            obj = self._load(key)
+            if obj is None:
+                raise KeyError(key)
+            obj = self.cached(obj)
+        return obj
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, obj):
+        # The row itself is written by Library._log
+        self._cache[key] = obj
+
+    def __delitem__(self, key):
+        self._cache.pop(key, None)
+
+    def pop(self, key, default=None):
+        obj = self.get(key, default)
+        self._cache.pop(key, None)
+        return obj
+
+    def __len__(self):
+        return self.store.count(self.table)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def _key(self, obj):
+        return obj.isbn if self.table == "books" else obj.member_id
+
+    def cached(self, obj):
+        """The object already handed out for obj's key, if any, else obj (freshly built from its row),
+        which is then handed out from now on"""
+        held = self._cache.get(self._key(obj))
+        if held is not None:
+            return held
+        if self._attach is not None:
+            self._attach(obj)
+        # If another thread handed one out meanwhile, keep theirs so changes aren't split
+        return self._cache.setdefault(self._key(obj), obj)
+
+    def values(self):
+        for obj in self._iterate():
+            yield self.cached(obj)
+
+    def keys(self):
+        for obj in self.values():
+            yield self._key(obj)
+
+    __iter__ = keys
+
+    def items(self):
+        for obj in self.values():
+            yield self._key(obj), obj
+
+
+# ------------ Library class ------------
+
+class Library:
+    """Main library manager"""
+
+    BOOKS_FILE = "books.json"
+    MEMBERS_FILE = "members.json"
+    HOLDS_FILE = "holds.json"
+    JOURNAL_FILE = "library.journal"
+    COMPACT_EVERY = 10000  # minimum journal records between automatic snapshots
+
+    DB_FILE = "library.db"
+
+    def __init__(self, books_file=None, members_file=None, journal=False, journal_fsync=False,
+                 storage="json", db_file=None, holds_file=None):
+        if storage not in ("json", "sqlite"):
+            raise ValueError(f"Unknown storage: {storage}")
+        if storage == "sqlite" and journal:
+            raise ValueError("The journal is only used with JSON storage")
+        self.books_file = books_file or self.BOOKS_FILE
+        self.members_file = members_file or self.MEMBERS_FILE
+        self.holds_file = holds_file or self.HOLDS_FILE
+        self.books = {}   # isbn -> Book
+        self.members = {} # member_id -> Member
+        # With SQLite storage, queries run in the database and objects are loaded on access
+        self.store = SQLiteStorage(db_file or self.DB_FILE) if storage == "sqlite" else None
+        self.search_index = None if self.store else SearchIndex()
+        self.due_index = None if self.store else DueDateIndex()
+        self.holds = None if self.store else HoldQueues()  # SQLite keeps them in a holds table
+        self.hold_seq = 0  # sequence number of the latest hold, for first-come-first-served order
+        self.counters = LibraryCounters()  # recounted by load_data
+        # In journal mode every change is appended to the journal as it happens and
+        # books/members files are only rewritten as periodic snapshots
+        self.journal = Journal(journal if isinstance(journal, str) else self.JOURNAL_FILE,
+                               fsync=journal_fsync) if journal else None
+        self.auto_compact = True  # LibraryService turns this off and compacts at checkpoints
+        # Guards the books dict and the in-memory indexes when several threads use the library
+        # (see library_service.py for the per-book and per-member locking)
+        self.lock = threading.RLock()
+        self.load_data()
+
+    # ----- Persistence -----
+
+    def load_data(self):
+        if self.store:
+            self.books = LazyRecords(self.store, "books", self.store.get_book, self.store.iter_books,
+                                     attach=self._attach)
+            self.members = LazyRecords(self.store, "members", self.store.get_member, self.store.iter_members)
+            self.hold_seq = self.store.last_hold_seq()
+            self.counters = self._recount()
+            return
+
+        # Load books
+        try:
+            with open(self.books_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                for b in data:
+                    book = Book.from_dict(b)
+                    self.books[book.isbn] = book
+        except FileNotFoundError:
+            self.books = {}
+        except json.JSONDecodeError:
+            self.books = {}
+
+        # Load members
+        try:
+            with open(self.members_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                for m in data:
+                    member = Member.from_dict(m)
+                    self.members[member.member_id] = member
+        except FileNotFoundError:
+            self.members = {}
+        except json.JSONDecodeError:
+            self.members = {}
+
+        # Load holds
+        try:
+            with open(self.holds_file, "r", encoding="utf-8") as f:
+                for h in json.load(f):
+                    self.holds.add(h['isbn'], h['member_id'], h.get('priority', 0), h['seq'])
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        # Re-apply changes made since the last snapshot
+        if self.journal:
+            for record in self.journal.replay():
+                self._apply(record)
+
+        for book in self.books.values():
+            book.library = self
+        self.search_index.rebuild(self.books.values())
+        self.due_index.rebuild(self.books.values())
+        self.hold_seq = self.holds.last_seq
+        self.counters = self._recount()
+
+    def save_data(self):
+        if self.store:
+            return  # every change is already committed
+        if self.journal:
+            self.compact()
+            return
+
+        # Save books
+        with open(self.books_file, "w", encoding="utf-8") as f:
+            write_json_list(f, (b.to_dict() for b in self.books.values()), indent=2)
+
+        # Save members
+        with open(self.members_file, "w", encoding="utf-8") as f:
+            write_json_list(f, (m.to_dict() for m in self.members.values()), indent=2)
+
+        # Save holds
+        with open(self.holds_file, "w", encoding="utf-8") as f:
+            write_json_list(f, self.holds.records(), indent=2)
+
+    def compact(self):
+        """Write a compact snapshot of books/members/holds and empty the journal"""
+        with self.lock:
+            for path, records in ((self.books_file, (b.to_dict() for b in self.books.values())),
+                                  (self.members_file, (m.to_dict() for m in self.members.values())),
+                                  (self.holds_file, self.holds.records())):
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    write_json_list(f, records)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            # Replaying records already in the snapshot is harmless (each record sets the final
+            # state of what it touches), so a crash before this point loses nothing
+            if self.journal:
+                self.journal.reset()
+
+    def compaction_due(self):
+        """Snapshots cost O(catalog), so let the journal grow to the catalog's size first"""
+        return bool(self.journal) and self.journal.records >= max(self.COMPACT_EVERY, len(self.books))
+
+    def _log(self, record):
+        """Persist a change as it happens (SQLite storage or journal mode)"""
+        self._log_many([record])
+
+    def _log_many(self, records):
+        """Persist a batch of changes together (one transaction or one journal flush)"""
+        if self.store:
+            self.store.write_many(records)
+        elif self.journal:
+            self.journal.append_many(records)
+            if self.auto_compact and self.compaction_due():
+                self.compact()
+
+    def _apply(self, record):
+        """Apply one journal record to the in-memory state"""
+        op = record["op"]
+        if op == "add_book":
+            book = Book.from_dict(record["book"])
+            self.books[book.isbn] = book
+        elif op == "remove_book":
+            self.books.pop(record["isbn"], None)
+        elif op == "add_member":
+            member = Member.from_dict(record["member"])
+            self.members[member.member_id] = member
+        elif op in ("borrow", "return"):
+            # The book may be gone if a later record removed it after a snapshot
+            book = self.books.get(record["isbn"])
+            member = self.members.get(record["member_id"])
+            if book is None or member is None:
+                return
+            if op == "borrow":
+                book.available = False
+                book.borrowed_by = record["member_id"]
+                book.due_date = record["due_date"]
+                member.borrowed_books.add(record["isbn"])
+            else:
+                book.available = True
+                book.borrowed_by = None
+                book.due_date = None
+                member.borrowed_books.discard(record["isbn"])
+        elif op == "hold":
+            self.holds.add(record["isbn"], record["member_id"], record["priority"], record["seq"])
+        elif op == "cancel_hold":
+            self.holds.cancel(record["isbn"], record["member_id"])
+        elif op == "clear_holds":
+            self.holds.clear(record["isbn"])
+
+    # ----- Book & member management -----
+
+    def add_book(self):
+        title = input("Enter title: ").strip()
+        author = input("Enter author: ").strip()
+        isbn = input("Enter ISBN: ").strip()
+        year_input = input("Enter year (optional): ").strip()
+        year = int(year_input) if year_input else None
+
+        ok, msg = self.insert_book(Book(title, author, isbn, year))
+        print(msg)
+
+    def insert_book(self, book):
+        """Add a Book object to the catalog and the search index"""
+        if book.isbn in self.books:
+            return False, "Book with this ISBN already exists."
+        self._catalog(book)
+        self._log({"op": "add_book", "book": book.to_dict()})
+        return True, "Book added successfully."
+
+    def _catalog(self, book):
+        """Register a new book in memory, in the in-memory indexes and in the counters"""
+        with self.lock:
+            self.books[book.isbn] = book
+            book.library = self
+            if self.search_index is not None:
+                self.search_index.add(book)
+            if self.due_index is not None and not book.available and book.due_ordinal is not None:
+                self.due_index.add(book.isbn, book.due_ordinal)
+            self.counters.add(book.author, book.available, book.borrowed_by, book.due_ordinal)
+
+    def _attach(self, book):
+        """Make a book loaded from storage report check-outs and returns to this library"""
+        if book is not None:
+            book.library = self
+        return book
+
+    # ----- Bulk import & export -----
+
+    IMPORT_BATCH = 10000
+
+    def import_books(self, rows, batch_size=None, strict_isbn=False, on_error=None, on_batch=None):
+        """Add books from an iterable of dicts (title, author, isbn, optional year/date_added).
+
+        Rows are validated and de-duplicated by ISBN (within the input and against the
+        catalog), and committed batch by batch, so the input can be streamed from a file of
+        any size. on_error(row_number, row, reason) and on_batch(counts) report progress.
+        Returns counts of rows read, added, duplicate and invalid.
+        """
+        # The cyclic GC would rescan the ever-growing catalog during the load; nothing
+        # created here is cyclic garbage, so pause it (restoring the previous state)
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._import_batches(iter(rows), batch_size or self.IMPORT_BATCH,
+                                        strict_isbn, on_error, on_batch)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _import_batches(self, rows, batch_size, strict_isbn, on_error, on_batch):
+        counts = {"read": 0, "added": 0, "duplicate": 0, "invalid": 0}
+        seen = set()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            candidates = []
+            for row in batch:
+                counts["read"] += 1
+                try:
+                    book = self._book_from_row(row, strict_isbn)
+                except ValueError as e:
+                    counts["invalid"] += 1
+                    if on_error:
+                        on_error(counts["read"], row, str(e))
+                    continue
+                if book.isbn in seen:
+                    counts["duplicate"] += 1
+                    continue
+                seen.add(book.isbn)
+                candidates.append(book)
+
+            if self.store:
+                existing = self.store.existing_isbns(b.isbn for b in candidates)
+            else:
+                existing = {b.isbn for b in candidates if b.isbn in self.books}
+            new_books = [b for b in candidates if b.isbn not in existing]
+            counts["duplicate"] += len(candidates) - len(new_books)
+
+            for book in new_books:
+                if self.store is None:  # SQLite rows are built lazily, don't cache them
+                    self._catalog(book)
+                else:
+                    with self.lock:
+                        self.counters.add(book.author, book.available, book.borrowed_by, book.due_ordinal)
+            self._log_many([{"op": "add_book", "book": book.to_dict()} for book in new_books])
+            counts["added"] += len(new_books)
+            if on_batch:
+                on_batch(dict(counts))
+        return counts
+
+    @staticmethod
+    def _book_from_row(row, strict_isbn=False):
+        """Validate an import row and build a Book (raises ValueError)"""
+        if not isinstance(row, dict):
+            raise ValueError("not a record")
+        title = str(row.get("title") or "").strip()
+        author = str(row.get("author") or "").strip()
+        isbn = str(row.get("isbn") or "").strip()
+        if not title or not author or not isbn:
+            raise ValueError("title, author and isbn are required")
+        if strict_isbn:
+            isbn = isbn.replace("-", "").replace(" ", "").upper()
+            if not isbn_is_valid(isbn):
+                raise ValueError(f"invalid ISBN: {isbn}")
+        year = row.get("year")
+        if year in (None, ""):
+            year = None
+        else:
+            try:
+                year = int(year)
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid year: {year}") from None
+        book = Book(title, author, isbn, year)
+        added = row.get("date_added")
+        if added:
+            try:
+                if not isinstance(added, str):
+                    raise ValueError
+                book.date_added = added
+            except ValueError:
+                raise ValueError(f"invalid date_added: {added!r}") from None
+        return book
+
+    EXPORT_FORMATS = ("jsonl", "csv", "json")
+
+    def export_books(self, f, fmt="jsonl"):
+        """Stream every book to an open text file as JSON Lines, CSV or a JSON array"""
+        if fmt not in self.EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        rows = (book.to_dict() for book in self.books.values())
+        count = 0
+        if fmt == "jsonl":
+            for row in rows:
+                f.write(json.dumps(row, separators=(",", ":")) + "\n")
+                count += 1
+        elif fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=BOOK_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            count = write_json_list(f, rows, indent=2)
+        return count
+
+    def remove_book(self, isbn):
+        """Remove a book from the catalog and the search index"""
+        book = self.books.get(isbn)
+        if book is None:
+            return False, "Book not found."
+        if not book.available:
+            return False, "Book is checked out and cannot be removed."
+        with self.lock:
+            del self.books[isbn]
+            book.library = None
+            if self.search_index is not None:
+                self.search_index.remove(isbn)
+            self.counters.remove(book.author)
+            # Holds left behind when every holder was at their borrow limit
+            dropped = self.holds.clear(isbn) if self.holds is not None else len(self.store.hold_queue(isbn))
+            self.counters.holds -= dropped
+        records = [{"op": "remove_book", "isbn": isbn}]
+        if dropped:
+            records.append({"op": "clear_holds", "isbn": isbn})
+        self._log_many(records)
+        return True, "Book removed successfully."
+
+    def register_member(self):
+        name = input("Enter member name: ").strip()
+        member_id = input("Enter member ID: ").strip()
+
+        ok, msg = self.insert_member(Member(name, member_id))
+        print(msg)
+
+    def insert_member(self, member):
+        """Add a Member object to the library"""
+        if member.member_id in self.members:
+            return False, "Member ID already exists."
+        with self.lock:
+            self.members[member.member_id] = member
+            self.counters.members += 1
+        self._log({"op": "add_member", "member": member.to_dict()})
+        return True, "Member registered successfully."
+
+    def find_book(self, keyword, mode="title", match="substring"):
+        """Search by title, author, isbn or any field (see SearchIndex.search), best matches first"""
+        if self.store:
+            isbns = self.store.search(keyword, mode, match)
+        else:
+            with self.lock:
+                isbns = self.search_index.search(keyword, mode, match)
+        books = (self.books.get(isbn) for isbn in isbns)
+        return [book for book in books if book is not None]  # skip any removed meanwhile
+
+    def search_page(self, keyword, mode="title", match="substring", offset=0, limit=50):
+        """One page of find_book's results, plus the total number of matches.
+
+        Only the page's books are ranked out of the matches and fetched.
+        """
+        if self.store:
+            isbns, total = self.store.search_page(keyword, mode, match, offset, limit)
+        else:
+            with self.lock:
+                isbns, total = self.search_index.search_page(keyword, mode, match, offset, limit)
+        books = (self.books.get(isbn) for isbn in isbns)
+        return [book for book in books if book is not None], total
+
+    def borrow_book(self):
+        member_id = input("Enter member ID: ").strip()
+        isbn = input("Enter book ISBN: ").strip()
+
+        ok, msg = self.checkout(member_id, isbn)
+        print(msg)
+        if not ok and msg == "Book is already checked out.":
+            if input("Place a hold on it? (y/n): ").strip().lower() == "y":
+                ok, msg = self.place_hold(member_id, isbn)
+                print(msg)
+
+    def checkout(self, member_id, isbn):
+        """Lend a book to a member; returns (success, message)"""
+        if member_id not in self.members:
+            return False, "Member not found."
+        if isbn not in self.books:
+            return False, "Book not found."
+
+        member = self.members[member_id]
+        book = self.books[isbn]
+
+        if not book.available:
+            return False, "Book is already checked out."
+
+        if not member.can_borrow():
+            return False, f"Member has reached the maximum borrow limit ({Member.MAX_BORROW})."
+
+        self.cancel_hold(member_id, isbn)  # if they were waiting for it, the hold is fulfilled
+
+        ok_member, msg_member = member.borrow_book(isbn)
+        if not ok_member:
+            return False, msg_member
+
+        ok_book, msg_book = book.check_out(member_id)
+        self._log({"op": "borrow", "isbn": isbn, "member_id": member_id, "due_date": book.due_date})
+        return ok_book, msg_book
+
+    def return_book(self):
+        member_id = input("Enter member ID: ").strip()
+        isbn = input("Enter book ISBN: ").strip()
+
+        ok, msg = self.checkin(member_id, isbn)
+        print(msg)
+
+    def checkin(self, member_id, isbn, fill_holds=True):
+        """Take a book back from a member and lend it to the next member holding it,
+        unless fill_holds is False (LibraryService does that step under its own locks);
+        returns (success, message)"""
+        if member_id not in self.members:
+            return False, "Member not found."
+        if isbn not in self.books:
+            return False, "Book not found."
+
+        member = self.members[member_id]
+        book = self.books[isbn]
+        days_overdue = book.days_overdue()
+
+        ok_member, msg_member = member.return_book(isbn)
+        if not ok_member:
+            return False, msg_member
+
+        ok_book, msg_book = book.return_book()
+        self._log({"op": "return", "isbn": isbn, "member_id": member_id})
+        if days_overdue > 0:
+            msg_book += f"\nBook was overdue by {days_overdue} days."
+        if fill_holds:
+            holder = self.fill_hold(isbn)
+            if holder is not None:
+                msg_book += f"\nBook lent to {holder}, next in the hold queue."
+            for held, holder in self.fill_member_holds(member_id):
+                msg_book += f"\nHeld book {held} lent to {holder}."
+        return ok_book, msg_book
+
+    # ----- Holds -----
+
+    def reserve_book(self):
+        member_id = input("Enter member ID: ").strip()
+        isbn = input("Enter book ISBN: ").strip()
+
+        ok, msg = self.place_hold(member_id, isbn)
+        print(msg)
+
+    def place_hold(self, member_id, isbn, priority=0):
+        """Queue a member for a checked-out book (higher priority is served first,
+        then first come first served); returns (success, message)"""
+        if member_id not in self.members:
+            return False, "Member not found."
+        if isbn not in self.books:
+            return False, "Book not found."
+
+        book = self.books[isbn]
+        if book.available:
+            return False, "Book is available - borrow it instead."
+        if book.borrowed_by == member_id:
+            return False, "This book is already borrowed by this member."
+        if self._has_hold(member_id, isbn):
+            return False, "Member already has a hold on this book."
+        if len(self.member_holds(member_id)) >= Member.MAX_HOLDS:
+            return False, f"Member has reached the maximum number of holds ({Member.MAX_HOLDS})."
+
+        with self.lock:
+            self.hold_seq += 1
+            record = {"op": "hold", "isbn": isbn, "member_id": member_id,
+                      "priority": priority, "seq": self.hold_seq}
+            if self.holds is not None:
+                self.holds.add(isbn, member_id, priority, self.hold_seq)
+            self.counters.holds += 1
+        self._log(record)
+        return True, f"Hold placed. Members waiting for this book: {self.hold_count(isbn)}"
+
+    def cancel_reservation(self):
+        member_id = input("Enter member ID: ").strip()
+        isbn = input("Enter book ISBN: ").strip()
+
+        ok, msg = self.cancel_hold(member_id, isbn)
+        print(msg)
+
+    def cancel_hold(self, member_id, isbn):
+        """Take a member out of a book's hold queue; returns (success, message)"""
+        with self.lock:
+            if self.holds is not None:
+                found = self.holds.cancel(isbn, member_id)
+            else:
+                found = self.store.hold(isbn, member_id) is not None
+            if not found:
+                return False, "This member has no hold on that book."
+            self.counters.holds -= 1
+        self._log({"op": "cancel_hold", "isbn": isbn, "member_id": member_id})
+        return True, "Hold cancelled."
+
+    def next_hold(self, isbn):
+        """The first member in the book's queue who can borrow right now (members at their
+        borrow limit are passed over but keep their place)"""
+        def can_borrow(member_id):
+            member = self.members.get(member_id)
+            return member is not None and member.can_borrow()
+
+        with self.lock:
+            if self.holds is not None:
+                return self.holds.first(isbn, can_borrow)
+            return self.store.first_hold(isbn, can_borrow)
+
+    def fill_hold(self, isbn, member_id=None):
+        """Lend an available book to the next eligible member in its hold queue (or only to
+        member_id, if they are still next); returns who got it, or None"""
+        book = self.books.get(isbn)
+        if book is None or not book.available:
+            return None
+        holder = self.next_hold(isbn)
+        if holder is None or (member_id is not None and holder != member_id):
+            return None
+        ok, msg = self.checkout(holder, isbn)  # also removes their hold
+        return holder if ok else None
+
+    def fill_member_holds(self, member_id):
+        """Lend out the available books a member is waiting for: one may have been returned
+        while they (and everyone behind them) were at the borrow limit, and they can borrow
+        again now. Returns [(isbn, who got it)]"""
+        lent = []
+        for isbn in self.member_holds(member_id):
+            holder = self.fill_hold(isbn)
+            if holder is not None:
+                lent.append((isbn, holder))
+        return lent
+
+    def _has_hold(self, member_id, isbn):
+        with self.lock:
+            if self.holds is not None:
+                return (isbn, member_id) in self.holds
+            return self.store.hold(isbn, member_id) is not None
+
+    def hold_count(self, isbn):
+        """Number of members waiting for a book"""
+        with self.lock:
+            if self.holds is not None:
+                return self.holds.count(isbn)
+            return self.store.hold_count(isbn)
+
+    def hold_position(self, member_id, isbn):
+        """1-based place of a member in a book's hold queue, or None if they have no hold
+        (counts the queue ahead of them, so O(n) - for display, not for hot paths)"""
+        with self.lock:
+            if self.holds is not None:
+                return self.holds.position(isbn, member_id)
+            return self.store.hold_position(isbn, member_id)
+
+    def hold_queue(self, isbn):
+        """Member IDs waiting for a book, in the order they will be served"""
+        with self.lock:
+            if self.holds is not None:
+                return self.holds.queue(isbn)
+            return self.store.hold_queue(isbn)
+
+    def member_holds(self, member_id):
+        """ISBNs a member is waiting for"""
+        with self.lock:
+            if self.holds is not None:
+                return self.holds.holds_of(member_id)
+            return self.store.holds_of(member_id)
+
+    def view_all_books(self):
+        if not self.books:
+            print("No books in library.")
+            return
+        for book in self.books.values():
+            print(book)
+
+    def books_page(self, offset=0, limit=50, available_only=False):
+        """One page of the catalog in listing order, plus the total number of matching books"""
+        if self.store:
+            where = "WHERE available = 1 " if available_only else ""
+            rows = self.store.iter_books(where + "ORDER BY rowid LIMIT ? OFFSET ?", (limit, offset))
+            page = [self.books.cached(book) for book in rows]
+            counts = self.counts()
+            return page, counts['available'] if available_only else counts['total']
+        with self.lock:
+            books = self.books.values()
+            total = len(self.books)
+            if available_only:
+                # Stream past the skipped books; the counters already know the total
+                books = (b for b in books if b.available)
+                total = self.counters.available
+            return list(islice(books, offset, offset + limit)), total
+
+    def members_page(self, offset=0, limit=50):
+        """One page of the member list, plus the total number of members"""
+        with self.lock:
+            return list(islice(self.members.values(), offset, offset + limit)), len(self.members)
+
+    def view_all_members(self):
+        if not self.members:
+            print("No members registered.")
+            return
+        for member in self.members.values():
+            print(member)
+
+    # ----- Overdue tracking -----
+
+    def _book_checked_out(self, book):
+        """Called by Book.check_out"""
+        with self.lock:
+            if self.due_index is not None:
+                self.due_index.add(book.isbn, book.due_ordinal)
+            self.counters.lend(book.borrowed_by, book.due_ordinal)
+
+    def _book_returned(self, book):
+        """Called by Book.return_book, before the loan details are cleared"""
+        with self.lock:
+            if self.due_index is not None:
+                self.due_index.discard(book.isbn)
+            self.counters.give_back(book.borrowed_by, book.due_ordinal)
+
+    @staticmethod
+    def _as_datetime(as_of):
+        if as_of is None:
+            return datetime.now()
+        if not isinstance(as_of, datetime):
+            return datetime.combine(as_of, datetime.min.time())
+        return as_of
+
+    @classmethod
+    def _overdue_cutoff(cls, as_of=None):
+        """Ordinal such that loans due before it are overdue as of the datetime or date"""
+        as_of = cls._as_datetime(as_of)
+        # Overdue means as_of is past midnight of the due date (same rule as Book.is_overdue)
+        return as_of.toordinal() + (1 if as_of.time() != datetime.min.time() else 0)
+
+    def overdue_books(self, as_of=None):
+        """Overdue books as of a datetime or date (default: now), earliest due first"""
+        cutoff = self._overdue_cutoff(as_of)
+        if self.store:
+            rows = self.store.overdue_books(date.fromordinal(cutoff).isoformat())
+            return [self.books.cached(book) for book in rows]
+        with self.lock:
+            return [self.books[isbn] for isbn in self.due_index.due_before(cutoff)]
+
+    def overdue_page(self, as_of=None, offset=0, limit=50):
+        """One page of overdue_books, plus the total number of overdue books.
+
+        Reads only as far into the due-date order as the page goes; the total comes from the
+        counters.
+        """
+        cutoff = self._overdue_cutoff(as_of)
+        if self.store:
+            rows = self.store.overdue_books(date.fromordinal(cutoff).isoformat(), offset, limit)
+            page = [self.books.cached(book) for book in rows]
+        else:
+            with self.lock:
+                isbns = islice(self.due_index.iter_due_before(cutoff), offset, offset + limit)
+                page = [self.books[isbn] for isbn in isbns]
+        return page, self.overdue_count(as_of)
+
+    @staticmethod
+    def _overdue_row(book, as_of):
+        return {
+            'isbn': book.isbn,
+            'title': book.title,
+            'author': book.author,
+            'borrowed_by': book.borrowed_by,
+            'due_date': book.due_date,
+            'days_overdue': book.days_overdue(as_of),
+        }
+
+    def overdue_report(self, as_of=None):
+        """Rows describing every book overdue as of the given date, for batch reporting"""
+        as_of = self._as_datetime(as_of)
+        return [self._overdue_row(book, as_of) for book in self.overdue_books(as_of)]
+
+    def overdue_report_page(self, as_of=None, offset=0, limit=50):
+        """One page of overdue_report, plus the total number of overdue books"""
+        books, total = self.overdue_page(as_of, offset, limit)
+        as_of = self._as_datetime(as_of)
+        return [self._overdue_row(book, as_of) for book in books], total
+
+    def view_overdue_books(self):
+        overdue = self.overdue_books()
+        for book in overdue:
+            print(f"{book} - Overdue by {book.days_overdue()} days")
+        if not overdue:
+            print("No overdue books.")
+
+    # ----- Statistics -----
+
+    def counts(self):
+        """Total, available and borrowed book counts"""
+        with self.lock:
+            total, available = self.counters.total, self.counters.available
+        return {'total': total, 'available': available, 'borrowed': total - available}
+
+    def metrics(self):
+        """Snapshot of the running counters; O(1), cheap enough to scrape every second"""
+        cutoff = self._overdue_cutoff()
+        with self.lock:
+            c = self.counters
+            c.advance(cutoff)
+            return {
+                'books_total': c.total,
+                'books_available': c.available,
+                'books_borrowed': c.total - c.available,
+                'books_overdue': c.overdue,
+                'members_total': c.members,
+                'members_with_loans': len(c.member_loans),
+                'holds_total': c.holds,
+                'authors_total': len(c.author_holdings),
+            }
+
+    def member_loan_count(self, member_id):
+        with self.lock:
+            return self.counters.member_loans.get(member_id, 0)
+
+    def author_holdings(self, author):
+        with self.lock:
+            return self.counters.author_holdings.get(author, 0)
+
+    def overdue_count(self, as_of=None):
+        """Number of overdue books as of a date (default: now), without listing them"""
+        cutoff = self._overdue_cutoff(as_of)
+        with self.lock:
+            if as_of is None:
+                self.counters.advance(cutoff)
+                return self.counters.overdue
+            return self.counters.overdue_before(cutoff)
+
+    def _recount(self, cutoff=None):
+        """Fresh counters from a full scan of the catalog (an SQL aggregate in SQLite mode)"""
+        if self.store:
+            groups = self.store.counter_groups()
+            members, holds = self.store.count("members"), self.store.count("holds")
+        else:
+            groups = ((b.author, b.available, b.borrowed_by, b.due_ordinal, 1) for b in self.books.values())
+            members, holds = len(self.members), len(self.holds)
+        return LibraryCounters.from_books(groups, members, holds, cutoff)
+
+    def check_counters(self):
+        """Compare the running counters with a full rescan; returns a list of mismatches.
+
+        Run it while no changes are in flight (LibraryService.check_counters quiesces first).
+        """
+        with self.lock:
+            self.counters.advance(self._overdue_cutoff())
+            expected = self._recount(self.counters.overdue_cutoff)
+            actual = self.counters
+            problems = []
+            for name in ("total", "available", "members", "holds", "overdue"):
+                if getattr(actual, name) != getattr(expected, name):
+                    problems.append(f"{name}: counter {getattr(actual, name)}, rescan {getattr(expected, name)}")
+            for name in ("member_loans", "author_holdings", "due_counts"):
+                have, want = getattr(actual, name), getattr(expected, name)
+                wrong = [key for key in have.keys() | want.keys() if have.get(key, 0) != want.get(key, 0)]
+                for key in sorted(wrong, key=str)[:10]:
+                    problems.append(f"{name}[{key!r}]: counter {have.get(key, 0)}, rescan {want.get(key, 0)}")
+                if len(wrong) > 10:
+                    problems.append(f"{name}: {len(wrong) - 10} more mismatched keys")
+            return problems
+
+    def stats(self):
+        metrics = self.metrics()
+        print(f"Total books: {metrics['books_total']}")
+        print(f"Available books: {metrics['books_available']}")
+        print(f"Borrowed books: {metrics['books_borrowed']}")
+        print(f"Overdue books: {metrics['books_overdue']}")
+
+    # ----- Menu -----
+
+    def menu(self):
+        print("================================")
+        print("      LIBRARY MANAGEMENT SYSTEM ")
+        print("================================")
+        print(f"Loaded {len(self.books)} books from file")
+        print(f"Loaded {len(self.members)} members from file\n")
+
+        while True:
+            print("1. Add New Book")
+            print("2. Register New Member")
+            print("3. Borrow Book")
+            print("4. Return Book")
+            print("5. Search Books")
+            print("6. View All Books")
+            print("7. View All Members")
+            print("8. View Overdue Books")
+            print("9. View Statistics")
+            print("10. Place Hold")
+            print("11. Cancel Hold")
+            print("12. Save & Exit")
+            print("0. Exit Without Saving")
+
+            choice = input("Enter your choice: ").strip()
+
+            if choice == "1":
+                self.add_book()
+            elif choice == "2":
+                self.register_member()
+            elif choice == "3":
+                self.borrow_book()
+            elif choice == "4":
+                self.return_book()
+            elif choice == "5":
+                self.search_menu()
+            elif choice == "6":
+                self.view_all_books()
+            elif choice == "7":
+                self.view_all_members()
+            elif choice == "8":
+                self.view_overdue_books()
+            elif choice == "9":
+                self.stats()
+            elif choice == "10":
+                self.reserve_book()
+            elif choice == "11":
+                self.cancel_reservation()
+            elif choice == "12":
+                self.save_data()
+                print("Data saved. Goodbye!")
+                break
+            elif choice == "0":
+                print("Goodbye (no save)!")
+                break
+            else:
+                print("Invalid choice, please try again.")
+
+    def search_menu(self):
+        print("\nSearch books by:")
+        print("1. Title")
+        print("2. Author")
+        print("3. ISBN")
+        print("4. Show all available books")
+        print("5. Keywords (title, author or ISBN - all words must match)")
+
+        option = input("Enter search option: ").strip()
+
+        if option == "1":
+            keyword = input("Enter title to search: ")
+            results = self.find_book(keyword, mode="title")
+        elif option == "2":
+            keyword = input("Enter author to search: ")
+            results = self.find_book(keyword, mode="author")
+        elif option == "3":
+            keyword = input("Enter ISBN to search: ")
+            results = self.find_book(keyword, mode="isbn")
+        elif option == "4":
+            results = [b for b in self.books.values() if b.available]
+            keyword = "all available books"
+        elif option == "5":
+            keyword = input("Enter keywords to search: ")
+            results = self.find_book(keyword, mode="any", match="terms")
+        else:
+            print("Invalid option.")
+            return
+
+        if option != "4":
+            print(f"\nSearch Results for '{keyword}':")
+        else:
+            print("\nAvailable books:")
+
+        print("----------------------------------------")
+        if not results:
+            print("No books found.")
+        else:
+            for i, b in enumerate(results, start=1):
+                status = "Available" if b.available else f"Borrowed by {b.borrowed_by} (Due: {b.due_date})"
+                print(f"{i}. {b.title}")
+                print(f"   Author: {b.author}")
+                print(f"   ISBN: {b.isbn}")
+                if b.year:
+                    print(f"   Year: {b.year}")
+                print(f"   Status: {status}\n")
+            print(f"Found {len(results)} books.\n")
+
+
+# ------------ Run system ------------
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Library Management System")
+    parser.add_argument("--journal", action="store_true",
+                        help=f"record every change in {Library.JOURNAL_FILE} instead of saving on exit")
+    parser.add_argument("--sqlite", action="store_true",
+                        help=f"keep books and members in {Library.DB_FILE} (see migrate_to_sqlite.py)")
+    args = parser.parse_args()
+
+    lib = Library(journal=args.journal, storage="sqlite" if args.sqlite else "json")
+    lib.menu()
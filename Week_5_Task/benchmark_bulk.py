@@ -0,0 +1,67 @@
+# Benchmark: bulk import/export throughput for each storage mode
+#
+# Usage: python benchmark_bulk.py [rows]   (default: 200000)
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from Library_Management_System_PROJ import Library
+from library_bulk import read_catalog
+
+
+def write_catalog(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "isbn", "year"])
+        for i in range(rows):
+            # ~1% duplicate ISBNs, like a merged supplier feed
+            writer.writerow([f"Collected Works Volume {i}", f"Author {i % 20000}",
+                             f"978{i % (rows - rows // 100):010d}", 1950 + i % 70])
+
+
+def timed(label, rows, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed:7.2f}s  {rows / elapsed:10,.0f} rows/s")
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "catalog.csv")
+        write_catalog(source, rows)
+
+        def path(name):
+            return os.path.join(directory, name)
+
+        libraries = {
+            "json": lambda: Library(books_file=path("books.json"), members_file=path("members.json"),
+                                    holds_file=path("holds.json")),
+            "journal": lambda: Library(books_file=path("jbooks.json"), members_file=path("jmembers.json"),
+                                       holds_file=path("jholds.json"), journal=path("library.journal")),
+            "sqlite": lambda: Library(storage="sqlite", db_file=path("library.db")),
+        }
+        print(f"Import of {rows:,} CSV rows (batches of {Library.IMPORT_BATCH:,})")
+        for name, make in libraries.items():
+            library = make()
+            if name == "json":
+                timed(f"{name} (incl. save_data)", rows,
+                      lambda: (library.import_books(read_catalog(source)), library.save_data()))
+            else:
+                timed(name, rows, lambda: library.import_books(read_catalog(source)))
+            if library.journal:
+                library.journal.close()
+
+        library = libraries["sqlite"]()
+        count = len(library.books)
+        print(f"Export of {count:,} books from SQLite")
+        for fmt in Library.EXPORT_FORMATS:
+            with open(path(f"export.{fmt}"), "w", encoding="utf-8", newline="") as f:
+                timed(fmt, count, lambda: library.export_books(f, fmt))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
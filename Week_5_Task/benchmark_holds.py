@@ -0,0 +1,123 @@
+# Benchmark: hold-queue churn under simulated circulation
+#
+# Usage: python benchmark_holds.py [--sqlite] [hold counts...]   (default: 10000 100000 1000000)
+#
+# Every book starts checked out, members fill the hold queues (skewed: a few hot books get deep
+# queues), then circulation runs: returns hand books straight to the next holder, members
+# cancel holds and place new ones. If operations are O(log n), the per-operation cost should
+# barely move as the number of holds grows by 100x. At the end no available book may still
+# have a holder who could borrow it.
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from Library_Management_System_PROJ import Library, Member
+
+BOOKS = 10_000
+CHURN = 50_000
+HOT_BOOKS = 100  # a third of all holds go to these
+
+
+def pick_book(rng):
+    if rng.random() < 1 / 3:
+        return f"isbn-{rng.randrange(HOT_BOOKS)}"
+    return f"isbn-{rng.randrange(BOOKS)}"
+
+
+def build(directory, holds, **options):
+    library = Library(books_file=os.path.join(directory, "books.json"),
+                      members_file=os.path.join(directory, "members.json"),
+                      holds_file=os.path.join(directory, "holds.json"),
+                      db_file=os.path.join(directory, "library.db"), **options)
+    library.import_books({"title": f"Title {i}", "author": f"Author {i % 500}", "isbn": f"isbn-{i}"}
+                         for i in range(BOOKS))
+    # Members for the holds (with slack: a repeated pick of the same book is refused),
+    # plus borrowers who check every book out
+    borrowers = BOOKS // Member.MAX_BORROW
+    members = borrowers + 2 * holds // Member.MAX_HOLDS + 1
+    for i in range(members):
+        library.insert_member(Member(f"Member {i}", f"m{i}"))
+    for i in range(BOOKS):
+        library.checkout(f"m{i // Member.MAX_BORROW}", f"isbn-{i}")
+    return library, borrowers, members
+
+
+def fill(library, holds, borrowers, rng):
+    start = time.perf_counter()
+    placed = 0
+    member = borrowers
+    while placed < holds:
+        # Each member tries for their full quota of holds, then the next member takes over
+        for _ in range(Member.MAX_HOLDS):
+            placed += library.place_hold(f"m{member}", pick_book(rng))[0]
+            if placed == holds:
+                break
+        member += 1
+    return (time.perf_counter() - start) / holds * 1e6
+
+
+def churn(library, members, rng):
+    """Returns (auto-assigned), cancels and new holds in equal parts; µs per operation by kind"""
+    timings = {"return": [0.0, 0], "cancel": [0.0, 0], "hold": [0.0, 0]}
+    assigned = 0
+    for _ in range(CHURN):
+        kind = rng.choice(("return", "cancel", "hold"))
+        start = time.perf_counter()
+        if kind == "return":
+            isbn = pick_book(rng)
+            holder = library.books[isbn].borrowed_by
+            if holder is not None:
+                ok, msg = library.checkin(holder, isbn)
+                assigned += "hold queue" in msg
+        elif kind == "cancel":
+            member_id = f"m{rng.randrange(members)}"
+            waiting = library.member_holds(member_id)
+            if waiting:
+                library.cancel_hold(member_id, rng.choice(waiting))
+        else:
+            library.place_hold(f"m{rng.randrange(members)}", pick_book(rng))
+        timings[kind][0] += time.perf_counter() - start
+        timings[kind][1] += 1
+    return {k: total / max(n, 1) * 1e6 for k, (total, n) in timings.items()}, assigned
+
+
+def stranded(library):
+    """Available books whose queue still has a member who could borrow them (should be none:
+    a member passed over at their borrow limit is reconsidered when they return a book)"""
+    return [isbn for isbn in (f"isbn-{i}" for i in range(BOOKS))
+            if library.books[isbn].available and library.next_hold(isbn) is not None]
+
+
+def run(holds, **options):
+    rng = random.Random(holds)
+    with tempfile.TemporaryDirectory() as directory:
+        library, borrowers, members = build(directory, holds, **options)
+        place_us = fill(library, holds, borrowers, rng)
+        deepest = max(library.hold_count(f"isbn-{i}") for i in range(HOT_BOOKS))
+        per_op, assigned = churn(library, members, rng)
+        problems = library.check_counters()
+        waiting = stranded(library)
+        if waiting:
+            problems.append(f"{len(waiting)} available books with an eligible holder, e.g. {waiting[0]}")
+        print(f"{holds:>10,} | place {place_us:6.1f} µs | return+assign {per_op['return']:6.1f} µs | "
+              f"cancel {per_op['cancel']:6.1f} µs | hold {per_op['hold']:6.1f} µs | "
+              f"deepest queue {deepest:>6,} | {assigned:,} handed on | "
+              f"{'counters OK' if not problems else problems[:2]}")
+        if library.store:
+            library.store.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {}
+    if "--sqlite" in args:
+        args.remove("--sqlite")
+        options["storage"] = "sqlite"
+    sizes = [int(a) for a in args] or [10_000, 100_000, 1_000_000]
+    print(f"{BOOKS:,} books, all checked out; {CHURN:,} churn operations after filling the queues "
+          f"({options.get('storage', 'in-memory')})\n")
+    for size in sizes:
+        run(size, **options)
@@ -0,0 +1,61 @@
+# Benchmark: per-operation persistence cost, full save_data vs the append-only journal
+#
+# Usage: python benchmark_journal.py [catalog sizes...]   (default: 1000 10000 100000)
+
+import os
+import sys
+import tempfile
+import time
+
+from Library_Management_System_PROJ import Book, Library, Member
+
+OPERATIONS = 200
+MEMBERS = 100
+
+
+def build_library(directory, size, **options):
+    library = Library(books_file=os.path.join(directory, "books.json"),
+                      members_file=os.path.join(directory, "members.json"),
+                      holds_file=os.path.join(directory, "holds.json"), **options)
+    for i in range(size):
+        library.insert_book(Book(f"Title {i}", f"Author {i % 5000}", f"isbn-{i}", 2000))
+    for i in range(MEMBERS):
+        library.insert_member(Member(f"Member {i}", f"m{i}"))
+    library.save_data()
+    return library
+
+
+def circulate(library, durable):
+    """Alternate checkouts and returns; durable() persists after every operation"""
+    start = time.perf_counter()
+    for i in range(OPERATIONS // 2):
+        isbn, member_id = f"isbn-{i}", f"m{i % MEMBERS}"
+        library.checkout(member_id, isbn)
+        durable()
+        library.checkin(member_id, isbn)
+        durable()
+    return (time.perf_counter() - start) / OPERATIONS * 1000
+
+
+def run(size):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        library = build_library(directory, size)
+        results.append(circulate(library, library.save_data))
+
+    for fsync in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = os.path.join(directory, "library.journal")
+            library = build_library(directory, size, journal=journal, journal_fsync=fsync)
+            results.append(circulate(library, lambda: None))
+            library.journal.close()
+
+    print(f"{size:>9,} books | save_data per op {results[0]:9.3f} ms | "
+          f"journal {results[1]:7.3f} ms | journal+fsync {results[2]:7.3f} ms")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print(f"Average latency of {OPERATIONS} checkouts/returns, persisted after each one\n")
+    for size in sizes:
+        run(size)
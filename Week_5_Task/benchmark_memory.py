@@ -0,0 +1,81 @@
+# Benchmark: memory of the slotted Book/Member classes vs the original dict-backed ones
+#
+# Usage: python benchmark_memory.py [number of books]   (default: 1000000)
+
+import gc
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+from Library_Management_System_PROJ import Book, Member
+
+
+class LegacyBook:
+    """The original Book: instance __dict__ and 'YYYY-MM-DD' strings for dates"""
+
+    def __init__(self, title, author, isbn, year=None):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.year = year
+        self.available = True
+        self.borrowed_by = None
+        self.due_date = None
+        self.date_added = datetime.now().strftime('%Y-%m-%d')
+
+    def check_out(self, member_id, loan_period=14):
+        self.available = False
+        self.borrowed_by = member_id
+        self.due_date = (datetime.now() + timedelta(days=loan_period)).strftime('%Y-%m-%d')
+        return True, ""
+
+
+class LegacyMember:
+    """The original Member: borrowed ISBNs kept in a list"""
+
+    def __init__(self, name, member_id):
+        self.name = name
+        self.member_id = member_id
+        self.borrowed_books = []
+
+    def borrow_book(self, isbn):
+        self.borrowed_books.append(isbn)
+
+
+def build(book_cls, member_cls, size):
+    """size books, a third of them on loan, spread over size // 10 members"""
+    books = {}
+    for i in range(size):
+        isbn = f"978{i:010d}"
+        books[isbn] = book_cls(f"Title number {i}", f"Author {i % 50000}", isbn, 1990 + i % 30)
+    members = {}
+    for i in range(size // 10):
+        member_id = f"M{i:07d}"
+        members[member_id] = member_cls(f"Member {i}", member_id)
+    for i in range(0, size, 3):
+        isbn, member_id = f"978{i:010d}", f"M{i % (size // 10):07d}"
+        books[isbn].check_out(member_id)
+        members[member_id].borrow_book(isbn)
+    return books, members
+
+
+def measure(book_cls, member_cls, size):
+    gc.collect()
+    tracemalloc.start()
+    data = build(book_cls, member_cls, size)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    gc.collect()
+    return current
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    legacy = measure(LegacyBook, LegacyMember, size)
+    compact = measure(Book, Member, size)
+    mb = 1024 * 1024
+    print(f"{size:,} books, {size // 10:,} members, {size // 3 + 1:,} loans (tracemalloc, incl. strings)")
+    print(f"  original classes: {legacy / mb:8.1f} MB  ({legacy / size:6.1f} bytes/book)")
+    print(f"  slotted classes:  {compact / mb:8.1f} MB  ({compact / size:6.1f} bytes/book)")
+    print(f"  reduction:        {(1 - compact / legacy) * 100:8.1f} %")
@@ -0,0 +1,95 @@
+# Benchmark: trigram SearchIndex vs the original linear-scan Library.find_book
+#
+# Usage: python benchmark_search_index.py [catalog sizes...]   (default: 10000 100000 1000000)
+
+import random
+import sys
+import time
+
+from Library_Management_System_PROJ import Book, Library
+
+SYLLABLES = ("ka ri to na mi ra lo ve sa den mor tal ith gor an el bar cas fen dra "
+             "qui zo lum per sin tor wen hal ur by ost ne fa gil").split()
+QUERIES = 200
+
+
+def linear_find(books, keyword, mode="title"):
+    """The original find_book: lowercase every field and substring-scan the catalog"""
+    results = []
+    keyword_lower = keyword.lower()
+    for book in books.values():
+        if mode == "title" and keyword_lower in book.title.lower():
+            results.append(book)
+        elif mode == "author" and keyword_lower in book.author.lower():
+            results.append(book)
+        elif mode == "isbn" and keyword_lower in book.isbn.lower():
+            results.append(book)
+    return results
+
+
+def make_vocabulary(rng, size):
+    """Pseudo-words built from syllables, so the catalog has a realistic spread of terms"""
+    return sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(size)})
+
+
+def make_books(n, rng):
+    words = make_vocabulary(rng, 20_000)
+    names = make_vocabulary(rng, 2_000)
+    for i in range(n):
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(2, 6))).title()
+        author = f"{rng.choice(names).title()} {rng.choice(names).title()}"
+        yield Book(f"{title} {i}", author, f"978{i:010d}", rng.randint(1900, 2024))
+
+
+def make_queries(rng, books, n):
+    """Typical desk lookups: a fragment of a title, a surname, a run of ISBN digits"""
+    catalog = list(books.values())
+    queries = []
+    for _ in range(n):
+        book = rng.choice(catalog)
+        kind = rng.random()
+        if kind < 0.5:
+            start = rng.randint(0, max(0, len(book.title) - 12))
+            queries.append((book.title[start:start + rng.randint(8, 14)], "title"))
+        elif kind < 0.8:
+            queries.append((book.author.split()[-1], "author"))
+        else:
+            start = rng.randint(3, 6)
+            queries.append((book.isbn[start:start + 7], "isbn"))
+    return queries
+
+
+def run(size):
+    rng = random.Random(size)
+    library = Library(books_file=f"__bench_missing_{size}.json", members_file=f"__bench_missing_{size}.json")
+
+    start = time.perf_counter()
+    for book in make_books(size, rng):
+        library.insert_book(book)
+    build = time.perf_counter() - start
+
+    queries = make_queries(rng, library.books, QUERIES)
+
+    start = time.perf_counter()
+    linear_hits = [linear_find(library.books, q, mode) for q, mode in queries]
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_hits = [library.find_book(q, mode) for q, mode in queries]
+    indexed = time.perf_counter() - start
+
+    for a, b in zip(linear_hits, index_hits):
+        assert {x.isbn for x in a} == {x.isbn for x in b}, "index results differ from linear scan"
+    hits = sum(len(r) for r in index_hits) / QUERIES
+
+    print(f"{size:>9,} books | load+index {build:7.2f}s | "
+          f"linear {linear / QUERIES * 1000:9.3f} ms/query | "
+          f"indexed {indexed / QUERIES * 1000:9.3f} ms/query | "
+          f"speedup {linear / indexed:6.1f}x | {hits:,.0f} hits/query")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"{QUERIES} mixed title/author/ISBN substring queries per catalog size\n")
+    for size in sizes:
+        run(size)
@@ -0,0 +1,90 @@
+# Check that searches give the same results with SQLite storage as with the in-memory SearchIndex
+#
+# Usage: python check_search_parity.py
+#
+# Builds the same small catalog (including accented and other non-ASCII titles and authors) in
+# both storages, runs every query in every mode and match type, and exits with status 1 if any
+# result list (including its order) differs. The database is built twice: once fresh, and once
+# with a pre-version-1 search index that has to be rebuilt on open.
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+from Library_Management_System_PROJ import Book, Library, SearchIndex, SQLiteStorage
+
+BOOKS = [
+    ("Émile, or On Education", "Jean-Jacques Rousseau", "9780465019311"),
+    ("Étude in Black", "Émile Zola", "9780140447200"),
+    ("Über die Freiheit", "John Stuart Mill", "9783150015949"),
+    ("Études de Chopin", "Frédéric Chopin", "9790004160131"),
+    ("The Stranger", "Albert Camus", "9780679720201"),
+    ("ÉCOLE ET SOCIÉTÉ", "Émile Durkheim", "9782130547341"),
+    ("Mémoires d'outre-tombe", "François-René de Chateaubriand", "9782253160762"),
+    ("Война и мир", "Лев Толстой", "9785170906246"),
+    ("Straße der Ölsardinen", "John Steinbeck", "9783423102612"),
+    ("The Hobbit", "J.R.R. Tolkien", "ISBN-HOBBIT-1"),
+]
+QUERIES = ["émile", "ÉMILE", "étude", "über", "É", "é", "Ü", "soc", "ÖLS", "straße", "война",
+           "ВОЙНА И", "толстой", "émile zola", "the", "isbn-hob", "hobbit", "9780", "fré chop", "x"]
+
+
+def build(directory, name, **options):
+    library = Library(books_file=os.path.join(directory, f"{name}-books.json"),
+                      members_file=os.path.join(directory, f"{name}-members.json"),
+                      holds_file=os.path.join(directory, f"{name}-holds.json"),
+                      db_file=os.path.join(directory, f"{name}.db"), **options)
+    for i, (title, author, isbn) in enumerate(BOOKS):
+        library.insert_book(Book(title, author, isbn, 1900 + i))
+    return library
+
+
+def outdated(path):
+    """Turn path back into a database whose search index holds the original-case text"""
+    conn = sqlite3.connect(path)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'books_fts'").fetchone() is None:
+        conn.close()
+        return  # no FTS5 trigram: searches use LIKE on the books table
+    conn.create_function("fold", 1, lambda text: text)
+    conn.executescript(SQLiteStorage.FTS_DROP + SQLiteStorage.FTS_SCHEMA +
+                       "INSERT INTO books_fts (rowid, isbn, title, author) "
+                       "SELECT rowid, isbn, title, author FROM books; PRAGMA user_version = 0;")
+    conn.close()
+
+
+def mismatches(expected, actual):
+    problems = []
+    for query in QUERIES:
+        for mode in ("any",) + SearchIndex.FIELDS:
+            for match in ("substring", "prefix", "terms"):
+                want = [b.isbn for b in expected.find_book(query, mode, match)]
+                got = [b.isbn for b in actual.find_book(query, mode, match)]
+                if want != got:
+                    problems.append(f"{query!r} mode={mode} match={match}: expected {want}, got {got}")
+    return problems
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        memory = build(directory, "memory")
+        fresh = build(directory, "fresh", storage="sqlite")
+        old = build(directory, "old", storage="sqlite")
+        old.store.close()
+        outdated(old.store.path)
+        migrated = Library(books_file=old.books_file, members_file=old.members_file,
+                           holds_file=old.holds_file, db_file=old.store.path, storage="sqlite")
+        problems = []
+        for label, library in (("fresh", fresh), ("migrated", migrated)):
+            found = mismatches(memory, library)
+            print(f"{label:<9} SQLite database: {'same results' if not found else f'{len(found)} mismatches'}"
+                  f"{'' if library.store.fts else ' (LIKE fallback, no FTS5 trigram)'}")
+            problems += [f"{label}: {problem}" for problem in found]
+            library.store.close()
+    for problem in problems:
+        print(f"MISMATCH {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
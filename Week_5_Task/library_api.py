@@ -0,0 +1,332 @@
+# Async HTTP/JSON API for the library (stdlib asyncio only, no web framework needed)
+#
+# Usage: python library_api.py [--host 127.0.0.1] [--port 8080] [--journal [--fsync] | --sqlite]
+#
+#   GET  /books?page=1&per_page=50[&available=1]          paginated catalog
+#   GET  /members?page=1&per_page=50                      paginated member list
+#   GET  /search?q=tolkien[&mode=author][&match=prefix]   ranked search results, paginated
+#   GET  /overdue[?as_of=2026-01-31]                      overdue report, paginated
+#   GET  /stats                                           total / available / borrowed
+#   GET  /metrics[?check=1]                               counter snapshot (cheap; scrape freely);
+#                                                         check=1 also rescans and lists mismatches
+#   POST /borrow   {"member_id": "M001", "isbn": "9780261102217"}
+#   POST /return   {"member_id": "M001", "isbn": "9780261102217"}     (lends it on to the next hold)
+#   POST /hold     {"member_id": "M001", "isbn": "9780261102217", "priority": 0}
+#   POST /cancel_hold  {"member_id": "M001", "isbn": "9780261102217"}
+#   GET  /holds?isbn=9780261102217 | ?member_id=M001         hold queue / a member's holds
+#
+# Library calls can block on disk (journal fsync, SQLite), so they run on a small thread pool
+# through the thread-safe LibraryService while the event loop keeps serving other connections.
+
+import argparse
+import asyncio
+import json
+import signal
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from Library_Management_System_PROJ import Library
+from library_service import LibraryService
+
+MAX_PER_PAGE = 500
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+SEARCH_MODES = ("title", "author", "isbn", "any")
+SEARCH_MATCHES = ("substring", "prefix", "terms")
+
+
+class HTTPError(Exception):
+    """Raised by endpoints to answer with an error status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ------------ Request helpers ------------
+
+def _param(query, name, default=None):
+    return query.get(name, [default])[0]
+
+
+def _int_param(query, name, default, maximum=None):
+    try:
+        value = int(_param(query, name, default))
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be an integer")
+    if value < 1:
+        raise HTTPError(400, f"'{name}' must be at least 1")
+    return min(value, maximum) if maximum else value
+
+
+def _pagination(query):
+    """(page, per_page, offset) from ?page=&per_page="""
+    page = _int_param(query, "page", 1)
+    per_page = _int_param(query, "per_page", 50, MAX_PER_PAGE)
+    return page, per_page, (page - 1) * per_page
+
+
+def _page_body(items, total, page, per_page):
+    return {"items": items, "page": page, "per_page": per_page, "total": total,
+            "pages": (total + per_page - 1) // per_page}
+
+
+def _json_body(body):
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(400, "Body must be JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Body must be a JSON object")
+    return data
+
+
+def _loan_request(data):
+    member_id, isbn = data.get("member_id"), data.get("isbn")
+    if not isinstance(member_id, str) or not isinstance(isbn, str):
+        raise HTTPError(400, "Body needs string 'member_id' and 'isbn'")
+    return member_id.strip(), isbn.strip()
+
+
+def _loan_response(result):
+    ok, msg = result
+    if ok:
+        return 200, {"ok": True, "message": msg}
+    return (404 if msg.endswith("not found.") else 409), {"ok": False, "message": msg}
+
+
+# ------------ API ------------
+
+class LibraryAPI:
+    """Routes HTTP requests to a LibraryService"""
+
+    def __init__(self, service, workers=8):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="library")
+        self.routes = {
+            ("GET", "/books"): self.books,
+            ("GET", "/members"): self.members,
+            ("GET", "/search"): self.search,
+            ("GET", "/overdue"): self.overdue,
+            ("GET", "/stats"): self.stats,
+            ("GET", "/metrics"): self.metrics,
+            ("POST", "/borrow"): self.borrow,
+            ("POST", "/return"): self.return_book,
+            ("POST", "/hold"): self.place_hold,
+            ("POST", "/cancel_hold"): self.cancel_hold,
+            ("GET", "/holds"): self.holds,
+        }
+        self.paths = {path for _, path in self.routes}
+
+    async def _run(self, fn, *args):
+        """Run a (possibly blocking) library call on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # ----- Endpoints -----
+    # Objects are turned into dicts on the worker thread, next to the call that fetched them
+
+    async def books(self, query, body):
+        page, per_page, offset = _pagination(query)
+        available_only = _param(query, "available", "0").lower() in ("1", "true", "yes")
+
+        def fetch():
+            books, total = self.service.books_page(offset, per_page, available_only)
+            return [b.to_dict() for b in books], total
+        items, total = await self._run(fetch)
+        return 200, _page_body(items, total, page, per_page)
+
+    async def members(self, query, body):
+        page, per_page, offset = _pagination(query)
+
+        def fetch():
+            members, total = self.service.members_page(offset, per_page)
+            return [m.to_dict() for m in members], total
+        items, total = await self._run(fetch)
+        return 200, _page_body(items, total, page, per_page)
+
+    async def search(self, query, body):
+        keyword = (_param(query, "q") or "").strip()
+        mode = _param(query, "mode", "title")
+        match = _param(query, "match", "substring")
+        if not keyword:
+            raise HTTPError(400, "Missing search term 'q'")
+        if mode not in SEARCH_MODES or match not in SEARCH_MATCHES:
+            raise HTTPError(400, f"mode must be one of {SEARCH_MODES}, match one of {SEARCH_MATCHES}")
+        page, per_page, offset = _pagination(query)
+
+        def fetch():
+            books, total = self.service.search_page(keyword, mode, match, offset, per_page)
+            return [b.to_dict() for b in books], total
+        items, total = await self._run(fetch)
+        return 200, _page_body(items, total, page, per_page)
+
+    async def overdue(self, query, body):
+        as_of = _param(query, "as_of")
+        try:
+            as_of = date.fromisoformat(as_of) if as_of else None
+        except ValueError:
+            raise HTTPError(400, "'as_of' must be a YYYY-MM-DD date")
+        page, per_page, offset = _pagination(query)
+        rows, total = await self._run(self.service.overdue_page, as_of, offset, per_page)
+        return 200, _page_body(rows, total, page, per_page)
+
+    async def stats(self, query, body):
+        return 200, await self._run(self.service.stats)
+
+    async def metrics(self, query, body):
+        metrics = await self._run(self.service.metrics)
+        if _param(query, "check") in ("1", "true"):
+            # Pauses every desk for a full rescan: for checks, not for regular scraping
+            metrics["counter_problems"] = await self._run(self.service.check_counters)
+        return 200, metrics
+
+    async def borrow(self, query, body):
+        member_id, isbn = _loan_request(_json_body(body))
+        return _loan_response(await self._run(self.service.borrow, member_id, isbn))
+
+    async def return_book(self, query, body):
+        member_id, isbn = _loan_request(_json_body(body))
+        return _loan_response(await self._run(self.service.return_book, member_id, isbn))
+
+    async def place_hold(self, query, body):
+        data = _json_body(body)
+        member_id, isbn = _loan_request(data)
+        priority = data.get("priority", 0)
+        if not isinstance(priority, int):
+            raise HTTPError(400, "'priority' must be an integer")
+        return _loan_response(await self._run(self.service.place_hold, member_id, isbn, priority))
+
+    async def cancel_hold(self, query, body):
+        member_id, isbn = _loan_request(_json_body(body))
+        return _loan_response(await self._run(self.service.cancel_hold, member_id, isbn))
+
+    async def holds(self, query, body):
+        isbn, member_id = _param(query, "isbn"), _param(query, "member_id")
+        if bool(isbn) == bool(member_id):
+            raise HTTPError(400, "Give exactly one of 'isbn' or 'member_id'")
+        page, per_page, offset = _pagination(query)
+        if isbn:
+            items = await self._run(self.service.hold_queue, isbn)
+        else:
+            items = await self._run(self.service.member_holds, member_id)
+        return 200, _page_body(items[offset:offset + per_page], len(items), page, per_page)
+
+    # ----- HTTP -----
+
+    def dispatch(self, method, target):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if url.path in self.paths:
+                raise HTTPError(405, f"{method} not allowed on {url.path}")
+            raise HTTPError(404, f"No such endpoint: {url.path}")
+        return handler, parse_qs(url.query)
+
+    async def handle(self, method, target, body):
+        """Answer one request with (status, JSON-able payload)"""
+        try:
+            handler, query = self.dispatch(method, target)
+            return await handler(query, body)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Exception:
+            traceback.print_exc()
+            return 500, {"error": "Internal server error"}
+
+    @staticmethod
+    def _response(status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+    async def connection(self, reader, writer):
+        """Serve requests on one (keep-alive) connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break  # client closed the connection
+                except asyncio.LimitOverrunError:
+                    writer.write(self._response(413, {"error": "Headers too large"}, False))
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.split(" ")
+                    length = headers.get("content-length") or "0"
+                    if not (length.isascii() and length.isdigit()):
+                        raise ValueError(length)  # negative, signed or not a number
+                    length = int(length)
+                except ValueError:
+                    writer.write(self._response(400, {"error": "Malformed request"}, False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(self._response(413, {"error": "Body too large"}, False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                status, payload = await self.handle(method, target, body)
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.connection, host, port, limit=MAX_HEADER_BYTES)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Serving library API on http://{host}:{port}", flush=True)
+
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+            except (NotImplementedError, AttributeError):
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+        async with server:
+            await stop.wait()
+        self.executor.shutdown()
+
+
+# ------------ Run server ------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Library HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    parser.add_argument("--workers", type=int, default=8, help="threads running library calls")
+    parser.add_argument("--journal", action="store_true",
+                        help=f"record every change in {Library.JOURNAL_FILE}")
+    parser.add_argument("--fsync", action="store_true", help="fsync the journal on every change")
+    parser.add_argument("--sqlite", action="store_true", help=f"keep data in {Library.DB_FILE}")
+    args = parser.parse_args()
+
+    library = Library(journal=args.journal, journal_fsync=args.fsync,
+                      storage="sqlite" if args.sqlite else "json")
+    service = LibraryService(library)
+    try:
+        asyncio.run(LibraryAPI(service, args.workers).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        print("Library data saved.")
@@ -0,0 +1,112 @@
+# Bulk catalog import/export for the Library Management System
+#
+# Usage:
+#   python library_bulk.py import catalog.csv [--batch-size 10000] [--strict-isbn] [--sqlite | --journal]
+#   python library_bulk.py export catalog.jsonl [--format jsonl|csv|json] [--sqlite | --journal]
+#
+# Input files are streamed: CSV needs a header row with title, author, isbn (year and
+# date_added optional); JSON Lines files hold one object per line with the same keys.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from Library_Management_System_PROJ import Library
+
+
+def read_catalog(path):
+    """Yield one dict per row from a .csv or .jsonl/.ndjson file"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if ext == ".csv":
+            yield from csv.DictReader(f)
+        elif ext in (".jsonl", ".ndjson"):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None  # reported as an invalid row
+        else:
+            raise ValueError(f"Unsupported file type '{ext}' (use .csv or .jsonl)")
+
+
+def open_library(args):
+    if args.sqlite:
+        return Library(storage="sqlite")
+    return Library(journal=args.journal)
+
+
+def run_import(args):
+    library = open_library(args)
+    start = time.perf_counter()
+    shown_errors = 0
+
+    def on_error(row_number, row, reason):
+        nonlocal shown_errors
+        if shown_errors < 20:
+            print(f"  row {row_number}: {reason}", file=sys.stderr)
+        shown_errors += 1
+
+    def on_batch(counts):
+        elapsed = time.perf_counter() - start
+        print(f"  {counts['read']:,} rows read, {counts['added']:,} added "
+              f"({counts['read'] / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+    counts = library.import_books(read_catalog(args.file), batch_size=args.batch_size,
+                                  strict_isbn=args.strict_isbn, on_error=on_error, on_batch=on_batch)
+    if not args.sqlite and not args.journal:
+        library.save_data()  # plain JSON storage only persists on save
+    elapsed = time.perf_counter() - start
+    print(f"Imported {counts['added']:,} books from {counts['read']:,} rows "
+          f"({counts['duplicate']:,} duplicates, {counts['invalid']:,} invalid) "
+          f"in {elapsed:.2f}s - {counts['read'] / max(elapsed, 1e-9):,.0f} rows/s")
+
+
+def run_export(args):
+    library = open_library(args)
+    fmt = args.format or os.path.splitext(args.file)[1].lstrip(".").lower()
+    start = time.perf_counter()
+    with open(args.file, "w", encoding="utf-8", newline="") as f:
+        count = library.export_books(f, fmt)
+    elapsed = time.perf_counter() - start
+    print(f"Exported {count:,} books to {args.file} in {elapsed:.2f}s - "
+          f"{count / max(elapsed, 1e-9):,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk catalog import/export")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="add books from a CSV or JSON Lines file")
+    imp.add_argument("file")
+    imp.add_argument("--batch-size", type=int, default=Library.IMPORT_BATCH)
+    imp.add_argument("--strict-isbn", action="store_true", help="normalize ISBNs and check their check digit")
+
+    exp = sub.add_parser("export", help="write every book to a file")
+    exp.add_argument("file")
+    exp.add_argument("--format", choices=Library.EXPORT_FORMATS, help="default: from the file extension")
+
+    for p in (imp, exp):
+        storage = p.add_mutually_exclusive_group()
+        storage.add_argument("--sqlite", action="store_true", help=f"use {Library.DB_FILE}")
+        storage.add_argument("--journal", action="store_true", help=f"use {Library.JOURNAL_FILE}")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "import":
+            run_import(args)
+        else:
+            run_export(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
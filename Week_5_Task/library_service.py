@@ -0,0 +1,173 @@
+# Thread-safe, non-interactive service API over the Library, for several circulation desks
+#
+#   service = LibraryService(Library(journal=True, journal_fsync=True))
+#   ok, msg = service.borrow("M001", "9780261102217")
+#
+# A checkout or return touches one member and one book, so it only locks those two: each
+# member ID and ISBN hashes to one of a fixed set of lock "stripes". Locks are always taken
+# member first, then book, so two desks can never deadlock. The Library's own lock guards
+# the shared indexes for the short moment they are updated.
+
+import threading
+from contextlib import ExitStack, contextmanager
+
+
+class LibraryService:
+    """Concurrent circulation API: every method is safe to call from any thread"""
+
+    STRIPES = 256
+
+    def __init__(self, library, stripes=None):
+        self.library = library
+        stripes = stripes or self.STRIPES
+        self._member_locks = [threading.Lock() for _ in range(stripes)]
+        self._book_locks = [threading.Lock() for _ in range(stripes)]
+        # Compaction has to see a quiet library, so it runs at checkpoints instead
+        library.auto_compact = False
+
+    @contextmanager
+    def _locked(self, member_id=None, isbn=None):
+        with ExitStack() as stack:
+            if member_id is not None:
+                stack.enter_context(self._member_locks[hash(member_id) % len(self._member_locks)])
+            if isbn is not None:
+                stack.enter_context(self._book_locks[hash(isbn) % len(self._book_locks)])
+            yield
+
+    def _after_write(self):
+        if self.library.compaction_due():
+            self.checkpoint()
+
+    # ----- Circulation -----
+
+    def borrow(self, member_id, isbn):
+        """Check a book out to a member; returns (success, message)"""
+        with self._locked(member_id, isbn):
+            result = self.library.checkout(member_id, isbn)
+        self._after_write()
+        return result
+
+    def return_book(self, member_id, isbn):
+        """Take a book back from a member and lend it to the next member holding it;
+        returns (success, message)"""
+        with self._locked(member_id, isbn):
+            ok, msg = self.library.checkin(member_id, isbn, fill_holds=False)
+        if ok:
+            holder = self._fill_hold(isbn)
+            if holder is not None:
+                msg += f"\nBook lent to {holder}, next in the hold queue."
+            # The member can borrow again: books they wait for may be sitting on the shelf
+            for held in self.library.member_holds(member_id):
+                holder = self._fill_hold(held)
+                if holder is not None:
+                    msg += f"\nHeld book {held} lent to {holder}."
+        self._after_write()
+        return ok, msg
+
+    def _fill_hold(self, isbn):
+        # The next holder is only known after looking at the queue, and their lock has to be
+        # taken before the book's: peek, lock both, then lend only if they are still next
+        while True:
+            holder = self.library.next_hold(isbn)
+            if holder is None:
+                return None
+            with self._locked(holder, isbn):
+                if self.library.fill_hold(isbn, holder) == holder:
+                    return holder
+                book = self.library.books.get(isbn)
+                if book is None or not book.available:
+                    return None  # someone else borrowed or removed it meanwhile
+
+    # ----- Holds -----
+
+    def place_hold(self, member_id, isbn, priority=0):
+        with self._locked(member_id, isbn):
+            result = self.library.place_hold(member_id, isbn, priority)
+        self._after_write()
+        return result
+
+    def cancel_hold(self, member_id, isbn):
+        with self._locked(member_id, isbn):
+            result = self.library.cancel_hold(member_id, isbn)
+        self._after_write()
+        return result
+
+    # ----- Catalog & members -----
+
+    def add_book(self, book):
+        with self._locked(isbn=book.isbn):
+            result = self.library.insert_book(book)
+        self._after_write()
+        return result
+
+    def remove_book(self, isbn):
+        with self._locked(isbn=isbn):
+            result = self.library.remove_book(isbn)
+        self._after_write()
+        return result
+
+    def register_member(self, member):
+        with self._locked(member_id=member.member_id):
+            result = self.library.insert_member(member)
+        self._after_write()
+        return result
+
+    # ----- Queries (read without entity locks) -----
+
+    def search(self, keyword, mode="title", match="substring"):
+        return self.library.find_book(keyword, mode, match)
+
+    def search_page(self, keyword, mode="title", match="substring", offset=0, limit=50):
+        return self.library.search_page(keyword, mode, match, offset, limit)
+
+    def overdue(self, as_of=None):
+        return self.library.overdue_report(as_of)
+
+    def overdue_page(self, as_of=None, offset=0, limit=50):
+        return self.library.overdue_report_page(as_of, offset, limit)
+
+    def stats(self):
+        return self.library.counts()
+
+    def metrics(self):
+        return self.library.metrics()
+
+    def hold_queue(self, isbn):
+        return self.library.hold_queue(isbn)
+
+    def member_holds(self, member_id):
+        return self.library.member_holds(member_id)
+
+    def books_page(self, offset=0, limit=50, available_only=False):
+        return self.library.books_page(offset, limit, available_only)
+
+    def members_page(self, offset=0, limit=50):
+        return self.library.members_page(offset, limit)
+
+    # ----- Persistence -----
+
+    def checkpoint(self):
+        """Quiesce every desk (take all locks, in the usual order) and snapshot the library"""
+        with ExitStack() as stack:
+            for lock in self._member_locks + self._book_locks:
+                stack.enter_context(lock)
+            if self.library.compaction_due():
+                self.library.compact()
+
+    def check_counters(self):
+        """Validate the running counters against a full rescan, with every desk paused"""
+        with ExitStack() as stack:
+            for lock in self._member_locks + self._book_locks:
+                stack.enter_context(lock)
+            return self.library.check_counters()
+
+    def close(self):
+        """Snapshot (in journal mode) and release files"""
+        with ExitStack() as stack:
+            for lock in self._member_locks + self._book_locks:
+                stack.enter_context(lock)
+            self.library.save_data()
+            if self.library.journal:
+                self.library.journal.close()
+            if self.library.store:
+                self.library.store.close()
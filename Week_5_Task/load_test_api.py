@@ -0,0 +1,190 @@
+# Load test for library_api.py: p50/p99 latency at increasing request rates
+#
+# Usage: python load_test_api.py [--rates 500 1000 2000 4000] [--seconds 5] [--url http://host:port]
+#
+# Without --url a server (journal mode) is started on a throwaway catalog. Requests are sent
+# open-loop at a fixed rate over a pool of keep-alive connections, and latency is measured from
+# when each request was *due*, so a server that falls behind cannot hide its queueing delay.
+# The client is one Python process too: if "achieved" falls short of the target rate, the
+# client (or the server) has saturated and the higher rates are not meaningful.
+# Afterwards the server's running counters, updated by every request, are checked against a
+# rescan (check_counters.py); the exit status is 1 if they drifted.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+from Library_Management_System_PROJ import Book, Library, Member
+from check_counters import check
+
+BOOKS = 20_000
+MEMBERS = 1_000
+WORDS = ["river", "shadow", "garden", "empire", "winter", "silver", "ocean", "forest",
+         "mirror", "kingdom", "harvest", "storm", "lantern", "desert", "island", "falcon"]
+
+# (weight, kind) - mostly reads, with steady circulation traffic
+MIX = [(35, "search"), (20, "books"), (10, "stats"), (5, "overdue"), (15, "borrow"), (15, "return")]
+
+
+def build_catalog(directory):
+    rng = random.Random(1)
+    library = Library(books_file=os.path.join(directory, Library.BOOKS_FILE),
+                      members_file=os.path.join(directory, Library.MEMBERS_FILE),
+                      holds_file=os.path.join(directory, Library.HOLDS_FILE))
+    for i in range(BOOKS):
+        title = f"The {rng.choice(WORDS).title()} of the {rng.choice(WORDS).title()} {i}"
+        library.insert_book(Book(title, f"Author {i % 2000}", f"isbn-{i}", 1950 + i % 70))
+    for i in range(MEMBERS):
+        library.insert_member(Member(f"Member {i}", f"m{i}"))
+    library.save_data()
+
+
+def start_server(directory):
+    """Launch library_api.py on a free port in directory; returns (process, host, port)"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "library_api.py")
+    proc = subprocess.Popen([sys.executable, script, "--port", "0", "--journal"],
+                            cwd=directory, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()  # "Serving library API on http://127.0.0.1:PORT"
+    if not line.startswith("Serving"):
+        proc.kill()
+        raise RuntimeError("library_api.py did not start")
+    url = urlsplit(line.split()[-1])
+    return proc, url.hostname, url.port
+
+
+def next_request(rng):
+    kind = rng.choices([k for _, k in MIX], weights=[w for w, _ in MIX])[0]
+    if kind == "search":
+        phrase = f"{rng.choice(WORDS)} of the {rng.choice(WORDS)}"
+        return "GET", f"/search?q={quote(phrase)}&per_page=20", None
+    if kind == "books":
+        return "GET", f"/books?page={rng.randint(1, BOOKS // 50)}&per_page=50", None
+    if kind == "stats":
+        return "GET", "/stats", None
+    if kind == "overdue":
+        return "GET", "/overdue?as_of=2100-01-01&per_page=20", None
+    # Circulation on a hot subset so borrows and returns actually meet
+    loan = {"member_id": f"m{rng.randrange(MEMBERS)}", "isbn": f"isbn-{rng.randrange(500)}"}
+    return "POST", f"/{'borrow' if kind == 'borrow' else 'return'}", loan
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 client connection"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                          .encode() + body)
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = 0
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        await self.reader.readexactly(length)
+        return status
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run_rate(host, port, rate, seconds, connections):
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(await Connection(host, port).open())
+    rng = random.Random(rate)
+    latencies, statuses = [], Counter()
+
+    async def send(due, method, path, payload):
+        conn = await pool.get()
+        try:
+            status = await conn.request(method, path, payload)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status = "error"
+            conn.close()
+            conn = await Connection(host, port).open()
+        pool.put_nowait(conn)
+        latencies.append(time.perf_counter() - due)
+        statuses[status] += 1
+
+    total = int(rate * seconds)
+    tasks = []
+    start = time.perf_counter()
+    for i in range(total):
+        due = start + i / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(due, *next_request(rng))))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    while not pool.empty():
+        pool.get_nowait().close()
+    latencies.sort()
+    return total / elapsed, percentile(latencies, 0.50), percentile(latencies, 0.99), statuses
+
+
+async def main(host, port, rates, seconds, connections):
+    print(f"{'target':>8} {'achieved':>9} {'p50 ms':>8} {'p99 ms':>8}  responses")
+    for rate in rates:
+        achieved, p50, p99, statuses = await run_rate(host, port, rate, seconds, connections)
+        summary = ", ".join(f"{s}: {n}" for s, n in sorted(statuses.items(), key=str))
+        print(f"{rate:>8,} {achieved:>9,.0f} {p50 * 1000:>8.2f} {p99 * 1000:>8.2f}  {summary}")
+
+
+def check_server(host, port):
+    """Print the counter check of the server; True if the counters match a rescan"""
+    _, problems = check(f"http://{host}:{port}")
+    print(f"\ncounters: {'consistent with a rescan' if not problems else f'{len(problems)} MISMATCHES'}")
+    for problem in problems[:10]:
+        print(f"  {problem}")
+    return not problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency load test for library_api.py")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--rates", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--connections", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        asyncio.run(main(url.hostname, url.port, args.rates, args.seconds, args.connections))
+        sys.exit(0 if check_server(url.hostname, url.port) else 1)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            build_catalog(directory)
+            proc, host, port = start_server(directory)
+            try:
+                print(f"Server on {BOOKS:,} books / {MEMBERS:,} members (journal mode)\n")
+                asyncio.run(main(host, port, args.rates, args.seconds, args.connections))
+                consistent = check_server(host, port)
+            finally:
+                proc.terminate()
+                proc.wait()
+        sys.exit(0 if consistent else 1)
@@ -0,0 +1,147 @@
+# Load test: many threads borrowing, returning and holding a small set of hot books through LibraryService
+#
+# Usage: python load_test_service.py [operations per run]   (default: 20000)
+#
+# After each run the final state is checked against what the threads saw: every book is lent
+# to at most one member, book and member records agree, the statistics counters match a rescan,
+# and the journal replays to the same state. A last, seeded run crowds a few members onto the
+# books, so they hit their borrow limit and returns hand on books those members were waiting for.
+
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from Library_Management_System_PROJ import Book, Library, Member
+from library_service import LibraryService
+
+HOT_BOOKS = 50
+MEMBERS = 500
+THREADS = [1, 2, 4, 8, 16]
+CROWDED_MEMBERS = 12  # 12 members x 5 loans > 50 books: members at their limit get passed over
+# "Book lent to m1, next in the hold queue." (the returned book) or
+# "Held book isbn-7 lent to m1." (a book the returning member can now be handed)
+LENT = re.compile(r"^(?:Held book (\S+)|Book) lent to ")
+
+
+def build_service(directory, members=MEMBERS, **options):
+    library = Library(books_file=os.path.join(directory, "books.json"),
+                      members_file=os.path.join(directory, "members.json"),
+                      holds_file=os.path.join(directory, "holds.json"), **options)
+    for i in range(HOT_BOOKS):
+        library.insert_book(Book(f"Hot Title {i}", f"Author {i}", f"isbn-{i}", 2000))
+    for i in range(members):
+        library.insert_member(Member(f"Member {i}", f"m{i}"))
+    library.save_data()
+    return LibraryService(library)
+
+
+def worker(service, operations, seed, tally, members=MEMBERS):
+    """Random borrow/return/hold traffic; tally[isbn] += 1 per loan (including every book a
+    return hands on to a holder), -= 1 per return. tally["handed on held"] counts loans of
+    other books waiting for the returning member"""
+    rng = random.Random(seed)
+    local = Counter()
+    for _ in range(operations):
+        member_id, isbn = f"m{rng.randrange(members)}", f"isbn-{rng.randrange(HOT_BOOKS)}"
+        if rng.random() < 0.5:
+            ok, msg = service.borrow(member_id, isbn)
+            local[isbn] += ok
+            if not ok and rng.random() < 0.3:
+                service.place_hold(member_id, isbn)
+        else:
+            ok, msg = service.return_book(member_id, isbn)
+            local[isbn] -= ok
+            for line in msg.splitlines():
+                lent = LENT.match(line)
+                if lent:
+                    local[lent.group(1) or isbn] += 1
+                    local["handed on held"] += lent.group(1) is not None
+    tally.append(local)
+
+
+def check(library, tally):
+    """Return a list of invariant violations (empty when the state is consistent)"""
+    errors = []
+    net = Counter()
+    for local in tally:
+        net.update(local)  # update() keeps negative counts, unlike Counter addition
+    holders = {}
+    net.pop("handed on held", None)
+    for isbn, book in library.books.items():
+        if net[isbn] not in (0, 1) or net[isbn] != (not book.available):
+            errors.append(f"{isbn}: net borrows {net[isbn]} but available={book.available}")
+        if not book.available:
+            holders[isbn] = book.borrowed_by
+    for member_id, member in library.members.items():
+        for isbn in member.borrowed_books:
+            if holders.get(isbn) != member_id:
+                errors.append(f"{member_id} holds {isbn} but book says {holders.get(isbn)}")
+            if isbn in library.member_holds(member_id):
+                errors.append(f"{member_id} is still waiting for {isbn}, which they have")
+    loans = sum(len(m.borrowed_books) for m in library.members.values())
+    if loans != len(holders):
+        errors.append(f"{loans} member loans vs {len(holders)} books out (double lending)")
+    return errors
+
+
+def snapshot(library):
+    return ({i: (b.available, b.borrowed_by, b.due_date, library.hold_queue(i)) for i, b in library.books.items()},
+            {i: sorted(m.borrowed_books) for i, m in library.members.items()})
+
+
+def run(threads, operations, members=MEMBERS, **options):
+    """Returns (operations per second, invariant violations, loans of held books on return)"""
+    with tempfile.TemporaryDirectory() as directory:
+        if options.get("journal"):
+            options["journal"] = os.path.join(directory, "library.journal")
+        service = build_service(directory, members, **options)
+        tally = []
+        per_thread = operations // threads
+        pool = [threading.Thread(target=worker, args=(service, per_thread, seed, tally, members))
+                for seed in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        library = service.library
+        errors = check(library, tally) + service.check_counters()
+        if library.journal:
+            library.journal.close()
+            reloaded = Library(books_file=library.books_file, members_file=library.members_file,
+                               holds_file=library.holds_file, journal=options["journal"])
+            if snapshot(reloaded) != snapshot(library):
+                errors.append("journal replay does not match the in-memory state")
+            reloaded.journal.close()
+        return per_thread * threads / elapsed, errors, sum(local["handed on held"] for local in tally)
+
+
+if __name__ == "__main__":
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{operations:,} random borrow/return ops on {HOT_BOOKS} hot books, {MEMBERS} members\n")
+    failed = False
+    for label, options in (("in-memory", {}),
+                           ("journal+fsync", {"journal": True, "journal_fsync": True})):
+        print(label)
+        for threads in THREADS:
+            rate, errors, _ = run(threads, operations, **options)
+            status = "OK" if not errors else f"{len(errors)} VIOLATIONS: {errors[:3]}"
+            print(f"  {threads:>2} threads | {rate:>10,.0f} ops/s | {status}")
+            failed = failed or bool(errors)
+
+    # One thread, so the seeded traffic (and whether held books get handed on) is reproducible
+    print(f"crowded: {CROWDED_MEMBERS} members, 1 thread")
+    rate, errors, held = run(1, operations, CROWDED_MEMBERS)
+    if not held:
+        errors.append("no return handed on a book the returning member was waiting for")
+    status = "OK" if not errors else f"{len(errors)} VIOLATIONS: {errors[:3]}"
+    print(f"   1 thread  | {rate:>10,.0f} ops/s | {held:,} held books handed on | {status}")
+    failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,55 @@
+# Copy the JSON library files (books.json / members.json / holds.json) into a SQLite database
+#
+# Usage: python migrate_to_sqlite.py [--books books.json] [--members members.json] [--holds holds.json]
+#                                    [--db library.db]
+# Then run the system with: python Library_Management_System_PROJ.py --sqlite
+
+import argparse
+import json
+import time
+
+from Library_Management_System_PROJ import Library, SQLiteStorage
+
+
+def read_json_list(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"{path} not found, skipping.")
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate JSON library data to SQLite")
+    parser.add_argument("--books", default=Library.BOOKS_FILE)
+    parser.add_argument("--members", default=Library.MEMBERS_FILE)
+    parser.add_argument("--holds", default=Library.HOLDS_FILE)
+    parser.add_argument("--db", default=Library.DB_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    books = read_json_list(args.books)
+    members = read_json_list(args.members)
+    holds = read_json_list(args.holds)
+
+    # Loans live on the book rows (borrowed_by); report anything that disagrees with them
+    borrowed_by = {b["isbn"]: b.get("borrowed_by") for b in books}
+    member_ids = {m["member_id"] for m in members}
+    for m in members:
+        for isbn in m.get("borrowed_books", []):
+            if borrowed_by.get(isbn) != m["member_id"]:
+                print(f"Warning: member {m['member_id']} lists {isbn}, which the book does not record.")
+    for isbn, member_id in borrowed_by.items():
+        if member_id and member_id not in member_ids:
+            print(f"Warning: book {isbn} is borrowed by unknown member {member_id}.")
+
+    store = SQLiteStorage(args.db)
+    store.import_records(books, members, holds)
+    print(f"Migrated {store.count('books')} books, {store.count('members')} members and "
+          f"{store.count('holds')} holds to {args.db} in {time.perf_counter() - start:.2f}s")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,469 +1,1245 @@
-import requests
-import json
-from datetime import datetime, timedelta
-from pathlib import Path
-import time
-from typing import Optional, Dict, Any, List    
-from collections import defaultdict
-
-# ==============================================================================
-# FALLBACK FOR MISSING 'colorama' LIBRARY
-# If colorama is not installed, the application defines dummy classes to prevent 
-# a ModuleNotFoundError and runs successfully without terminal colors.
-# ==============================================================================
-try:
-    from colorama import Fore, Style, init
-    init(autoreset=True)
-except ImportError:
-    class DummyColor:
-        def __getattr__(self, name):
-            return ''
-    
-    class DummyStyle:
-        def __getattr__(self, name):
-            return ''
-
-    Fore = DummyColor()
-    Style = DummyColor()
-    def init(autoreset=True):
-        pass
-    print("WARNING: 'colorama' not found. Running without terminal colors.")
-# End of colorama fallback block
-# ==============================================================================
-
-
-# ==============================================================================
-# 0. CONFIGURATION & API KEY
-# NOTE: Replace this placeholder with your actual OpenWeatherMap API key.
-# ==============================================================================
-# 🎯 EXAMPLE: I have added a sample key structure here. Replace this!
-OPENWEATHER_API_KEY = "af7d9a1704d9bfafd46b79c71a4dda29" 
-
-if OPENWEATHER_API_KEY == "YOUR_API_KEY_HERE":
-    print(Fore.RED + "WARNING: Please replace 'YOUR_API_KEY_HERE' with a valid OpenWeatherMap API key.")
-
-# Cache duration set to 15 minutes (900 seconds)
-CACHE_DURATION = 900 
-
-# ==============================================================================
-# 1. API CLIENT MODULE (Task 3 & Caching)
-# ==============================================================================
-
-class WeatherAPI:
-    """Handles all weather API interactions with caching and error handling."""
-    
-    def __init__(self, api_key: str, base_url: str = "http://api.openweathermap.org/data/2.5"):
-        self.api_key = api_key
-        self.base_url = base_url
-        self.cache_dir = Path("data/cache")
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_duration = CACHE_DURATION
-        
-    def _get_cached_data(self, cache_key: str) -> Optional[Dict]:
-        """Get data from cache if valid"""
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
-        if cache_file.exists():
-            try:
-                # Check if cache is still valid
-                cache_time = cache_file.stat().st_mtime
-                cache_age = time.time() - cache_time
-                if cache_age < self.cache_duration:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        data['cache_age'] = cache_age # Inject cache age for display
-                        return data
-            except Exception as e:
-                # print(f"Cache read error: {e}") # Debugging
-                pass
-        return None
-    
-    def _save_to_cache(self, cache_key: str, data: Dict):
-        """Save data to cache"""
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            # print(f"Cache write error: {e}") # Debugging
-            pass
-    
-    def _make_request(self, endpoint: str, params: Dict, cache_key: str) -> Optional[Dict]:
-        """Make API request with error handling and caching logic"""
-        
-        # 1. Check cache first
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data:
-            print(Fore.GREEN + f"API Status: Using cached data ({int(cached_data['cache_age'] / 60)} min old)")
-            return cached_data
-        
-        # 2. Make live request
-        print(Fore.YELLOW + "API Status: Fetching live data...")
-        try:
-            params['appid'] = self.api_key
-            params['units'] = 'metric'  # Always request metric, parser will convert later
-            
-            response = requests.get(
-                f"{self.base_url}/{endpoint}",
-                params=params,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                self._save_to_cache(cache_key, data)
-                return data
-            
-            # Error Handling (Task 3)
-            elif response.status_code == 401:
-                print(Fore.RED + "Error: Invalid API key. Check API configuration.")
-            elif response.status_code == 404:
-                print(Fore.RED + "Error: City not found")
-            elif response.status_code == 429:
-                print(Fore.RED + "Error: API rate limit exceeded.")
-            else:
-                print(Fore.RED + f"Error: API request failed with status {response.status_code}")
-                
-        except requests.exceptions.Timeout:
-            print(Fore.RED + "Error: Request timed out")
-        except requests.exceptions.ConnectionError:
-            print(Fore.RED + "Error: Network connection error.")
-        except Exception as e:
-            print(Fore.RED + f"An unexpected error occurred: {e}")
-            
-        return None
-    
-    def get_current_weather(self, city: str, country_code: str = None) -> Optional[Dict]:
-        """Get current weather for a city"""
-        query = city
-        if country_code:
-            query = f"{city},{country_code}"
-        
-        cache_key = f"current_{city}_{country_code}".replace(' ', '_')
-        params = {'q': query}
-        return self._make_request("weather", params, cache_key)
-
-    def get_forecast(self, city: str, country_code: str = None) -> Optional[Dict]:
-        """Get 5-day/3-hour forecast for a city"""
-        query = city
-        if country_code:
-            query = f"{city},{country_code}"
-            
-        cache_key = f"forecast_{city}_{country_code}".replace(' ', '_')
-        params = {'q': query}
-        return self._make_request("forecast", params, cache_key)
-
-
-# ==============================================================================
-# 2. DATA PROCESSING MODULE (Task 4)
-# ==============================================================================
-
-class WeatherParser:
-    """Parses raw JSON data into a structured format and handles conversions."""
-
-    def __init__(self, unit: str = 'C'):
-        self.unit = unit
-        self.condition_icons = {
-            'Clear': '☀️',
-            'Clouds': '☁️',
-            'Rain': '🌧️',
-            'Drizzle': '🌦️',
-            'Thunderstorm': '⛈️',
-            'Snow': '❄️',
-            'Mist': '🌫️',
-            'Smoke': '🌫️',
-            'Haze': '🌫️',
-            'Dust': '💨',
-            'Fog': '🌫️',
-            'Sand': '💨',
-            'Ash': '💨',
-            'Squall': '🌬️',
-            'Tornado': '🌪️',
-        }
-
-    def _c_to_f(self, temp_c: float) -> float:
-        """Converts Celsius to Fahrenheit."""
-        return (temp_c * 9/5) + 32
-
-    def _convert_temp(self, temp_c: float) -> float:
-        """Applies unit conversion based on self.unit."""
-        if self.unit == 'F':
-            return round(self._c_to_f(temp_c))
-        return round(temp_c)
-
-    def parse_current_weather(self, data: Dict[str, Any]) -> Optional[Dict]:
-        """Parses current weather JSON."""
-        if not data or 'main' not in data:
-            return None
-        
-        # Get weather details
-        temp_c = data['main']['temp']
-        feels_like_c = data['main']['feels_like']
-        
-        # Format times
-        sunrise = datetime.fromtimestamp(data['sys']['sunrise']).strftime('%H:%M')
-        sunset = datetime.fromtimestamp(data['sys']['sunset']).strftime('%H:%M')
-        last_updated = datetime.fromtimestamp(data.get('dt', time.time())).strftime('%Y-%m-%d %H:%M:%S')
-
-        # Get main condition and description
-        main_condition = data['weather'][0]['main']
-        condition_desc = data['weather'][0]['description'].capitalize()
-        icon = self.condition_icons.get(main_condition, '❓')
-
-        return {
-            'location': f"{data['name']}, {data['sys']['country']}",
-            'last_updated': last_updated,
-            'temp': self._convert_temp(temp_c),
-            'temp_unit': self.unit,
-            'feels_like': self._convert_temp(feels_like_c),
-            'condition': f"{condition_desc} {icon}",
-            'humidity': data['main']['humidity'],
-            'wind_speed_kmh': round(data['wind']['speed'] * 3.6), # m/s to km/h
-            'pressure': data['main']['pressure'],
-            'visibility_km': round(data.get('visibility', 0) / 1000), # m to km
-            'sunrise': sunrise,
-            'sunset': sunset,
-            'cache_age': data.get('cache_age'),
-        }
-
-    def parse_forecast(self, data: Dict[str, Any]) -> Optional[List[Dict]]:
-        """Parses 5-day/3-hour forecast into daily summaries."""
-        if not data or 'list' not in data:
-            return None
-
-        daily_data = defaultdict(lambda: {
-            'temps': [], 'humidity': [], 'conditions': [], 'min_temp': float('inf'), 'max_temp': float('-inf')
-        })
-
-        # Process the 3-hour list
-        for item in data['list']:
-            dt_object = datetime.fromtimestamp(item['dt'])
-            date_key = dt_object.date()
-
-            temp = item['main']['temp']
-            
-            daily_data[date_key]['temps'].append(temp)
-            daily_data[date_key]['humidity'].append(item['main']['humidity'])
-            daily_data[date_key]['conditions'].append(item['weather'][0]['main'])
-            
-            # Update min/max across all 3-hour slots
-            daily_data[date_key]['min_temp'] = min(daily_data[date_key]['min_temp'], item['main']['temp_min'])
-            daily_data[date_key]['max_temp'] = max(daily_data[date_key]['max_temp'], item['main']['temp_max'])
-
-        # Structure the final 5-day forecast
-        forecast_list = []
-        for date_key, day_data in sorted(daily_data.items())[:5]: # Take only the next 5 days
-            
-            # Get the most frequent condition (simple mode)
-            condition_counts = defaultdict(int)
-            for cond in day_data['conditions']:
-                condition_counts[cond] += 1
-            most_frequent_condition = max(condition_counts, key=condition_counts.get)
-            icon = self.condition_icons.get(most_frequent_condition, '❓')
-            
-            # Calculate average humidity
-            avg_humidity = round(sum(day_data['humidity']) / len(day_data['humidity']))
-
-            forecast_list.append({
-                'day': date_key.strftime('%a %d %b'),
-                'icon': icon,
-                'min': self._convert_temp(day_data['min_temp']),
-                'max': self._convert_temp(day_data['max_temp']),
-                'unit': self.unit,
-                'condition': most_frequent_condition,
-                'avg_humidity': avg_humidity,
-            })
-
-        return forecast_list
-
-# ==============================================================================
-# 3. DISPLAY MODULE (Task 5)
-# ==============================================================================
-
-class WeatherDisplay:
-    """Formats and prints weather data to the console with colors and ASCII art."""
-
-    def __init__(self, parser: WeatherParser):
-        self.parser = parser
-
-    def _get_temp_color(self, temp: float, unit: str) -> str:
-        """Returns color based on temperature."""
-        thresholds = {'C': (0, 25), 'F': (32, 77)} # Cold, Mild, Hot thresholds
-        cold, hot = thresholds[unit]
-
-        if temp < cold:
-            return Fore.BLUE  # Cold
-        elif temp > hot:
-            return Fore.RED    # Hot
-        else:
-            return Fore.YELLOW + Style.BRIGHT # Mild/Warm
-
-    def display_current_weather(self, current_data: Dict):
-        """Prints formatted current weather data."""
-        unit = current_data['temp_unit']
-        temp_color = self._get_temp_color(current_data['temp'], unit)
-        
-        # Display cache status if available
-        cache_age_sec = current_data.get('cache_age')
-        cache_msg = ""
-        if cache_age_sec is not None:
-            cache_minutes = int(cache_age_sec / 60)
-            cache_msg = f"(Cached: {cache_minutes} min old)"
-        
-        print("\n" + "="*50)
-        print(Fore.CYAN + Style.BRIGHT + "🌤️  WEATHER DASHBOARD")
-        print("="*50)
-        
-        print(f"📍 Current Location: {Fore.YELLOW}{current_data['location']}{Style.RESET_ALL}")
-        print(f"🕐 Last Updated: {current_data['last_updated']} {cache_msg}\n")
-        
-        print(Fore.WHITE + "Current Weather:")
-        print("────────────────")
-        print(f"Temperature:   {temp_color}{current_data['temp']}°{unit} ({Style.RESET_ALL}Feels like: {self._get_temp_color(current_data['feels_like'], unit)}{current_data['feels_like']}°{unit}{Style.RESET_ALL})")
-        print(f"Conditions:    {current_data['condition']}")
-        print(f"Humidity:      {current_data['humidity']}%")
-        print(f"Wind:          {current_data['wind_speed_kmh']} km/h")
-        print(f"Pressure:      {current_data['pressure']} hPa")
-        print(f"Visibility:    {current_data['visibility_km']} km")
-        print(f"Sunrise:       {current_data['sunrise']}")
-        print(f"Sunset:        {current_data['sunset']}")
-
-    def display_forecast(self, forecast_data: List[Dict]):
-        """Prints formatted 5-day forecast."""
-        if not forecast_data:
-            return
-            
-        unit = forecast_data[0]['unit']
-        
-        print("\n" + Fore.WHITE + "5-Day Forecast:")
-        print("───────────────")
-        
-        for day in forecast_data:
-            max_temp_color = self._get_temp_color(day['max'], unit)
-            min_temp_color = self._get_temp_color(day['min'], unit)
-
-            print(f"{Fore.CYAN}{day['day']}: "
-                  f"{day['icon']}  "
-                  f"{max_temp_color}{day['max']}°{unit} "
-                  f"{Style.RESET_ALL}/ "
-                  f"{min_temp_color}{day['min']}°{unit}{Style.RESET_ALL}  "
-                  f"(Humidity: {day['avg_humidity']}%)")
-
-# ==============================================================================
-# 4. USER INTERFACE & MAIN LOGIC (Task 6)
-# ==============================================================================
-
-class WeatherApp:
-    """Main application logic and user interface."""
-    
-    def __init__(self, api_key: str, default_city: str = "London"):
-        self.api = WeatherAPI(api_key)
-        self.parser = WeatherParser(unit='C') # Start with Celsius
-        self.display = WeatherDisplay(self.parser)
-        self.current_city = default_city
-        self.favorites = {'London': 'GB', 'Paris': 'FR', 'Tokyo': 'JP'}
-        
-    def _fetch_and_display(self, city: str):
-        """Fetches and displays both current weather and forecast."""
-        
-        # 1. Fetch Current Weather
-        current_json = self.api.get_current_weather(city)
-        if not current_json:
-            return
-        
-        current_data = self.parser.parse_current_weather(current_json)
-        if current_data:
-            self.current_city = current_data['location']
-            self.display.display_current_weather(current_data)
-        
-        # 2. Fetch Forecast
-        forecast_json = self.api.get_forecast(city)
-        if not forecast_json:
-            return
-            
-        forecast_data = self.parser.parse_forecast(forecast_json)
-        if forecast_data:
-            self.display.display_forecast(forecast_data)
-
-    def _set_units(self, unit: str):
-        """Switches display units between C and F."""
-        unit = unit.upper()
-        if unit in ['C', 'F']:
-            self.parser.unit = unit
-            print(Fore.GREEN + f"\nUnits set to: {unit}ahrenheits" if unit == 'F' else f"\nUnits set to: {unit}elsius")
-            self._fetch_and_display(self.current_city.split(',')[0].strip())
-        else:
-            print(Fore.RED + "Invalid unit. Use 'C' or 'F'.")
-
-    def _show_favorites(self):
-        """Displays saved favorite cities."""
-        print("\n" + Fore.YELLOW + "⭐ Favorite Cities:")
-        if not self.favorites:
-            print(Fore.WHITE + "No favorites saved.")
-            return
-
-        for i, (city, code) in enumerate(self.favorites.items()):
-            print(f" {i+1}. {city}, {code}")
-        
-    def _help(self):
-        """Displays command help."""
-        print("\n" + Fore.CYAN + "Available Commands:")
-        print("-" * 20)
-        print(Fore.YELLOW + "search [city name]" + Fore.WHITE + " - Search for a new city (e.g., search Tokyo)")
-        print(Fore.YELLOW + "units [C/F]" + Fore.WHITE + "    - Switch temperature units (e.g., units F)")
-        print(Fore.YELLOW + "refresh" + Fore.WHITE + "        - Refresh data for the current city")
-        print(Fore.YELLOW + "favs" + Fore.WHITE + "           - Show favorite cities")
-        print(Fore.YELLOW + "help" + Fore.WHITE + "           - Show this help menu")
-        print(Fore.YELLOW + "quit" + Fore.WHITE + "           - Exit the application")
-        
-    def run(self):
-        """Main application loop."""
-        print(Fore.GREEN + Style.BRIGHT + "Welcome to the Python Weather Dashboard!")
-        self._help()
-        
-        # Initial fetch
-        self._fetch_and_display(self.current_city)
-        
-        while True:
-            try:
-                command = input(Fore.YELLOW + f"\n{self.current_city} [{self.parser.unit}]: " + Style.RESET_ALL).strip().lower()
-                
-                if command == 'quit':
-                    print(Fore.CYAN + "Goodbye!")
-                    break
-                elif command == 'refresh':
-                    self._fetch_and_display(self.current_city.split(',')[0].strip())
-                elif command.startswith('search '):
-                    new_city = command[7:].strip()
-                    if new_city:
-                        self._fetch_and_display(new_city)
-                    else:
-                        print(Fore.RED + "Please specify a city name.")
-                elif command.startswith('units '):
-                    unit = command[6:].strip()
-                    self._set_units(unit)
-                elif command == 'favs':
-                    self._show_favorites()
-                elif command == 'help':
-                    self._help()
-                elif command:
-                    print(Fore.RED + f"Unknown command: '{command}'. Type 'help' for commands.")
-
-            except KeyboardInterrupt:
-                print(Fore.CYAN + "\nGoodbye!")
-                break
-            except Exception as e:
-                print(Fore.RED + f"An internal error occurred: {e}")
-
-
-# ==============================================================================
-# ENTRY POINT
-# ==============================================================================
-
-if __name__ == "__main__":
-    # --- IMPORTANT: Replace the dummy key here with your actual key ---
-    if OPENWEATHER_API_KEY == "YOUR_API_KEY_HERE":
-        print(Fore.RED + "Please replace the API key placeholder before running.")
-    else:
-        app = WeatherApp(api_key=OPENWEATHER_API_KEY, default_city="New York")
+import requests
+from requests.adapters import HTTPAdapter
+import json
+import os
+import random
+import threading
+import heapq
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+import time
+from typing import Optional, Dict, Any, List, Tuple
+from collections import defaultdict, OrderedDict
+from operator import itemgetter
+
+# ==============================================================================
+# FALLBACK FOR MISSING 'colorama' LIBRARY
+# If colorama is not installed, the application defines dummy classes to prevent 
+# a ModuleNotFoundError and runs successfully without terminal colors.
+# ==============================================================================
+try:
+    from colorama import Fore, Style, init
+    init(autoreset=True)
+except ImportError:
+    class DummyColor:
+        def __getattr__(self, name):
+            return ''
+    
+    class DummyStyle:
+        def __getattr__(self, name):
+            return ''
+
+    Fore = DummyColor()
+    Style = DummyColor()
+    def init(autoreset=True):
+        pass
+    print("WARNING: 'colorama' not found. Running without terminal colors.")
+# End of colorama fallback block
+# ==============================================================================
+
+# NumPy is only needed for batched forecast parsing and the history store; without it the batch
+# parser falls back to a loop and no history is kept
+try:
+    import numpy as np
+    from weather_history import WeatherHistory
+except ImportError:
+    np = None
+    WeatherHistory = None
+
+from weather_cache_codec import MAGIC as COMPACT_MAGIC, decode_payload, encode_payload
+
+
+# ==============================================================================
+# 0. CONFIGURATION & API KEY
+# NOTE: Replace this placeholder with your actual OpenWeatherMap API key.
+# ==============================================================================
+# 🎯 EXAMPLE: I have added a sample key structure here. Replace this!
+OPENWEATHER_API_KEY = "af7d9a1704d9bfafd46b79c71a4dda29" 
+
+if OPENWEATHER_API_KEY == "YOUR_API_KEY_HERE":
+    print(Fore.RED + "WARNING: Please replace 'YOUR_API_KEY_HERE' with a valid OpenWeatherMap API key.")
+
+# Cache duration set to 15 minutes (900 seconds)
+CACHE_DURATION = 900 
+
+# Expired entries may still be served for this long (30 minutes) while a background refresh runs
+STALE_DURATION = 1800
+
+# Two-tier cache limits: payloads kept in memory, and the size budget of data/cache on disk
+MEMORY_CACHE_ENTRIES = 1000
+DISK_CACHE_BYTES = 50 * 1024 * 1024
+
+# On-disk cache format: 'json' (the raw API response) or 'binary' (only the fields the parser
+# reads, see weather_cache_codec.py); payloads that don't fit the binary layout are kept as JSON
+CACHE_FORMAT = 'json'
+CACHE_SUFFIXES = {'json': '.json', 'binary': '.wxc'}
+
+# Upper bound on simultaneous API requests during batch refreshes (also the HTTP connection pool size)
+MAX_CONCURRENT_REQUESTS = 16
+
+# Client-side rate limit (the free OpenWeatherMap plan allows 60 calls/minute) and retry policy
+RATE_LIMIT_PER_MINUTE = 60
+RATE_LIMIT_BURST = 10
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0   # seconds; doubles on every retry, with full jitter
+BACKOFF_CAP = 30.0
+
+# Request priorities: interactive lookups are always sent before batch refreshes
+INTERACTIVE, BATCH = 0, 1
+
+# Background prefetch: every PREFETCH_INTERVAL seconds the PREFETCH_TOP_N most asked-for cities
+# (plus favorites) are refreshed between PREFETCH_LEAD and PREFETCH_LEAD + PREFETCH_SPREAD seconds
+# before their cache entries expire. Query counts halve every PREFETCH_HALF_LIFE seconds.
+PREFETCH_TOP_N = 20
+PREFETCH_INTERVAL = 30
+PREFETCH_LEAD = 60
+PREFETCH_SPREAD = 120
+PREFETCH_HALF_LIFE = 3600
+
+# ==============================================================================
+# 1. API CLIENT MODULE (Task 3 & Caching)
+# ==============================================================================
+
+class MemoryCache:
+    """Bounded in-process LRU of API payloads; entries are dropped after ttl seconds. Thread-safe."""
+
+    def __init__(self, max_entries: int = MEMORY_CACHE_ENTRIES, ttl: float = CACHE_DURATION):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # cache_key -> (saved_at, data), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, cache_key: str, max_age: Optional[float] = None) -> Optional[Tuple[float, Dict]]:
+        """Returns (saved_at, data) if the entry is present and younger than max_age (default ttl)."""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            age = time.time() - entry[0]
+            if age >= self.ttl:
+                del self._entries[cache_key]
+            if age >= min(max_age or self.ttl, self.ttl):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry
+
+    def peek(self, cache_key: str, max_age: float) -> Optional[Tuple[float, Dict]]:
+        """Like get, but leaves the counters and the LRU order alone."""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+        if entry is None or time.time() - entry[0] >= max_age:
+            return None
+        return entry
+
+    def put(self, cache_key: str, data: Dict, saved_at: float):
+        """Stores a payload, evicting the least recently used entries past max_entries."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[cache_key] = (saved_at, data)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RateLimiter:
+    """Token bucket shared by all threads: rate requests/second, bursts of up to capacity.
+
+    A BATCH caller only takes a token while no INTERACTIVE caller is waiting, so user lookups
+    jump the queue of a fleet refresh. pause() stops everyone, e.g. on a 429 with Retry-After.
+    rate=None disables the bucket (pauses still apply), for local stubs without a quota.
+    """
+
+    def __init__(self, rate: Optional[float] = RATE_LIMIT_PER_MINUTE / 60, capacity: float = RATE_LIMIT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = [0, 0]  # callers waiting per priority lane
+        self._cond = threading.Condition()
+        self.granted = [0, 0]
+        self.waited = [0.0, 0.0]
+        self.pauses = 0
+
+    def acquire(self, priority: int = INTERACTIVE):
+        """Blocks until one request may be sent."""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self.rate is not None:
+                        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if now < self._paused_until:
+                        delay = self._paused_until - now
+                    elif priority == BATCH and self._waiting[INTERACTIVE]:
+                        delay = None  # woken once the interactive callers are through
+                    elif self.rate is None:
+                        break
+                    elif self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    else:
+                        delay = (1 - self._tokens) / self.rate
+                    self._cond.wait(delay)
+            finally:
+                self._waiting[priority] -= 1
+                if priority == INTERACTIVE:
+                    self._cond.notify_all()
+            self.granted[priority] += 1
+            self.waited[priority] += time.monotonic() - start
+
+    def pause(self, seconds: float):
+        """Holds back every caller for the given time and empties the bucket."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+            self.pauses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests let through and average wait per lane."""
+        return {
+            'interactive_granted': self.granted[INTERACTIVE],
+            'batch_granted': self.granted[BATCH],
+            'interactive_avg_wait': self.waited[INTERACTIVE] / max(self.granted[INTERACTIVE], 1),
+            'batch_avg_wait': self.waited[BATCH] / max(self.granted[BATCH], 1),
+            'pauses': self.pauses,
+        }
+
+
+def _retry_after(response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), if any."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPBackend:
+    """Sends WeatherAPI's requests to OpenWeatherMap (or a compatible server) over HTTP.
+
+    Any object with get(endpoint, params, timeout) can stand in for it: the result needs
+    status_code, headers and json() like a requests.Response, and network failures are raised as
+    requests.exceptions.Timeout / ConnectionError. weather_stub_server.StubBackend serves
+    synthetic or recorded payloads in-process that way.
+    """
+
+    def __init__(self, base_url: str = "http://api.openweathermap.org/data/2.5",
+                 max_connections: int = MAX_CONCURRENT_REQUESTS):
+        self.base_url = base_url
+        # One pooled session shared by all threads: keep-alive connections are reused across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, endpoint: str, params: Dict, timeout: float) -> requests.Response:
+        return self.session.get(f"{self.base_url}/{endpoint}", params=params, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class WeatherAPI:
+    """Handles all weather API interactions with caching and error handling."""
+    
+    def __init__(self, api_key: str, base_url: str = "http://api.openweathermap.org/data/2.5",
+                 cache_dir: str = "data/cache", memory_entries: int = MEMORY_CACHE_ENTRIES,
+                 max_disk_bytes: int = DISK_CACHE_BYTES, max_connections: int = MAX_CONCURRENT_REQUESTS,
+                 cache_duration: float = CACHE_DURATION, stale_duration: float = STALE_DURATION,
+                 limiter: Optional[RateLimiter] = None, max_retries: int = MAX_RETRIES,
+                 cache_format: str = CACHE_FORMAT, backend: Optional[HTTPBackend] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if cache_format not in CACHE_SUFFIXES:
+            raise ValueError(f"cache_format must be one of {sorted(CACHE_SUFFIXES)}")
+        self.cache_format = cache_format
+        self.cache_suffix = CACHE_SUFFIXES[cache_format]
+        self.cache_duration = cache_duration
+        self.stale_duration = stale_duration
+        self.memory = MemoryCache(memory_entries, cache_duration + stale_duration)
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        self.disk_evictions = 0
+        self._disk_lock = threading.Lock()  # guards the disk index and counters
+        self._scan_disk_cache()
+
+        # Where requests go: the real API by default, or e.g. a stub for offline load tests
+        self.backend = backend or HTTPBackend(base_url, max_connections)
+
+        # Single-flight: cache_key -> Future of the one upstream request everybody waits on
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather-refresh")
+        self.upstream_requests = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+
+        # Shared rate limit and retry policy for every thread using this client
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.throttled = 0
+        self.retries = 0
+
+    def _scan_disk_cache(self):
+        """Indexes the existing cache files, oldest first, so the disk budget can be enforced."""
+        files = []
+        for cache_file in self.cache_dir.glob(f"*{self.cache_suffix}"):
+            try:
+                stat = cache_file.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, cache_file.stem, stat.st_size))
+        self._disk_files = OrderedDict((key, size) for _, key, size in sorted(files))
+        self._disk_bytes = sum(self._disk_files.values())
+
+    def _evict_disk_cache(self):
+        """Deletes the oldest cache files until the directory fits in max_disk_bytes."""
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk_files) > 1:
+            cache_key, size = self._disk_files.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                (self.cache_dir / f"{cache_key}{self.cache_suffix}").unlink()
+                self.disk_evictions += 1
+            except OSError:
+                pass
+
+    def _get_cached_data(self, cache_key: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Get data from cache if younger than max_age (default: still valid); memory first, then disk"""
+        max_age = max_age or self.cache_duration
+        entry = self.memory.get(cache_key, max_age)
+        if entry:
+            saved_at, data = entry
+            return dict(data, cache_age=time.time() - saved_at) # Copy, so the cached payload stays clean
+
+        cache_file = self.cache_dir / f"{cache_key}{self.cache_suffix}"
+        
+        if cache_file.exists():
+            try:
+                # Check if cache is still valid
+                cache_time = cache_file.stat().st_mtime
+                cache_age = time.time() - cache_time
+                if cache_age < max_age:
+                    with open(cache_file, 'rb') as f:
+                        data = self._decode(f.read())
+                    with self._disk_lock:
+                        self.disk_hits += 1
+                    self.memory.put(cache_key, data, cache_time)
+                    return dict(data, cache_age=cache_age) # Inject cache age for display
+            except Exception as e:
+                # print(f"Cache read error: {e}") # Debugging
+                pass
+        return None
+    
+    def _encode(self, data: Dict) -> bytes:
+        """Cache file contents in self.cache_format (JSON when a payload doesn't fit the binary layout)"""
+        if self.cache_format == 'binary':
+            try:
+                return encode_payload(data)
+            except ValueError:
+                pass
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def _decode(blob: bytes) -> Dict:
+        """Payload from a cache file written by _encode, whichever way it was stored"""
+        if blob[:len(COMPACT_MAGIC)] == COMPACT_MAGIC:
+            return decode_payload(blob)
+        return json.loads(blob)
+
+    def _save_to_cache(self, cache_key: str, data: Dict):
+        """Save data to both cache tiers, keeping the disk cache within its size budget"""
+        self.memory.put(cache_key, data, time.time())
+        cache_file = self.cache_dir / f"{cache_key}{self.cache_suffix}"
+        temp_file = self.cache_dir / f"{cache_key}.{threading.get_ident()}.tmp"
+        try:
+            payload = self._encode(data)
+            with open(temp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_file, cache_file) # Readers in other threads never see a half-written file
+        except Exception as e:
+            # print(f"Cache write error: {e}") # Debugging
+            return
+        size = len(payload)
+        with self._disk_lock:
+            self._disk_bytes += size - self._disk_files.pop(cache_key, 0)
+            self._disk_files[cache_key] = size
+            self._evict_disk_cache()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for both cache tiers."""
+        lookups = self.memory.hits + self.memory.misses
+        return {
+            'memory_hits': self.memory.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.memory.misses - self.disk_hits,
+            'hit_rate': (self.memory.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self.memory),
+            'memory_evictions': self.memory.evictions,
+            'disk_files': len(self._disk_files),
+            'disk_bytes': self._disk_bytes,
+            'disk_evictions': self.disk_evictions,
+            'stale_hits': self.stale_hits,
+            'coalesced': self.coalesced,
+            'upstream_requests': self.upstream_requests,
+        }
+
+    def request_stats(self) -> Dict[str, Any]:
+        """Upstream traffic: requests sent, 429 answers, retries and the rate limiter's lanes."""
+        return dict(self.limiter.stats(), upstream_requests=self.upstream_requests,
+                    throttled=self.throttled, retries=self.retries)
+    
+    def _make_request(self, endpoint: str, params: Dict, cache_key: str, quiet: bool = False,
+                      priority: int = INTERACTIVE) -> Optional[Dict]:
+        """Make API request with error handling and caching logic (quiet=True silences status output)"""
+        say = (lambda message: None) if quiet else print
+        
+        # 1. Check cache first (an expired entry within the stale window is served while it refreshes)
+        cached_data = self._get_cached_data(cache_key, self.cache_duration + self.stale_duration)
+        if cached_data:
+            minutes = int(cached_data['cache_age'] / 60)
+            if cached_data['cache_age'] < self.cache_duration:
+                say(Fore.GREEN + f"API Status: Using cached data ({minutes} min old)")
+            else:
+                with self._inflight_lock:
+                    self.stale_hits += 1
+                self._refresh_in_background(endpoint, params, cache_key)
+                say(Fore.GREEN + f"API Status: Using cached data ({minutes} min old), refreshing in background")
+            return cached_data
+        
+        # 2. Make live request, shared with anyone else asking for the same key right now
+        return self._fetch_once(endpoint, params, cache_key, say, priority)
+
+    def _fetch_once(self, endpoint: str, params: Dict, cache_key: str, say,
+                    priority: int = INTERACTIVE, recheck: bool = True) -> Optional[Dict]:
+        """Single-flight: concurrent callers for one cache_key share a single upstream request.
+
+        recheck=False always goes upstream, even if the cache holds a still-valid entry (prefetch).
+        """
+        with self._inflight_lock:
+            flight = self._inflight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[cache_key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            say(Fore.YELLOW + "API Status: Waiting for a request already in flight...")
+            return flight.result()
+
+        try:
+            # A previous leader may have filled the cache between our lookup and taking the lead
+            entry = self.memory.peek(cache_key, self.cache_duration) if recheck else None
+            data = entry[1] if entry else self._fetch(endpoint, params, cache_key, say, priority)
+            flight.set_result(data)
+            return data
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+
+    def _refresh_in_background(self, endpoint: str, params: Dict, cache_key: str):
+        """Starts a quiet refresh of cache_key unless one is already running."""
+        with self._inflight_lock:
+            if cache_key in self._inflight:
+                return
+        self._refresher.submit(self._fetch_once, endpoint, dict(params), cache_key, lambda message: None, BATCH)
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter, so retrying threads don't fire in lockstep."""
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    def _fetch(self, endpoint: str, params: Dict, cache_key: str, say,
+               priority: int = INTERACTIVE) -> Optional[Dict]:
+        """Upstream API call under the rate limit, retrying 429s, 5xx, network errors and bodies
+        that aren't valid JSON."""
+        params['appid'] = self.api_key
+        params['units'] = 'metric'  # Always request metric, parser will convert later
+        say(Fore.YELLOW + "API Status: Fetching live data...")
+
+        for attempt in range(self.max_retries + 1):
+            last_try = attempt == self.max_retries
+            self.limiter.acquire(priority)
+            with self._inflight_lock:
+                self.upstream_requests += 1
+                self.retries += attempt > 0
+            try:
+                response = self.backend.get(endpoint, params, timeout=10)
+            except requests.exceptions.Timeout:
+                problem = "Request timed out"
+            except requests.exceptions.ConnectionError:
+                problem = "Network connection error"
+            except Exception as e:
+                say(Fore.RED + f"An unexpected error occurred: {e}")
+                return None
+            else:
+                if response.status_code == 200:
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        problem = "Invalid response from the API"  # e.g. a truncated body
+                    else:
+                        self._save_to_cache(cache_key, data)
+                        return data
+                
+                # Error Handling (Task 3)
+                elif response.status_code == 401:
+                    say(Fore.RED + "Error: Invalid API key. Check API configuration.")
+                    return None
+                elif response.status_code == 404:
+                    say(Fore.RED + "Error: City not found")
+                    return None
+                elif response.status_code == 429:
+                    with self._inflight_lock:
+                        self.throttled += 1
+                    problem = "API rate limit exceeded"
+                    wait = _retry_after(response)
+                    if wait is not None:
+                        # The server said when to come back: hold back every thread until then (the
+                        # emptied bucket then meters the restart, so there is no stampede)
+                        self.limiter.pause(wait)
+                        if not last_try:
+                            say(Fore.YELLOW + f"API Status: Rate limited, retrying in {wait:.0f}s...")
+                        continue
+                elif response.status_code >= 500:
+                    problem = f"API request failed with status {response.status_code}"
+                else:
+                    say(Fore.RED + f"Error: API request failed with status {response.status_code}")
+                    return None
+
+            if last_try:
+                break
+            delay = self._backoff(attempt)
+            say(Fore.YELLOW + f"API Status: {problem}, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+        say(Fore.RED + f"Error: {problem}.")
+        return None
+    
+    @staticmethod
+    def cache_key(kind: str, city: str, country_code: str = None) -> str:
+        """Cache key of a 'current' or 'forecast' payload"""
+        return f"{kind}_{city}_{country_code}".replace(' ', '_')
+
+    def cache_age(self, cache_key: str) -> Optional[float]:
+        """Seconds since cache_key was last saved (memory, else disk), or None if it isn't cached."""
+        entry = self.memory.peek(cache_key, self.cache_duration + self.stale_duration)
+        if entry:
+            return time.time() - entry[0]
+        try:
+            return time.time() - (self.cache_dir / f"{cache_key}{self.cache_suffix}").stat().st_mtime
+        except OSError:
+            return None
+
+    def prefetch(self, kind: str, city: str, country_code: str = None) -> bool:
+        """Refreshes a cached payload ahead of its expiry, in the BATCH lane. True if it was fetched."""
+        query = f"{city},{country_code}" if country_code else city
+        endpoint = "weather" if kind == 'current' else "forecast"
+        data = self._fetch_once(endpoint, {'q': query}, self.cache_key(kind, city, country_code),
+                                lambda message: None, BATCH, recheck=False)
+        return data is not None
+
+    def get_current_weather(self, city: str, country_code: str = None, quiet: bool = False,
+                            priority: int = INTERACTIVE) -> Optional[Dict]:
+        """Get current weather for a city"""
+        query = city
+        if country_code:
+            query = f"{city},{country_code}"
+        
+        cache_key = self.cache_key('current', city, country_code)
+        params = {'q': query}
+        return self._make_request("weather", params, cache_key, quiet, priority)
+
+    def get_forecast(self, city: str, country_code: str = None, quiet: bool = False,
+                     priority: int = INTERACTIVE) -> Optional[Dict]:
+        """Get 5-day/3-hour forecast for a city"""
+        query = city
+        if country_code:
+            query = f"{city},{country_code}"
+            
+        cache_key = self.cache_key('forecast', city, country_code)
+        params = {'q': query}
+        return self._make_request("forecast", params, cache_key, quiet, priority)
+
+
+class PrefetchScheduler:
+    """Keeps the cache warm for the cities users ask about most.
+
+    record() is called for every interactive lookup and keeps an exponentially decayed query
+    count per city. run_once() (every interval seconds on a daemon thread once started) refreshes
+    the top_n hottest cities and the pinned ones shortly before their entries expire. Each cache
+    key gets a fixed offset within `spread`, so entries saved together are not all refreshed in
+    the same tick. Prefetches go through the BATCH lane of the rate limiter.
+    """
+
+    def __init__(self, api: 'WeatherAPI', top_n: int = PREFETCH_TOP_N, interval: float = PREFETCH_INTERVAL,
+                 lead: float = PREFETCH_LEAD, spread: float = PREFETCH_SPREAD,
+                 half_life: float = PREFETCH_HALF_LIFE, max_workers: int = 4):
+        self.api = api
+        self.top_n = top_n
+        self.interval = interval
+        self.lead = lead
+        self.spread = spread
+        self.half_life = half_life
+        self.kinds = ('current', 'forecast')
+        # Scores are stored as count * 2**((t - epoch) / half_life), so only new queries need
+        # updating and the ranking never changes as time passes
+        self._epoch = time.time()
+        self._scores: Dict[Tuple[str, Optional[str]], float] = {}
+        self._pinned: Dict[Tuple[str, Optional[str]], None] = {}
+        self._unread = set()  # cache keys prefetched and not looked up since
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather-prefetch")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.lookups = 0
+        self.hits = 0
+        self.prefetches = 0
+        self.failed = 0
+        self.useful = 0
+        self.wasted = 0
+
+    def pin(self, cities: Dict[str, Optional[str]]):
+        """Always prefetches these cities (city -> country code, like WeatherApp.favorites)."""
+        with self._lock:
+            self._pinned.update(dict.fromkeys(cities.items()))
+
+    def record(self, kind: str, city: str, country_code: Optional[str], data: Dict):
+        """Counts one lookup of a 'current' or 'forecast' payload and whether it was a fresh cache hit."""
+        now = time.time()
+        hit = data.get('cache_age', self.api.cache_duration) < self.api.cache_duration
+        cache_key = self.api.cache_key(kind, city, country_code)
+        with self._lock:
+            exponent = (now - self._epoch) / self.half_life
+            if exponent > 500:
+                self._rescale(now)
+                exponent = 0.0
+            key = (city, country_code)
+            self._scores[key] = self._scores.get(key, 0.0) + 2.0 ** exponent
+            self.lookups += 1
+            self.hits += hit
+            if cache_key in self._unread:
+                self._unread.discard(cache_key)
+                self.useful += 1
+
+    def _rescale(self, now: float):
+        """Moves the epoch to now before the stored scores overflow, forgetting cities gone cold."""
+        factor = 2.0 ** -((now - self._epoch) / self.half_life)
+        self._scores = {key: score * factor for key, score in self._scores.items() if score * factor > 1e-3}
+        self._epoch = now
+
+    def hottest(self) -> List[Tuple[str, Optional[str]]]:
+        """The top_n most queried (city, country_code) pairs, then any pinned ones not among them."""
+        with self._lock:
+            top = [key for key, _ in heapq.nlargest(self.top_n, self._scores.items(), key=itemgetter(1))]
+            chosen = set(top)
+            return top + [key for key in self._pinned if key not in chosen]
+
+    def _offset(self, cache_key: str) -> float:
+        """Stable per-key share of the spread window"""
+        return zlib.crc32(cache_key.encode('utf-8')) % 1000 / 1000 * self.spread
+
+    def due(self) -> List[Tuple[str, str, Optional[str]]]:
+        """(kind, city, country_code) of the hot entries that expire soon or are missing."""
+        due = []
+        for city, code in self.hottest():
+            for kind in self.kinds:
+                cache_key = self.api.cache_key(kind, city, code)
+                age = self.api.cache_age(cache_key)
+                if age is None or self.api.cache_duration - age <= self.lead + self._offset(cache_key):
+                    due.append((kind, city, code))
+        return due
+
+    def run_once(self) -> int:
+        """Prefetches everything due; returns how many entries were refreshed."""
+        due = self.due()
+        with self._lock:
+            for kind, city, code in due:
+                cache_key = self.api.cache_key(kind, city, code)
+                if cache_key in self._unread:
+                    self.wasted += 1  # the previous prefetch of this entry was never read
+                self._unread.add(cache_key)
+        results = list(self._pool.map(lambda job: self.api.prefetch(*job), due))
+        with self._lock:
+            self.prefetches += len(due)
+            for (kind, city, code), ok in zip(due, results):
+                if not ok:
+                    self.failed += 1
+                    self._unread.discard(self.api.cache_key(kind, city, code))
+        return results.count(True)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                pass  # a failed round is retried on the next tick
+
+    def start(self):
+        """Runs run_once every interval seconds on a daemon thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="weather-prefetcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background thread (after the round in progress, if any)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Fresh-hit rate of recorded lookups, and how many prefetches were read before the next one."""
+        with self._lock:
+            return {
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+                'prefetches': self.prefetches,
+                'failed': self.failed,
+                'useful': self.useful,
+                'wasted': self.wasted,
+                'waste_rate': self.wasted / self.prefetches if self.prefetches else 0.0,
+                'tracked_cities': len(self._scores),
+            }
+
+
+# ==============================================================================
+# 2. DATA PROCESSING MODULE (Task 4)
+# ==============================================================================
+
+class WeatherParser:
+    """Parses raw JSON data into a structured format and handles conversions."""
+
+    def __init__(self, unit: str = 'C'):
+        self.unit = unit
+        self.condition_icons = {
+            'Clear': '☀️',
+            'Clouds': '☁️',
+            'Rain': '🌧️',
+            'Drizzle': '🌦️',
+            'Thunderstorm': '⛈️',
+            'Snow': '❄️',
+            'Mist': '🌫️',
+            'Smoke': '🌫️',
+            'Haze': '🌫️',
+            'Dust': '💨',
+            'Fog': '🌫️',
+            'Sand': '💨',
+            'Ash': '💨',
+            'Squall': '🌬️',
+            'Tornado': '🌪️',
+        }
+
+    def _c_to_f(self, temp_c: float) -> float:
+        """Converts Celsius to Fahrenheit."""
+        return (temp_c * 9/5) + 32
+
+    def _convert_temp(self, temp_c: float) -> float:
+        """Applies unit conversion based on self.unit."""
+        if self.unit == 'F':
+            return round(self._c_to_f(temp_c))
+        return round(temp_c)
+
+    def parse_current_weather(self, data: Dict[str, Any]) -> Optional[Dict]:
+        """Parses current weather JSON."""
+        if not data or 'main' not in data:
+            return None
+        
+        # Get weather details
+        temp_c = data['main']['temp']
+        feels_like_c = data['main']['feels_like']
+        
+        # Format times
+        sunrise = datetime.fromtimestamp(data['sys']['sunrise']).strftime('%H:%M')
+        sunset = datetime.fromtimestamp(data['sys']['sunset']).strftime('%H:%M')
+        updated = int(data.get('dt', time.time()))  # epoch seconds (UTC)
+        last_updated = datetime.fromtimestamp(updated).strftime('%Y-%m-%d %H:%M:%S')
+
+        # Get main condition and description
+        main_condition = data['weather'][0]['main']
+        condition_desc = data['weather'][0]['description'].capitalize()
+        icon = self.condition_icons.get(main_condition, '❓')
+
+        return {
+            'location': f"{data['name']}, {data['sys']['country']}",
+            'last_updated': last_updated,
+            'last_updated_epoch': updated,
+            'temp': self._convert_temp(temp_c),
+            'temp_unit': self.unit,
+            'feels_like': self._convert_temp(feels_like_c),
+            'condition': f"{condition_desc} {icon}",
+            'humidity': data['main']['humidity'],
+            'wind_speed_kmh': round(data['wind']['speed'] * 3.6), # m/s to km/h
+            'pressure': data['main']['pressure'],
+            'visibility_km': round(data.get('visibility', 0) / 1000), # m to km
+            'sunrise': sunrise,
+            'sunset': sunset,
+            'cache_age': data.get('cache_age'),
+        }
+
+    def parse_forecast(self, data: Dict[str, Any]) -> Optional[List[Dict]]:
+        """Parses 5-day/3-hour forecast into daily summaries."""
+        if not data or 'list' not in data:
+            return None
+
+        daily_data = defaultdict(lambda: {
+            'temps': [], 'humidity': [], 'conditions': [], 'min_temp': float('inf'), 'max_temp': float('-inf')
+        })
+
+        # Process the 3-hour list
+        for item in data['list']:
+            dt_object = datetime.fromtimestamp(item['dt'])
+            date_key = dt_object.date()
+
+            temp = item['main']['temp']
+            
+            daily_data[date_key]['temps'].append(temp)
+            daily_data[date_key]['humidity'].append(item['main']['humidity'])
+            daily_data[date_key]['conditions'].append(item['weather'][0]['main'])
+            
+            # Update min/max across all 3-hour slots
+            daily_data[date_key]['min_temp'] = min(daily_data[date_key]['min_temp'], item['main']['temp_min'])
+            daily_data[date_key]['max_temp'] = max(daily_data[date_key]['max_temp'], item['main']['temp_max'])
+
+        # Structure the final 5-day forecast
+        forecast_list = []
+        for date_key, day_data in sorted(daily_data.items())[:5]: # Take only the next 5 days
+            
+            # Get the most frequent condition (simple mode)
+            condition_counts = defaultdict(int)
+            for cond in day_data['conditions']:
+                condition_counts[cond] += 1
+            most_frequent_condition = max(condition_counts, key=condition_counts.get)
+            icon = self.condition_icons.get(most_frequent_condition, '❓')
+            
+            # Calculate average humidity
+            avg_humidity = round(sum(day_data['humidity']) / len(day_data['humidity']))
+
+            forecast_list.append({
+                'day': date_key.strftime('%a %d %b'),
+                'icon': icon,
+                'min': self._convert_temp(day_data['min_temp']),
+                'max': self._convert_temp(day_data['max_temp']),
+                'unit': self.unit,
+                'condition': most_frequent_condition,
+                'avg_humidity': avg_humidity,
+            })
+
+        return forecast_list
+
+    def parse_forecasts(self, payloads: List[Dict[str, Any]]) -> List[Optional[List[Dict]]]:
+        """Parses many forecast payloads at once; same results as parse_forecast on each.
+
+        All 3-hour slots of all payloads are flattened into NumPy columns and grouped by
+        (payload, local date) with one stable sort, so the per-day min/max/humidity/mode work
+        runs as array operations instead of per-slot Python.
+        """
+        if np is None:
+            return [self.parse_forecast(data) for data in payloads]
+
+        # Flatten the slots into columns (map/itemgetter keeps the per-slot field access in C)
+        valid = [bool(data) and 'list' in data for data in payloads]
+        slots = [data['list'] if ok else [] for data, ok in zip(payloads, valid)]
+        lengths = np.fromiter((len(items) for items in slots), dtype=np.int64, count=len(slots))
+        items = [item for city_items in slots for item in city_items]
+        results: List[Optional[List[Dict]]] = [[] if ok else None for ok in valid]
+        if not items:
+            return results
+        city = np.repeat(np.arange(len(slots)), lengths)
+        dt = np.array(list(map(itemgetter('dt'), items)), dtype=np.int64)
+        mains = list(map(itemgetter('main'), items))
+        temp_min = np.array(list(map(itemgetter('temp_min'), mains)), dtype=np.float64)
+        temp_max = np.array(list(map(itemgetter('temp_max'), mains)), dtype=np.float64)
+        humidity = np.array(list(map(itemgetter('humidity'), mains)))
+        conditions = list(map(itemgetter('main'), map(itemgetter(0), map(itemgetter('weather'), items))))
+        condition_names = list(dict.fromkeys(conditions))
+        codes = {name: code for code, name in enumerate(condition_names)}
+        condition = np.array(list(map(codes.__getitem__, conditions)), dtype=np.int64)
+
+        # Local calendar day of each slot; forecasts share a 3-hour grid, so only the distinct
+        # timestamps go through datetime (which also gets DST right)
+        stamps, stamp_index = np.unique(dt, return_inverse=True)
+        stamp_days = np.array([datetime.fromtimestamp(t).date().toordinal() for t in stamps.tolist()],
+                              dtype=np.int64)
+        day = stamp_days[stamp_index]
+
+        # Group by (city, day); the stable sort keeps slot order inside each group
+        order = np.argsort(city * 10**7 + day, kind='stable')
+        city, day, condition = city[order], day[order], condition[order]
+        new_group = np.empty(len(order), dtype=bool)
+        new_group[0] = True
+        new_group[1:] = (city[1:] != city[:-1]) | (day[1:] != day[:-1])
+        starts = np.flatnonzero(new_group)
+        group = np.cumsum(new_group) - 1
+        sizes = np.diff(np.append(starts, len(order)))
+        day_min = np.minimum.reduceat(temp_min[order], starts)
+        day_max = np.maximum.reduceat(temp_max[order], starts)
+        if humidity.dtype.kind in 'iu':
+            day_humidity = np.add.reduceat(humidity[order], starts).tolist()
+        else:
+            # Fractional humidity: add up in Python, in slot order, so the floats round the same way
+            ordered = humidity[order].tolist()
+            day_humidity = [sum(ordered[a:b]) for a, b in zip(starts.tolist(), starts[1:].tolist() + [len(order)])]
+        day_humidity = np.array(day_humidity, dtype=object)
+
+        # Mode condition per group; ties go to the condition seen first that day, like max() over
+        # an insertion-ordered dict
+        cell = group * len(condition_names) + condition
+        counts = np.bincount(cell, minlength=len(starts) * len(condition_names))
+        first_seen = np.full(len(counts), len(order), dtype=np.int64)
+        np.minimum.at(first_seen, cell, np.arange(len(order)))
+        score = (counts * (len(order) + 1) - first_seen).reshape(len(starts), len(condition_names))
+        mode = score.argmax(axis=1)
+
+        # Keep the first 5 days of every city and build the same dicts as parse_forecast
+        group_city = city[starts]
+        first_group = np.searchsorted(group_city, group_city)
+        keep = np.flatnonzero(np.arange(len(starts)) - first_group < 5)
+        day_names = {d: datetime.fromordinal(d).strftime('%a %d %b') for d in stamp_days.tolist()}
+        for c, d, low, high, hum, size, m in zip(
+                group_city[keep].tolist(), day[starts][keep].tolist(),
+                day_min[keep].tolist(), day_max[keep].tolist(), day_humidity[keep].tolist(),
+                sizes[keep].tolist(), mode[keep].tolist()):
+            most_frequent_condition = condition_names[m]
+            results[c].append({
+                'day': day_names[d],
+                'icon': self.condition_icons.get(most_frequent_condition, '❓'),
+                'min': self._convert_temp(low),
+                'max': self._convert_temp(high),
+                'unit': self.unit,
+                'condition': most_frequent_condition,
+                'avg_humidity': round(hum / size),
+            })
+        return results
+
+# ==============================================================================
+# 3. DISPLAY MODULE (Task 5)
+# ==============================================================================
+
+class WeatherDisplay:
+    """Formats and prints weather data to the console with colors and ASCII art."""
+
+    TEMP_THRESHOLDS = {'C': (0, 25), 'F': (32, 77)} # Cold, Mild, Hot thresholds
+
+    def __init__(self, parser: WeatherParser):
+        self.parser = parser
+
+    def _get_temp_color(self, temp: float, unit: str) -> str:
+        """Returns color based on temperature."""
+        cold, hot = self.TEMP_THRESHOLDS[unit]
+
+        if temp < cold:
+            return Fore.BLUE  # Cold
+        elif temp > hot:
+            return Fore.RED    # Hot
+        else:
+            return Fore.YELLOW + Style.BRIGHT # Mild/Warm
+
+    def display_current_weather(self, current_data: Dict):
+        """Prints formatted current weather data."""
+        unit = current_data['temp_unit']
+        temp_color = self._get_temp_color(current_data['temp'], unit)
+        
+        # Display cache status if available
+        cache_age_sec = current_data.get('cache_age')
+        cache_msg = ""
+        if cache_age_sec is not None:
+            cache_minutes = int(cache_age_sec / 60)
+            cache_msg = f"(Cached: {cache_minutes} min old)"
+        
+        print("\n" + "="*50)
+        print(Fore.CYAN + Style.BRIGHT + "🌤️  WEATHER DASHBOARD")
+        print("="*50)
+        
+        print(f"📍 Current Location: {Fore.YELLOW}{current_data['location']}{Style.RESET_ALL}")
+        print(f"🕐 Last Updated: {current_data['last_updated']} {cache_msg}\n")
+        
+        print(Fore.WHITE + "Current Weather:")
+        print("────────────────")
+        print(f"Temperature:   {temp_color}{current_data['temp']}°{unit} ({Style.RESET_ALL}Feels like: {self._get_temp_color(current_data['feels_like'], unit)}{current_data['feels_like']}°{unit}{Style.RESET_ALL})")
+        print(f"Conditions:    {current_data['condition']}")
+        print(f"Humidity:      {current_data['humidity']}%")
+        print(f"Wind:          {current_data['wind_speed_kmh']} km/h")
+        print(f"Pressure:      {current_data['pressure']} hPa")
+        print(f"Visibility:    {current_data['visibility_km']} km")
+        print(f"Sunrise:       {current_data['sunrise']}")
+        print(f"Sunset:        {current_data['sunset']}")
+
+    def display_forecast(self, forecast_data: List[Dict]):
+        """Prints formatted 5-day forecast."""
+        if not forecast_data:
+            return
+            
+        unit = forecast_data[0]['unit']
+        
+        print("\n" + Fore.WHITE + "5-Day Forecast:")
+        print("───────────────")
+        
+        for day in forecast_data:
+            max_temp_color = self._get_temp_color(day['max'], unit)
+            min_temp_color = self._get_temp_color(day['min'], unit)
+
+            print(f"{Fore.CYAN}{day['day']}: "
+                  f"{day['icon']}  "
+                  f"{max_temp_color}{day['max']}°{unit} "
+                  f"{Style.RESET_ALL}/ "
+                  f"{min_temp_color}{day['min']}°{unit}{Style.RESET_ALL}  "
+                  f"(Humidity: {day['avg_humidity']}%)")
+
+# ==============================================================================
+# 4. USER INTERFACE & MAIN LOGIC (Task 6)
+# ==============================================================================
+
+class WeatherApp:
+    """Main application logic and user interface."""
+    
+    def __init__(self, api_key: str, default_city: str = "London", api: Optional[WeatherAPI] = None,
+                 max_workers: int = MAX_CONCURRENT_REQUESTS, history: Optional['WeatherHistory'] = None):
+        self.api = api or WeatherAPI(api_key)
+        self.history = history if history is not None else (WeatherHistory() if WeatherHistory else None)
+        self.parser = WeatherParser(unit='C') # Start with Celsius
+        self.display = WeatherDisplay(self.parser)
+        self.current_city = default_city
+        self.favorites = {'London': 'GB', 'Paris': 'FR', 'Tokyo': 'JP'}
+        self.max_workers = max_workers
+        self.prefetcher = PrefetchScheduler(self.api)
+        self.prefetcher.pin(self.favorites)
+
+    @staticmethod
+    def _split_city(city: str) -> Tuple[str, Optional[str]]:
+        """'Paris' -> ('Paris', None); 'paris, fr' -> ('paris', 'FR')"""
+        name, _, code = city.partition(',')
+        return name.strip(), code.strip().upper() or None
+
+    def _location(self, city: str) -> Tuple[str, Optional[str]]:
+        """The (city, country_code) a typed "city" or "city, CC" is fetched, cached and prefetched as.
+
+        A favorite is looked up under its own spelling and country, so "london" shares cache entries
+        and query counts with the pinned ('London', 'GB').
+        """
+        name, code = self._split_city(city)
+        for favorite, favorite_code in self.favorites.items():
+            if favorite.casefold() == name.casefold() and code in (None, favorite_code):
+                return favorite, favorite_code
+        return name, code
+
+    def _fetch_and_display(self, city: str):
+        """Fetches and displays both current weather and forecast."""
+        
+        city, code = self._location(city)
+
+        # 1. Fetch Current Weather
+        current_json = self.api.get_current_weather(city, code)
+        if not current_json:
+            return
+        self.prefetcher.record('current', city, code, current_json)
+        
+        current_data = self.parser.parse_current_weather(current_json)
+        if current_data:
+            self.current_city = current_data['location']
+            self.display.display_current_weather(current_data)
+            if self.history is not None and self.history.append(current_data):
+                self.history.flush()
+        
+        # 2. Fetch Forecast
+        forecast_json = self.api.get_forecast(city, code)
+        if not forecast_json:
+            return
+        self.prefetcher.record('forecast', city, code, forecast_json)
+            
+        forecast_data = self.parser.parse_forecast(forecast_json)
+        if forecast_data:
+            self.display.display_forecast(forecast_data)
+
+    def refresh_cities(self, cities: Dict[str, Optional[str]],
+                       max_workers: Optional[int] = None) -> Dict[str, Tuple[Optional[Dict], Optional[Dict]]]:
+        """Fetches current weather and forecast for many cities concurrently.
+
+        cities maps city name -> country code (or None), like self.favorites. At most max_workers
+        requests are in flight at once; max_workers=1 fetches sequentially. Returns
+        {city: (current_json, forecast_json)}, with None for whatever failed.
+        """
+        jobs = [(city, code, kind) for city, code in cities.items() for kind in ('current', 'forecast')]
+
+        def fetch(job):
+            city, code, kind = job
+            if kind == 'current':
+                return self.api.get_current_weather(city, code, quiet=True, priority=BATCH)
+            return self.api.get_forecast(city, code, quiet=True, priority=BATCH)
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as pool:
+            results = iter(pool.map(fetch, jobs))
+        return {city: (next(results), next(results)) for city in cities}
+
+    def _refresh_favorites(self):
+        """Refreshes every favorite city at once and prints a one-line summary for each."""
+        start = time.perf_counter()
+        results = self.refresh_cities(self.favorites)
+        elapsed = time.perf_counter() - start
+
+        print("\n" + Fore.YELLOW + "⭐ Favorite Cities:")
+        for city, (current_json, forecast_json) in results.items():
+            current = self.parser.parse_current_weather(current_json)
+            if not current:
+                print(Fore.RED + f" {city}: unavailable")
+                continue
+            print(f" {current['location']:<22} {current['temp']:>4}°{current['temp_unit']}  {current['condition']}")
+        print(Fore.GREEN + f"Refreshed {len(results)} cities in {elapsed:.2f}s")
+
+    def _show_history(self, days: int = 7):
+        """Prints daily summaries of the readings recorded for the current city."""
+        if self.history is None:
+            print(Fore.RED + "History needs NumPy (pip install numpy).")
+            return
+        now = time.time()
+        rows = self.history.rollups(self.current_city, now - days * 86400, now, 'day')
+        print("\n" + Fore.YELLOW + f"📈 History for {self.current_city} (last {days} days):")
+        if not len(rows):
+            print(Fore.WHITE + "No readings recorded yet.")
+            return
+        unit = self.parser.unit
+        for row in rows:
+            day = datetime.fromtimestamp(int(row['ts']), timezone.utc).strftime('%a %d %b')
+            print(f" {day}: {self.parser._convert_temp(float(row['temp_min']))}°{unit} / "
+                  f"{self.parser._convert_temp(float(row['temp_max']))}°{unit}  "
+                  f"(Humidity: {round(float(row['humidity_mean']))}%, {row['count']} readings)")
+
+    def _show_stats(self):
+        """Prints cache and prefetch counters."""
+        cache = self.api.cache_stats()
+        prefetch = self.prefetcher.stats()
+        print("\n" + Fore.YELLOW + "📊 Cache & Prefetch Stats:")
+        print(f" Lookups:     {prefetch['lookups']} ({prefetch['hit_rate']:.0%} served fresh from cache)")
+        print(f" Cache:       {cache['memory_hits']} memory hits, {cache['disk_hits']} disk hits, "
+              f"{cache['misses']} misses, {cache['stale_hits']} stale")
+        print(f" Prefetches:  {prefetch['prefetches']} ({prefetch['useful']} used, {prefetch['wasted']} wasted, "
+              f"{prefetch['failed']} failed; waste rate {prefetch['waste_rate']:.0%})")
+        print(f" Hot cities:  {', '.join(city for city, _ in self.prefetcher.hottest()[:5]) or 'none yet'}")
+
+    def _set_units(self, unit: str):
+        """Switches display units between C and F."""
+        unit = unit.upper()
+        if unit in ['C', 'F']:
+            self.parser.unit = unit
+            print(Fore.GREEN + f"\nUnits set to: {unit}ahrenheits" if unit == 'F' else f"\nUnits set to: {unit}elsius")
+            self._fetch_and_display(self.current_city.split(',')[0].strip())
+        else:
+            print(Fore.RED + "Invalid unit. Use 'C' or 'F'.")
+
+    def _show_favorites(self):
+        """Displays saved favorite cities."""
+        print("\n" + Fore.YELLOW + "⭐ Favorite Cities:")
+        if not self.favorites:
+            print(Fore.WHITE + "No favorites saved.")
+            return
+
+        for i, (city, code) in enumerate(self.favorites.items()):
+            print(f" {i+1}. {city}, {code}")
+        
+    def _help(self):
+        """Displays command help."""
+        print("\n" + Fore.CYAN + "Available Commands:")
+        print("-" * 20)
+        print(Fore.YELLOW + "search [city name]" + Fore.WHITE + " - Search for a new city (e.g., search Tokyo)")
+        print(Fore.YELLOW + "units [C/F]" + Fore.WHITE + "    - Switch temperature units (e.g., units F)")
+        print(Fore.YELLOW + "refresh" + Fore.WHITE + "        - Refresh data for the current city")
+        print(Fore.YELLOW + "refresh favs" + Fore.WHITE + "   - Refresh all favorite cities at once")
+        print(Fore.YELLOW + "favs" + Fore.WHITE + "           - Show favorite cities")
+        print(Fore.YELLOW + "history [days]" + Fore.WHITE + " - Daily history of the current city (default 7 days)")
+        print(Fore.YELLOW + "stats" + Fore.WHITE + "          - Cache hit rate and background prefetch stats")
+        print(Fore.YELLOW + "help" + Fore.WHITE + "           - Show this help menu")
+        print(Fore.YELLOW + "quit" + Fore.WHITE + "           - Exit the application")
+        
+    def run(self):
+        """Main application loop."""
+        print(Fore.GREEN + Style.BRIGHT + "Welcome to the Python Weather Dashboard!")
+        self._help()
+        
+        # Initial fetch, then keep favorites and frequently searched cities warm in the background
+        self._fetch_and_display(self.current_city)
+        self.prefetcher.start()
+        
+        while True:
+            try:
+                command = input(Fore.YELLOW + f"\n{self.current_city} [{self.parser.unit}]: " + Style.RESET_ALL).strip().lower()
+                
+                if command == 'quit':
+                    print(Fore.CYAN + "Goodbye!")
+                    break
+                elif command == 'refresh favs':
+                    self._refresh_favorites()
+                elif command == 'refresh':
+                    self._fetch_and_display(self.current_city.split(',')[0].strip())
+                elif command.startswith('search '):
+                    new_city = command[7:].strip()
+                    if new_city:
+                        self._fetch_and_display(new_city)
+                    else:
+                        print(Fore.RED + "Please specify a city name.")
+                elif command.startswith('units '):
+                    unit = command[6:].strip()
+                    self._set_units(unit)
+                elif command == 'history' or command.startswith('history '):
+                    days = command[8:].strip()
+                    if days and not days.isdigit():
+                        print(Fore.RED + "Usage: history [days]")
+                    else:
+                        self._show_history(int(days) if days else 7)
+                elif command == 'favs':
+                    self._show_favorites()
+                elif command == 'stats':
+                    self._show_stats()
+                elif command == 'help':
+                    self._help()
+                elif command:
+                    print(Fore.RED + f"Unknown command: '{command}'. Type 'help' for commands.")
+
+            except KeyboardInterrupt:
+                print(Fore.CYAN + "\nGoodbye!")
+                break
+            except Exception as e:
+                print(Fore.RED + f"An internal error occurred: {e}")
+
+        self.prefetcher.stop()
+
+
+# ==============================================================================
+# ENTRY POINT
+# ==============================================================================
+
+if __name__ == "__main__":
+    # --- IMPORTANT: Replace the dummy key here with your actual key ---
+    if OPENWEATHER_API_KEY == "YOUR_API_KEY_HERE":
+        print(Fore.RED + "Please replace the API key placeholder before running.")
+    else:
+        app = WeatherApp(api_key=OPENWEATHER_API_KEY, default_city="New York")
         app.run()
\ No newline at end of file
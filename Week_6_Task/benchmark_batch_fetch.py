@@ -0,0 +1,52 @@
+# Benchmark: sequential vs concurrent multi-city refresh against the local stub API
+#
+# Usage: python benchmark_batch_fetch.py [--cities 500] [--latency 20] [--workers 1 8 32 64]
+#
+# Every run starts with an empty cache, so each city costs two upstream requests (current weather
+# and forecast). workers=1 is the old one-city-at-a-time behaviour. With a simulated round trip
+# of --latency ms, wall-clock time should drop roughly in proportion to the worker count until
+# the (single) client process runs out of CPU.
+
+import argparse
+import tempfile
+import time
+
+from Current_weather_City_PROJ import RateLimiter, WeatherAPI, WeatherApp
+from weather_stub_server import start_stub
+
+
+def run(base_url, cities, workers):
+    """Refreshes all cities with a cold cache; returns (seconds, failed cities)"""
+    with tempfile.TemporaryDirectory() as directory:
+        api = WeatherAPI("bench", base_url=base_url, cache_dir=directory, max_connections=workers,
+                         limiter=RateLimiter(rate=None))  # the stub has no quota
+        app = WeatherApp("bench", api=api, max_workers=workers)
+        start = time.perf_counter()
+        results = app.refresh_cities(cities)
+        elapsed = time.perf_counter() - start
+        api.backend.close()
+    failed = sum(1 for current, forecast in results.values() if current is None or forecast is None)
+    return elapsed, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch weather refresh benchmark")
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=20, help="stub round trip in ms")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    stub = start_stub(latency=args.latency / 1000)
+    cities = {f"City {i}": None for i in range(args.cities)}
+    print(f"{args.cities:,} cities ({2 * args.cities:,} requests), stub latency {args.latency:.0f} ms\n")
+    print(f"{'workers':>8} {'seconds':>9} {'cities/s':>9} {'speedup':>8}  failed")
+    baseline = None
+    try:
+        for workers in args.workers:
+            stub.hits.clear()
+            elapsed, failed = run(stub.base_url, cities, workers)
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {args.cities / elapsed:>9.0f} {baseline / elapsed:>7.1f}x  "
+                  f"{failed} (upstream hits: {sum(stub.hits.values()):,})")
+    finally:
+        stub.stop()
@@ -0,0 +1,77 @@
+# Benchmark: JSON vs compact binary cache files (WeatherAPI cache_format='json' / 'binary')
+#
+# Usage: python benchmark_cache_format.py [cities]   (default: 5000)
+#
+# Writes a current-weather and a forecast payload per city through WeatherAPI._save_to_cache in
+# each format, then compares the size on disk and the time to load every entry back from disk
+# (memory tier disabled), alone and followed by parsing. Also checks that WeatherParser gives
+# identical results from both formats.
+
+import random
+import sys
+import tempfile
+import time
+
+from Current_weather_City_PROJ import RateLimiter, WeatherAPI, WeatherParser
+from weather_stub_server import make_current, make_forecast
+
+
+def payloads(cities):
+    rng = random.Random(1)
+    return [(f"City {i}", make_current(f"City {i}", rng), make_forecast(f"City {i}", rng)) for i in range(cities)]
+
+
+def best_of(runs, fn):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def run(directory, cache_format, data):
+    api = WeatherAPI("bench", cache_dir=directory, memory_entries=0, max_disk_bytes=10**12,
+                     limiter=RateLimiter(rate=None), cache_format=cache_format)
+    for city, current, forecast in data:
+        api._save_to_cache(api.cache_key('current', city), current)
+        api._save_to_cache(api.cache_key('forecast', city), forecast)
+    keys = [(api.cache_key('current', city), api.cache_key('forecast', city)) for city, _, _ in data]
+    parser = WeatherParser('C')
+
+    def load():
+        return [(api._get_cached_data(current), api._get_cached_data(forecast)) for current, forecast in keys]
+
+    def load_and_parse():
+        return [(parser.parse_current_weather(current), parser.parse_forecast(forecast)) for current, forecast in load()]
+
+    load_time, loaded = best_of(3, load)
+    parse_time, parsed = best_of(3, load_and_parse)
+    if any(current is None or forecast is None for current, forecast in loaded):
+        sys.exit(f"{cache_format}: some entries did not load")
+    # cache_age differs between runs; everything else must match
+    parsed = [(dict(current, cache_age=None), forecast) for current, forecast in parsed]
+    return api.cache_stats()['disk_bytes'], load_time, parse_time, parsed
+
+
+if __name__ == "__main__":
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    data = payloads(cities)
+    print(f"{cities:,} cities = {2 * cities:,} cache files per format\n")
+
+    results = {}
+    for cache_format in ('json', 'binary'):
+        with tempfile.TemporaryDirectory() as directory:
+            results[cache_format] = run(directory, cache_format, data)
+    if results['json'][3] != results['binary'][3]:
+        sys.exit("MISMATCH: the parser gives different results from the two formats")
+    print("Identical parser output from both formats\n")
+
+    print(f"{'format':<8} {'on disk':>10} {'per city':>9} {'load':>9} {'per entry':>10} {'load+parse':>11}")
+    for cache_format, (size, load_time, parse_time, _) in results.items():
+        print(f"{cache_format:<8} {size / 2**20:>7.1f} MiB {size / cities:>7,.0f} B {load_time:>8.2f}s "
+              f"{load_time / (2 * cities) * 1e6:>7.0f} µs {parse_time:>10.2f}s")
+    json_size, json_load, json_parse, _ = results['json']
+    size, load_time, parse_time, _ = results['binary']
+    print(f"\nbinary vs json: {json_size / size:.1f}x smaller, load {json_load / load_time:.1f}x faster, "
+          f"load+parse {json_parse / parse_time:.1f}x faster")
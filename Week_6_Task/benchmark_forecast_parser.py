@@ -0,0 +1,70 @@
+# Benchmark: per-payload WeatherParser.parse_forecast vs batched parse_forecasts
+#
+# Usage: python benchmark_forecast_parser.py [cities...]   (default: 1000 5000 20000)
+#
+# First checks that both give identical results in both units, on payloads whose timestamps are
+# scattered over a whole year (so DST changes and every weekday are covered) plus a few tricky
+# ones (empty, missing list, single slot, tied conditions). Then times a realistic cycle: every
+# city's forecast on the same 3-hour grid, as after a fleet refresh.
+
+import random
+import sys
+import time
+
+from Current_weather_City_PROJ import WeatherParser
+from weather_stub_server import make_forecast
+
+
+def scattered(count, rng):
+    payloads = []
+    for i in range(count):
+        payload = make_forecast(f"City {i}", rng)
+        shift = rng.randrange(365) * 86400 + rng.randrange(10800)
+        for item in payload["list"]:
+            item["dt"] += shift
+        payloads.append(payload)
+    return payloads
+
+
+def tricky(rng):
+    ties = make_forecast("Ties", rng)
+    for n, item in enumerate(ties["list"]):
+        item["weather"][0]["main"] = ("Rain", "Clear")[n % 2]
+    single = make_forecast("Single", rng)
+    single["list"] = single["list"][:1]
+    return [ties, single, {}, None, {"list": []}, {"cod": "404"}]
+
+
+def best_of(runs, fn):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check(payloads):
+    for unit in ("C", "F"):
+        parser = WeatherParser(unit)
+        expected = [parser.parse_forecast(data) for data in payloads]
+        if parser.parse_forecasts(payloads) != expected:
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 5000, 20_000]
+    rng = random.Random(1)
+    payloads = scattered(2000, rng) + tricky(rng)
+    if not check(payloads):
+        sys.exit("MISMATCH between parse_forecast and parse_forecasts")
+    print(f"Identical results on {len(payloads):,} payloads (scattered over a year, plus edge cases)\n")
+
+    parser = WeatherParser("C")
+    print(f"{'cities':>8} {'loop':>12} {'batched':>12} {'speedup':>8}")
+    for size in sizes:
+        payloads = [make_forecast(f"City {i}", rng) for i in range(size)]
+        loop = best_of(3, lambda: [parser.parse_forecast(data) for data in payloads])
+        batched = best_of(3, lambda: parser.parse_forecasts(payloads))
+        print(f"{size:>8,} {size / loop:>9,.0f}/s {size / batched:>9,.0f}/s {loop / batched:>7.1f}x")
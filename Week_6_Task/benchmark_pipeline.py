@@ -0,0 +1,82 @@
+# Benchmark: WeatherApp's fetch -> parse -> display pipeline at scale, without network access
+#
+# Usage: python benchmark_pipeline.py [--cities 2000] [--workers 16] [--latency 20] [--error-rate 0]
+#                                     [--backend inproc http] [--replay DIR] [--max-retries 3]
+#
+# Runs WeatherApp._fetch_and_display (what "search <city>" does: current weather + forecast,
+# parsing, terminal output and the history append) for every city from a thread pool, against
+# the in-process StubBackend and/or the stub HTTP server. The first pass starts from an empty
+# cache; the second finds everything cached, so it measures parse + display + history alone.
+# Terminal output is discarded. --latency is in ms; --error-rate makes the stub answer that
+# share of requests with a 503, which the client retries with backoff.
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Current_weather_City_PROJ import HTTPBackend, RateLimiter, WeatherAPI, WeatherApp
+from weather_history import WeatherHistory
+from weather_stub_server import StubBackend, load_recordings, start_stub
+
+
+def run_pass(app, cities, workers):
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(app._fetch_and_display, cities))
+        return time.perf_counter() - start
+
+
+def run(backend_name, args, cities, recordings):
+    stub = None
+    if backend_name == "http":
+        stub = start_stub(latency=args.latency / 1000, error_rate=args.error_rate, recordings=recordings)
+        backend, hits = HTTPBackend(stub.base_url, args.workers), stub.hits
+    else:
+        backend = StubBackend(latency=args.latency / 1000, error_rate=args.error_rate, recordings=recordings)
+        hits = backend.hits
+    with tempfile.TemporaryDirectory() as directory:
+        api = WeatherAPI("bench", backend=backend, cache_dir=os.path.join(directory, "cache"),
+                         limiter=RateLimiter(rate=None), max_retries=args.max_retries)
+        app = WeatherApp("bench", api=api, max_workers=args.workers,
+                         history=WeatherHistory(os.path.join(directory, "history")))
+        rows = []
+        for name in ("cold cache", "warm cache"):
+            hits.clear()
+            elapsed = run_pass(app, cities, args.workers)
+            requests = hits["weather"] + hits["forecast"]
+            rows.append((name, elapsed, requests, hits["errors"]))
+        failed = sum(1 for city in cities if api.cache_age(api.cache_key("forecast", city)) is None)
+        api.backend.close()
+    if stub:
+        stub.stop()
+    return rows, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end WeatherApp pipeline benchmark against stub backends")
+    parser.add_argument("--cities", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=20, help="stub delay per request in ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with a 503")
+    parser.add_argument("--backend", nargs="+", choices=["inproc", "http"], default=["inproc", "http"])
+    parser.add_argument("--replay", metavar="DIR", help="serve recorded JSON payloads from DIR")
+    parser.add_argument("--max-retries", type=int, default=3)
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.replay) if args.replay else None
+    cities = [f"City {i}" for i in range(args.cities)]
+    print(f"{args.cities:,} cities, {args.workers} workers, stub latency {args.latency:g} ms, "
+          f"error rate {args.error_rate:.1%}, {'recorded' if recordings else 'synthetic'} payloads\n")
+
+    print(f"{'backend':<8} {'pass':<11} {'seconds':>8} {'cities/s':>9} {'requests':>9} {'503s':>6}")
+    for backend_name in args.backend:
+        rows, failed = run(backend_name, args, cities, recordings)
+        for name, elapsed, requests, errors in rows:
+            print(f"{backend_name:<8} {name:<11} {elapsed:>8.2f} {args.cities / elapsed:>9,.0f} "
+                  f"{requests:>9,} {errors:>6,}")
+        if failed:
+            print(f"{'':<8} {failed:,} cities failed after retries")
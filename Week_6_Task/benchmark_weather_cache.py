@@ -0,0 +1,83 @@
+# Benchmark: repeated cache lookups across thousands of cities, disk-only vs two-tier cache
+#
+# Usage: python benchmark_weather_cache.py [cities]   (default: 5000)
+#
+# The cache directory is seeded with a current-weather and a forecast payload per city, then
+# lookups are replayed with a skewed popularity (a few cities are asked for all the time, like
+# real users do). No network is used: everything is served from the cache tiers.
+
+import json
+import random
+import sys
+import tempfile
+import time
+
+from Current_weather_City_PROJ import WeatherAPI
+from weather_stub_server import make_current, make_forecast
+
+LOOKUPS = 50_000
+MEMORY_SIZES = [0, 500, 2000, 10_000]  # 0 = memory tier disabled (the old behaviour)
+
+
+def cache_keys(cities):
+    keys = []
+    for i in range(cities):
+        keys += [f"current_City_{i}_None", f"forecast_City_{i}_None"]
+    return keys
+
+
+def seed(directory, cities):
+    """Writes every city's payloads through the cache; returns (compact bytes, indented bytes)"""
+    rng = random.Random(1)
+    api = WeatherAPI("bench", cache_dir=directory, max_disk_bytes=10**12)
+    indented = 0
+    for i in range(cities):
+        for key, payload in ((f"current_City_{i}_None", make_current(f"City {i}", rng)),
+                             (f"forecast_City_{i}_None", make_forecast(f"City {i}", rng))):
+            api._save_to_cache(key, payload)
+            indented += len(json.dumps(payload, indent=2))
+    return api.cache_stats()["disk_bytes"], indented
+
+
+def replay(directory, keys, memory_entries):
+    """Skewed repeated lookups; returns (µs per lookup, cache stats)"""
+    rng = random.Random(2)
+    weights = [1 / (rank + 1) for rank in range(len(keys))]  # Zipf-like popularity
+    lookups = rng.choices(keys, weights=weights, k=LOOKUPS)
+    api = WeatherAPI("bench", cache_dir=directory, memory_entries=memory_entries, max_disk_bytes=10**12)
+    start = time.perf_counter()
+    for key in lookups:
+        if api._get_cached_data(key) is None:
+            raise RuntimeError(f"{key} missing from the cache")
+    return (time.perf_counter() - start) / LOOKUPS * 1e6, api.cache_stats()
+
+
+def budget(directory, cities, max_bytes):
+    """Rewrites every payload under a disk budget; returns the final stats"""
+    rng = random.Random(3)
+    api = WeatherAPI("bench", cache_dir=directory, max_disk_bytes=max_bytes)
+    for i in range(cities):
+        api._save_to_cache(f"forecast_City_{i}_None", make_forecast(f"City {i}", rng))
+    return api.cache_stats()
+
+
+if __name__ == "__main__":
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as directory:
+        compact, indented = seed(directory, cities)
+        print(f"{cities:,} cities, {2 * cities:,} cache files: {compact / 2**20:.1f} MiB compact JSON "
+              f"(indented JSON would be {indented / 2**20:.1f} MiB)\n")
+        print(f"{LOOKUPS:,} skewed lookups:")
+        keys = cache_keys(cities)
+        for entries in MEMORY_SIZES:
+            per_lookup, stats = replay(directory, keys, entries)
+            label = "disk only" if entries == 0 else f"memory {entries:,}"
+            print(f"  {label:<14} {per_lookup:8.1f} µs/lookup | memory hits {stats['memory_hits']:>6,} | "
+                  f"disk hits {stats['disk_hits']:>6,} | memory evictions {stats['memory_evictions']:>6,}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        max_bytes = 5 * 2**20
+        stats = budget(directory, cities, max_bytes)
+        print(f"\nDisk budget {max_bytes / 2**20:.0f} MiB after writing {cities:,} forecasts: "
+              f"{stats['disk_files']:,} files, {stats['disk_bytes'] / 2**20:.2f} MiB, "
+              f"{stats['disk_evictions']:,} evicted")
@@ -0,0 +1,139 @@
+# Benchmark: weather history store ingest, compaction and range queries over a year of readings
+#
+# Usage: python benchmark_weather_history.py [--cities 10000] [--days 365] [--per-day 8] [--dir PATH]
+#
+# 1. Ingest of parsed readings (the dicts WeatherParser.parse_current_weather returns) through
+#    append(), timed on the first day of data.
+# 2. Bulk ingest of the rest of the year through append_records().
+# 3. compact(): hourly and daily rollups for every finished day.
+# 4. Reopening the store (which loads each city's newest reading to recognise repeats), then
+#    query latency for random cities over ranges of a day up to the whole year, raw and rolled up.
+# Data goes to a temporary directory unless --dir is given (a year for 10k cities is ~1 GB).
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from weather_history import DAY, READING, WeatherHistory
+
+CONDITIONS = ["Clear sky ☀️", "Few clouds ☁️", "Light rain 🌧️", "Drizzle 🌦️", "Snow ❄️", "Mist 🌫️"]
+QUERIES = 50
+
+
+def parsed_reading(city, ts, rng):
+    """A dict shaped like WeatherParser.parse_current_weather's output"""
+    return {
+        'location': city, 'last_updated': datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S'),
+        'last_updated_epoch': ts,
+        'temp': rng.randint(-20, 35), 'temp_unit': 'C', 'feels_like': rng.randint(-25, 38),
+        'condition': rng.choice(CONDITIONS), 'humidity': rng.randint(10, 100),
+        'wind_speed_kmh': rng.randint(0, 60), 'pressure': rng.randint(980, 1040),
+        'visibility_km': 10, 'sunrise': '06:00', 'sunset': '18:00', 'cache_age': None,
+    }
+
+
+def day_records(history, day, cities, per_day, rng):
+    """One day of synthetic READING records for every city"""
+    count = cities * per_day
+    records = np.empty(count, READING)
+    records['ts'] = day * DAY + np.repeat(np.arange(per_day) * (DAY // per_day), cities) + rng.integers(0, 600, count)
+    records['city'] = np.tile(np.arange(cities), per_day)
+    records['temp'] = rng.normal(12, 10, count)
+    records['feels_like'] = records['temp'] - 1
+    records['humidity'] = rng.integers(10, 100, count)
+    records['pressure'] = rng.integers(980, 1040, count)
+    records['wind_kmh'] = rng.uniform(0, 60, count)
+    records['visibility_km'] = 10
+    records['condition'] = rng.integers(0, len(CONDITIONS), count)
+    return records
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def directory_size(path):
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+
+def main(root, cities, days, per_day):
+    rng = random.Random(1)
+    nrng = np.random.default_rng(1)
+    history = WeatherHistory(root)
+    names = [f"City {i}, XX" for i in range(cities)]
+    first_day = int(time.time()) // DAY - days
+
+    # 1. Parsed readings through append()
+    readings = [parsed_reading(names[c], first_day * DAY + slot * (DAY // per_day) + rng.randrange(600), rng)
+                for slot in range(per_day) for c in range(cities)]
+    start = time.perf_counter()
+    for reading in readings:
+        history.append(reading)
+    history.flush()
+    elapsed = time.perf_counter() - start
+    print(f"append():         {len(readings):>12,} readings in {elapsed:6.2f}s = {len(readings) / elapsed:>10,.0f}/s")
+
+    # 2. The rest of the year in bulk
+    for name in CONDITIONS:
+        history.condition_id(name)
+    bulk = 0
+    start = time.perf_counter()
+    for day in range(first_day + 1, first_day + days):
+        records = day_records(history, day, cities, per_day, nrng)
+        history.append_records(records)
+        bulk += len(records)
+    elapsed = time.perf_counter() - start
+    total = len(readings) + bulk
+    print(f"append_records(): {bulk:>12,} readings in {elapsed:6.2f}s = {bulk / elapsed:>10,.0f}/s")
+
+    # 3. Rollups
+    elapsed, built = timed(history.compact)
+    print(f"compact():        {built:>12,} rollup files in {elapsed:6.2f}s")
+    print(f"on disk:          {directory_size(history.root) / 2**20:>12,.0f} MiB for {total:,} readings\n")
+
+    # 4. Queries (the store is reopened so nothing is served from append buffers)
+    elapsed, history = timed(WeatherHistory, root)
+    print(f"reopen:           {len(history._last_ts):>12,} cities' newest readings loaded in {elapsed:6.2f}s\n")
+    end = (first_day + days) * DAY
+    print(f"{'range':<8} {'kind':<8} {'median ms':>10} {'p95 ms':>8} {'rows/query':>11}")
+    for span_days in sorted({1, 7, 30, days}):
+        for kind in ('raw', 'hour', 'day'):
+            latencies, rows = [], 0
+            for _ in range(QUERIES):
+                city = rng.choice(names)
+                q_start = rng.randrange(first_day * DAY, end - span_days * DAY + 1)
+                q_end = q_start + span_days * DAY
+                if kind == 'raw':
+                    elapsed, result = timed(history.readings, city, q_start, q_end)
+                else:
+                    elapsed, result = timed(history.rollups, city, q_start, q_end, kind)
+                latencies.append(elapsed * 1000)
+                rows += len(result)
+            latencies.sort()
+            print(f"{span_days:>4} d   {kind:<8} {statistics.median(latencies):>10.2f} "
+                  f"{latencies[int(0.95 * len(latencies))]:>8.2f} {rows / QUERIES:>11,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Weather history store benchmark")
+    parser.add_argument("--cities", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=8, help="readings per city per day")
+    parser.add_argument("--dir", help="keep the data here instead of a temporary directory")
+    args = parser.parse_args()
+
+    print(f"{args.cities:,} cities x {args.days} days x {args.per_day} readings/day\n")
+    root = args.dir or tempfile.mkdtemp(prefix="weather-history-")
+    try:
+        main(root, args.cities, args.days, args.per_day)
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,91 @@
+# Verify request coalescing and stale-while-revalidate in WeatherAPI against the local stub API
+#
+# Usage: python check_single_flight.py [--callers 200] [--latency 200]
+#
+# Fires bursts of concurrent identical lookups and counts what actually reached the (slow) stub:
+#   1. cold cache: every caller for one city must share a single upstream request
+#   2. many cities: one upstream request per city, however many callers each has
+#   3. expired entry: callers get the stale payload at once and exactly one background refresh runs
+# Exits with status 1 if any count is off.
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+
+from Current_weather_City_PROJ import RateLimiter, WeatherAPI
+from weather_stub_server import start_stub
+
+
+def burst(lookups):
+    """Runs every (fn, *args) lookup on its own thread, released at the same moment.
+    Returns [(seconds waited, result)] in order"""
+    gate = threading.Barrier(len(lookups))
+    results = [None] * len(lookups)
+
+    def call(i, fn, *args):
+        gate.wait()
+        start = time.perf_counter()
+        data = fn(*args)
+        results[i] = (time.perf_counter() - start, data)
+
+    threads = [threading.Thread(target=call, args=(i, *lookup)) for i, lookup in enumerate(lookups)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def report(name, expected, actual, detail=""):
+    ok = expected == actual
+    print(f"{'OK  ' if ok else 'FAIL'} {name}: {actual} upstream requests (expected {expected}){detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check WeatherAPI request coalescing")
+    parser.add_argument("--callers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=200, help="stub round trip in ms")
+    args = parser.parse_args()
+
+    stub = start_stub(latency=args.latency / 1000)
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        api = WeatherAPI("check", base_url=stub.base_url, cache_dir=directory,
+                         cache_duration=2, stale_duration=60, limiter=RateLimiter(rate=None))
+
+        # 1. Cold cache, one city
+        results = burst([(api.get_current_weather, "London", None, True)] * args.callers)
+        served = sum(1 for _, data in results if data)
+        ok &= report(f"{args.callers} concurrent callers, cold cache", 1, stub.hits["weather"],
+                     f"; {served} callers served")
+
+        # 2. Cold cache, many cities with several callers each
+        stub.hits.clear()
+        cities = [f"City {i}" for i in range(args.callers // 4)]
+        burst([(api.get_forecast, city, None, True) for city in cities for _ in range(4)])
+        ok &= report(f"{len(cities)} cities x 4 callers", len(cities), stub.hits["forecast"])
+
+        # 3. Expired entry: served stale immediately, refreshed once in the background
+        time.sleep(api.cache_duration + 0.2)
+        stub.hits.clear()
+        results = burst([(api.get_current_weather, "London", None, True)] * args.callers)
+        slowest = max(seconds for seconds, _ in results)
+        stale = sum(1 for _, data in results if data and data["cache_age"] >= api.cache_duration)
+        time.sleep(args.latency / 1000 + 0.5)  # let the background refresh land
+        ok &= report(f"{args.callers} callers on an expired entry", 1, stub.hits["weather"],
+                     f"; {stale} served stale, slowest caller waited {slowest * 1000:.1f} ms")
+        fresh = api.get_current_weather("London", quiet=True)
+        if fresh["cache_age"] >= api.cache_duration:
+            print("FAIL background refresh did not replace the stale entry")
+            ok = False
+
+        print(f"\ncache stats: {api.cache_stats()}")
+    stub.stop()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
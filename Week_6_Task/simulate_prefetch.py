@@ -0,0 +1,83 @@
+# Simulation: interactive lookups with and without the background prefetch scheduler
+#
+# Usage: python simulate_prefetch.py [--cities 300] [--seconds 20] [--rate 40] [--ttl 6] [--top 10 30 100]
+#
+# A client looks up cities (current weather + forecast, like WeatherApp._fetch_and_display)
+# drawn from a Zipf distribution, so a few cities get most of the traffic, against a local stub
+# with 50 ms latency. Cache lifetimes and the scheduler's timings are scaled down from minutes to
+# seconds so a run takes seconds. Reports the fresh-hit rate and lookup latency the client saw,
+# and how many prefetches were sent and wasted (refreshed again before anyone read them).
+
+import argparse
+import random
+import tempfile
+import time
+
+from Current_weather_City_PROJ import PrefetchScheduler, RateLimiter, WeatherAPI
+from weather_stub_server import start_stub
+
+LATENCY = 0.05
+ZIPF_S = 1.1
+
+
+def lookups(cities, count, rng):
+    """count city names drawn with probability ~ 1 / rank**ZIPF_S"""
+    weights = [1 / (rank + 1) ** ZIPF_S for rank in range(len(cities))]
+    return rng.choices(cities, weights, k=count)
+
+
+def run(stub, names, ttl, seconds, rate, top_n):
+    """One timed run; top_n=None disables prefetching. Returns (scheduler stats, latencies)"""
+    with tempfile.TemporaryDirectory() as directory:
+        api = WeatherAPI("sim", base_url=stub.base_url, cache_dir=directory, cache_duration=ttl,
+                         stale_duration=0, limiter=RateLimiter(rate=None))
+        scheduler = PrefetchScheduler(api, top_n=top_n or 0, interval=ttl / 12, lead=ttl / 6,
+                                      spread=ttl / 6, half_life=ttl * 4)
+        if top_n:
+            scheduler.start()
+        latencies = []
+        start = time.perf_counter()
+        for i, city in enumerate(names):
+            # Open-loop arrivals: wait for this lookup's slot unless we are running behind
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if time.perf_counter() - start > seconds:
+                break
+            began = time.perf_counter()
+            for kind, fetch in (('current', api.get_current_weather), ('forecast', api.get_forecast)):
+                data = fetch(city, quiet=True)
+                if data:
+                    scheduler.record(kind, city, None, data)
+            latencies.append(time.perf_counter() - began)
+        scheduler.stop()
+        stats = scheduler.stats()
+        stats['upstream_requests'] = api.upstream_requests
+    return stats, sorted(latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefetch scheduler simulation against a local stub")
+    parser.add_argument("--cities", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--rate", type=float, default=40, help="lookups per second")
+    parser.add_argument("--ttl", type=float, default=6, help="cache duration in seconds")
+    parser.add_argument("--top", type=int, nargs="+", default=[10, 30, 100], help="top_n values to try")
+    args = parser.parse_args()
+
+    stub = start_stub(latency=LATENCY)
+    rng = random.Random(1)
+    cities = [f"City {i}" for i in range(args.cities)]
+    names = lookups(cities, int(args.seconds * args.rate) + 1, rng)
+    print(f"{args.cities} cities (Zipf s={ZIPF_S}), {args.rate:g} lookups/s for {args.seconds:g}s, "
+          f"cache {args.ttl:g}s, stub latency {LATENCY * 1000:.0f} ms\n")
+
+    print(f"{'prefetch':<10} {'hit rate':>9} {'p50 ms':>7} {'p95 ms':>7} {'upstream':>9} "
+          f"{'prefetches':>11} {'used':>6} {'wasted':>7} {'waste':>6}")
+    for top_n in [None] + args.top:
+        stats, latencies = run(stub, names, args.ttl, args.seconds, args.rate, top_n)
+        print(f"{'off' if top_n is None else f'top {top_n}':<10} {stats['hit_rate']:>9.1%} "
+              f"{latencies[len(latencies) // 2] * 1000:>7.1f} {latencies[int(len(latencies) * 0.95)] * 1000:>7.1f} "
+              f"{stats['upstream_requests']:>9,} {stats['prefetches']:>11,} {stats['useful']:>6,} "
+              f"{stats['wasted']:>7,} {stats['waste_rate']:>6.0%}")
+    stub.stop()
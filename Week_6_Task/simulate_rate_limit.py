@@ -0,0 +1,111 @@
+# Simulation: batch refreshes against a stub API that enforces a request quota
+#
+# Usage: python simulate_rate_limit.py [--cities 300] [--quota 50] [--window 1] [--workers 16]
+#
+# 1. Throughput: the same cold-cache batch refresh with only reactive handling of 429s
+#    (Retry-After pauses + jittered backoff) and with the client-side token bucket sized to
+#    fit the quota. Reports achieved throughput against the quota and how many 429s it cost.
+# 2. Priority lane: interactive lookups fired while a batch refresh saturates the quota,
+#    sent as INTERACTIVE (jumping the queue) vs as BATCH (waiting behind the refresh).
+# 3. Invalid bodies: a batch refresh through the in-process StubBackend while a share of the
+#    200 answers is truncated. Those are retried like 5xx, so every city should still load; when
+#    every body is invalid, a lookup gives up with None instead of raising.
+
+import argparse
+import tempfile
+import threading
+import time
+
+from Current_weather_City_PROJ import BATCH, INTERACTIVE, RateLimiter, WeatherAPI, WeatherApp
+from weather_stub_server import StubBackend, start_stub
+
+LATENCY = 0.01
+INTERACTIVE_LOOKUPS = 20
+BURST = 5
+BAD_BODY_RATE = 0.2
+
+
+def make_app(directory, stub, limiter, workers):
+    api = WeatherAPI("sim", base_url=stub.base_url, cache_dir=directory, limiter=limiter,
+                     max_connections=workers)
+    return WeatherApp("sim", api=api, max_workers=workers)
+
+
+def throughput(stub, cities, limiter, workers):
+    """Cold-cache batch refresh; returns (seconds, failed cities, request stats)"""
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(directory, stub, limiter, workers)
+        start = time.perf_counter()
+        results = app.refresh_cities(cities)
+        elapsed = time.perf_counter() - start
+    failed = sum(1 for current, forecast in results.values() if current is None or forecast is None)
+    return elapsed, failed, app.api.request_stats()
+
+
+def priority_lane(stub, cities, rate, workers, priority):
+    """Interactive lookups during a saturating batch refresh; returns sorted latencies"""
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(directory, stub, RateLimiter(rate=rate, capacity=BURST), workers)
+        batch = threading.Thread(target=app.refresh_cities, args=(cities,))
+        batch.start()
+        time.sleep(1)  # let the refresh fill the queue
+        latencies = []
+        for i in range(INTERACTIVE_LOOKUPS):
+            start = time.perf_counter()
+            app.api.get_current_weather(f"Lookup {i}", quiet=True, priority=priority)
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.2)
+        batch.join()
+    return sorted(latencies)
+
+
+def invalid_bodies(cities, bad_body_rate, workers):
+    """Batch refresh against StubBackend truncating bad_body_rate of the bodies; returns
+    (failed cities, request stats, truncated bodies)"""
+    backend = StubBackend(latency=LATENCY, bad_body_rate=bad_body_rate)
+    with tempfile.TemporaryDirectory() as directory:
+        api = WeatherAPI("sim", cache_dir=directory, limiter=RateLimiter(rate=None), backend=backend)
+        app = WeatherApp("sim", api=api, max_workers=workers)
+        results = app.refresh_cities(cities)
+    failed = sum(1 for current, forecast in results.values() if current is None or forecast is None)
+    return failed, api.request_stats(), backend.hits["bad_bodies"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate limit simulation against a quota-enforcing stub")
+    parser.add_argument("--cities", type=int, default=300)
+    parser.add_argument("--quota", type=int, default=50, help="requests per window")
+    parser.add_argument("--window", type=float, default=1, help="quota window in seconds")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    quota_rate = args.quota / args.window
+    # A full bucket plus one window of refill must fit in the quota, whatever the window alignment
+    rate = (args.quota - BURST) / args.window * 0.98
+    stub = start_stub(latency=LATENCY, quota=args.quota, window=args.window)
+    cities = {f"City {i}": None for i in range(args.cities)}
+    print(f"Quota {args.quota} requests / {args.window:g}s ({quota_rate:.0f}/s); "
+          f"{args.cities:,} cities = {2 * args.cities:,} requests; {args.workers} workers\n")
+
+    print(f"{'client':<24} {'seconds':>8} {'ok/s':>6} {'of quota':>9} {'429s':>6} {'retries':>8} {'failed':>7}")
+    for name, limiter in (("reactive only", RateLimiter(rate=None)),
+                          (f"token bucket {rate:.1f}/s", RateLimiter(rate=rate, capacity=BURST))):
+        time.sleep(args.window)  # start on a fresh quota window
+        stub.hits.clear()
+        elapsed, failed, stats = throughput(stub, cities, limiter, args.workers)
+        served = stub.hits["weather"] + stub.hits["forecast"]
+        print(f"{name:<24} {elapsed:>8.1f} {served / elapsed:>6.1f} {served / elapsed / quota_rate:>8.0%} "
+              f"{stats['throttled']:>6,} {stats['retries']:>8,} {failed:>7}")
+
+    print(f"\n{INTERACTIVE_LOOKUPS} lookups during a batch refresh (token bucket):")
+    for name, priority in (("interactive lane", INTERACTIVE), ("same lane as batch", BATCH)):
+        latencies = priority_lane(stub, cities, rate, args.workers, priority)
+        print(f"  {name:<20} p50 {latencies[len(latencies) // 2] * 1000:7.1f} ms   "
+              f"max {latencies[-1] * 1000:7.1f} ms")
+    stub.stop()
+
+    print("\nBatch refresh with truncated 200 bodies (in-process stub):")
+    for bad_body_rate, count in ((BAD_BODY_RATE, 50), (1.0, 5)):  # each all-invalid city backs off ~7s
+        failed, stats, truncated = invalid_bodies(dict(list(cities.items())[:count]), bad_body_rate, args.workers)
+        print(f"  {bad_body_rate:>4.0%} invalid  {truncated:>4} truncated {stats['retries']:>4} retries  "
+              f"{failed:>3} of {count} cities failed")
@@ -0,0 +1,158 @@
+# Compact binary encoding of cached weather payloads (WeatherAPI(cache_format='binary'))
+#
+# Only the fields WeatherParser reads are kept; everything else in the OpenWeatherMap response
+# (coordinates, ids, clouds, gusts, dt_txt, ...) is dropped. Layout, all little-endian:
+#
+#   header    b'WXC', version (u8), kind (u8: 0 current, 1 forecast)
+#   current   CURRENT record, then name, country, condition, description as u16-length UTF-8
+#   forecast  city name and country as strings, slot count (u16), condition table (u8 count +
+#             strings), then one fixed-width column per slot field: dt (i64), temp, temp_min,
+#             temp_max (f64), humidity (u8), condition index (u8)
+#
+# Numbers keep their full precision, so the parser gives the same results as from the JSON.
+# A payload that doesn't fit (missing fields, float humidity, ...) raises ValueError, and the
+# caller stores it as JSON instead. Readers reject any other version, so bumping VERSION on a
+# layout change makes old cache files plain misses rather than garbage.
+
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Tuple
+
+MAGIC = b'WXC'
+VERSION = 1
+CURRENT_KIND, FORECAST_KIND = 0, 1
+
+HEADER = struct.Struct('<3sBB')
+CURRENT = struct.Struct('<qqqdddBHI')  # dt, sunrise, sunset, temp, feels_like, wind, humidity, pressure, visibility
+COUNT = struct.Struct('<H')
+TABLE = struct.Struct('<B')
+
+
+def _pack_str(value: str) -> bytes:
+    raw = value.encode('utf-8')
+    return COUNT.pack(len(raw)) + raw
+
+
+def _unpack_str(blob: bytes, offset: int) -> Tuple[str, int]:
+    try:
+        (size,) = COUNT.unpack_from(blob, offset)
+    except struct.error as e:
+        raise ValueError("truncated cache file") from e
+    offset += COUNT.size
+    if offset + size > len(blob):
+        raise ValueError("truncated string")
+    return blob[offset:offset + size].decode('utf-8'), offset + size
+
+
+def _column(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if column.itemsize > 1 and sys.byteorder == 'big':
+        column.byteswap()  # stored little-endian whatever the machine
+    return column.tobytes()
+
+
+def _read_column(typecode: str, blob: bytes, offset: int, count: int) -> Tuple[list, int]:
+    column = array(typecode)
+    end = offset + column.itemsize * count
+    if end > len(blob):
+        raise ValueError("truncated cache file")
+    column.frombytes(blob[offset:end])
+    if column.itemsize > 1 and sys.byteorder == 'big':
+        column.byteswap()
+    return column.tolist(), end
+
+
+def _encode_current(data: Dict[str, Any]) -> bytes:
+    main, place, weather = data['main'], data['sys'], data['weather'][0]
+    record = CURRENT.pack(data['dt'], place['sunrise'], place['sunset'], main['temp'], main['feels_like'],
+                          data['wind']['speed'], main['humidity'], main['pressure'], data.get('visibility', 0))
+    return (HEADER.pack(MAGIC, VERSION, CURRENT_KIND) + record + _pack_str(data['name']) +
+            _pack_str(place['country']) + _pack_str(weather['main']) + _pack_str(weather['description']))
+
+
+def _encode_forecast(data: Dict[str, Any]) -> bytes:
+    slots = data['list']
+    city = data.get('city') or {}
+    conditions = [item['weather'][0]['main'] for item in slots]
+    names = list(dict.fromkeys(conditions))
+    index = {name: i for i, name in enumerate(names)}
+    mains = [item['main'] for item in slots]
+    parts = [HEADER.pack(MAGIC, VERSION, FORECAST_KIND), _pack_str(city.get('name', '')),
+             _pack_str(city.get('country', '')), COUNT.pack(len(slots)), TABLE.pack(len(names))]
+    parts += [_pack_str(name) for name in names]
+    parts += [
+        _column('q', [item['dt'] for item in slots]),
+        _column('d', [main['temp'] for main in mains]),
+        _column('d', [main['temp_min'] for main in mains]),
+        _column('d', [main['temp_max'] for main in mains]),
+        _column('B', [main['humidity'] for main in mains]),
+        _column('B', [index[name] for name in conditions]),
+    ]
+    return b''.join(parts)
+
+
+def encode_payload(data: Dict[str, Any]) -> bytes:
+    """Packs a /weather or /forecast response; ValueError if it can't be stored compactly."""
+    try:
+        return _encode_forecast(data) if 'list' in data else _encode_current(data)
+    except (KeyError, IndexError, TypeError, OverflowError, struct.error) as e:
+        raise ValueError(f"payload can't be stored in the compact format: {e!r}") from e
+
+
+def _decode_current(blob: bytes, offset: int) -> Dict[str, Any]:
+    dt, sunrise, sunset, temp, feels_like, wind, humidity, pressure, visibility = CURRENT.unpack_from(blob, offset)
+    offset += CURRENT.size
+    name, offset = _unpack_str(blob, offset)
+    country, offset = _unpack_str(blob, offset)
+    condition, offset = _unpack_str(blob, offset)
+    description, offset = _unpack_str(blob, offset)
+    return {
+        'weather': [{'main': condition, 'description': description}],
+        'main': {'temp': temp, 'feels_like': feels_like, 'pressure': pressure, 'humidity': humidity},
+        'visibility': visibility,
+        'wind': {'speed': wind},
+        'dt': dt,
+        'sys': {'country': country, 'sunrise': sunrise, 'sunset': sunset},
+        'name': name,
+    }
+
+
+def _decode_forecast(blob: bytes, offset: int) -> Dict[str, Any]:
+    name, offset = _unpack_str(blob, offset)
+    country, offset = _unpack_str(blob, offset)
+    (count,) = COUNT.unpack_from(blob, offset)
+    (table_size,) = TABLE.unpack_from(blob, offset + COUNT.size)
+    offset += COUNT.size + TABLE.size
+    names: List[str] = []
+    for _ in range(table_size):
+        condition, offset = _unpack_str(blob, offset)
+        names.append(condition)
+    dts, offset = _read_column('q', blob, offset, count)
+    temps, offset = _read_column('d', blob, offset, count)
+    lows, offset = _read_column('d', blob, offset, count)
+    highs, offset = _read_column('d', blob, offset, count)
+    humidity, offset = _read_column('B', blob, offset, count)
+    conditions, offset = _read_column('B', blob, offset, count)
+    weather = [[{'main': condition}] for condition in names]
+    slots = [{'dt': dt, 'main': {'temp': t, 'temp_min': lo, 'temp_max': hi, 'humidity': h}, 'weather': weather[c]}
+             for dt, t, lo, hi, h, c in zip(dts, temps, lows, highs, humidity, conditions)]
+    return {'cnt': count, 'list': slots, 'city': {'name': name, 'country': country}}
+
+
+def decode_payload(blob: bytes) -> Dict[str, Any]:
+    """Unpacks bytes from encode_payload; ValueError on a foreign file or another format version."""
+    try:
+        magic, version, kind = HEADER.unpack_from(blob, 0)
+    except struct.error as e:
+        raise ValueError("truncated cache file") from e
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} compact cache file")
+    try:
+        if kind == CURRENT_KIND:
+            return _decode_current(blob, HEADER.size)
+        if kind == FORECAST_KIND:
+            return _decode_forecast(blob, HEADER.size)
+    except (struct.error, UnicodeDecodeError, IndexError) as e:  # IndexError: condition index out of range
+        raise ValueError("corrupt cache file") from e
+    raise ValueError(f"unknown payload kind {kind}")
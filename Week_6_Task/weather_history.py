@@ -0,0 +1,306 @@
+# Append-only history of parsed current-weather readings, with hourly and daily rollups
+#
+# Layout under data/history/:
+#   cities.json, conditions.json              id -> name registries (ids are list positions)
+#   2026-10-18/raw-07.bin                     readings of that UTC day for city shard 07
+#   2026-10-18/hourly-07.bin, daily-07.bin    rollups written by compact() once the day is over
+#
+# Every reading is a fixed-width binary record (READING), so a partition file is a plain array:
+# range queries memory-map only the days in range for the one shard holding the city and filter
+# them with NumPy. Partitions are only ever appended to; rollups are rebuilt if their raw
+# partition changed after they were written. Cities are grouped into SHARDS files per day
+# rather than one file per city and day, which would mean millions of tiny files for a fleet.
+
+import json
+import math
+import mmap
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SHARDS = 64
+DAY = 86400
+PERIODS = {'hour': 3600, 'day': DAY}
+ROLLUP_FILES = {'hour': 'hourly', 'day': 'daily'}
+
+# Temperatures are stored in Celsius whatever unit the parser was set to
+READING = np.dtype([
+    ('ts', '<i8'), ('city', '<u4'), ('temp', '<f4'), ('feels_like', '<f4'), ('humidity', 'u1'),
+    ('pressure', '<u2'), ('wind_kmh', '<f4'), ('visibility_km', '<f4'), ('condition', '<u2'),
+])
+ROLLUP = np.dtype([
+    ('ts', '<i8'), ('city', '<u4'), ('count', '<u4'), ('temp_min', '<f4'), ('temp_max', '<f4'),
+    ('temp_mean', '<f4'), ('humidity_mean', '<f4'), ('pressure_mean', '<f4'), ('wind_max', '<f4'),
+])
+
+
+def _timestamp(value) -> float:
+    """Epoch seconds from a datetime or a number"""
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+def rollup(records: np.ndarray, seconds: int) -> np.ndarray:
+    """Downsamples READING records into ROLLUP rows per (city, bucket of `seconds`)."""
+    if not len(records):
+        return np.empty(0, ROLLUP)
+    bucket = records['ts'] - records['ts'] % seconds
+    order = np.lexsort((bucket, records['city']))
+    records, bucket = records[order], bucket[order]
+    city = records['city']
+    starts = np.flatnonzero(np.r_[True, (city[1:] != city[:-1]) | (bucket[1:] != bucket[:-1])])
+    count = np.diff(np.r_[starts, len(records)])
+
+    out = np.empty(len(starts), ROLLUP)
+    out['ts'] = bucket[starts]
+    out['city'] = city[starts]
+    out['count'] = count
+    temp = records['temp'].astype(np.float64)
+    out['temp_min'] = np.minimum.reduceat(temp, starts)
+    out['temp_max'] = np.maximum.reduceat(temp, starts)
+    out['temp_mean'] = np.add.reduceat(temp, starts) / count
+    out['humidity_mean'] = np.add.reduceat(records['humidity'].astype(np.float64), starts) / count
+    out['pressure_mean'] = np.add.reduceat(records['pressure'].astype(np.float64), starts) / count
+    out['wind_max'] = np.maximum.reduceat(records['wind_kmh'], starts)
+    return out
+
+
+class WeatherHistory:
+    """Append-only store of current-weather readings, partitioned by UTC day and city shard."""
+
+    def __init__(self, root: str = "data/history", buffer_size: int = 10_000):
+        self.root = Path(root)
+        self.buffer_size = buffer_size
+        self.city_names = self._load_registry('cities.json')
+        self.condition_names = self._load_registry('conditions.json')
+        self.cities = {name: i for i, name in enumerate(self.city_names)}
+        self.conditions = {name: i for i, name in enumerate(self.condition_names)}
+        self._saved_registry_sizes = (len(self.city_names), len(self.condition_names))
+        self._buffers: Dict[Tuple[int, int], List[tuple]] = defaultdict(list)
+        self._buffered = 0
+        self._last_ts: Dict[int, int] = {}  # city id -> newest reading appended (or found on disk)
+        self._lock = threading.RLock()
+        self._seed_last_ts()
+
+    # ----- Registries -----
+
+    def _load_registry(self, name: str) -> List[str]:
+        try:
+            with open(self.root / name, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _save_registry(self, name: str, names: List[str]):
+        temp_file = self.root / f"{name}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(names, f, ensure_ascii=False)
+        os.replace(temp_file, self.root / name)
+
+    def city_id(self, name: str) -> int:
+        """Id of a city ("London, GB"), registering it if new."""
+        with self._lock:
+            if name not in self.cities:
+                self.cities[name] = len(self.city_names)
+                self.city_names.append(name)
+            return self.cities[name]
+
+    def condition_id(self, name: str) -> int:
+        """Id of a condition text ("Light rain 🌧️"), registering it if new."""
+        with self._lock:
+            if name not in self.conditions:
+                self.conditions[name] = len(self.condition_names)
+                self.condition_names.append(name)
+            return self.conditions[name]
+
+    # ----- Writing -----
+
+    def _seed_last_ts(self):
+        """Loads each city's newest stored reading from the latest two days' partitions, so a
+        repeat of a reading written by an earlier run is recognised too (a cached observation
+        can be from yesterday, UTC; older ones have long expired from any cache)"""
+        if not self.root.exists() or not self.city_names:
+            return
+        newest = np.full(len(self.city_names), -1, dtype=np.int64)
+        for day_dir in sorted(p for p in self.root.iterdir() if p.is_dir())[-2:]:
+            for raw in day_dir.glob('raw-*.bin'):
+                records = self._map(raw, READING)
+                if records is not None:
+                    np.maximum.at(newest, records['city'], records['ts'])
+        seen = np.flatnonzero(newest >= 0)
+        self._last_ts.update(zip(seen.tolist(), newest[seen].tolist()))
+
+    def _partition(self, day: int, kind: str, shard: int) -> Path:
+        name = datetime.fromtimestamp(day * DAY, timezone.utc).strftime('%Y-%m-%d')
+        return self.root / name / f"{kind}-{shard:02d}.bin"
+
+    def _write(self, day: int, shard: int, records: np.ndarray):
+        path = self._partition(day, 'raw', shard)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(records.tobytes())
+
+    def append(self, reading: Dict[str, Any]) -> bool:
+        """Buffers one reading from WeatherParser.parse_current_weather.
+
+        Returns False for a repeat of the city's previous reading (the same observation served
+        again from the cache). Buffers are written out every buffer_size readings and on flush().
+        """
+        ts = reading.get('last_updated_epoch')
+        if ts is None:
+            # Older parsed dicts only have the local-time text, which is ambiguous in the hour
+            # a DST change repeats; the parser now passes the API's epoch along
+            ts = time.mktime(time.strptime(reading['last_updated'], '%Y-%m-%d %H:%M:%S'))
+        ts = int(ts)
+        to_celsius = (lambda t: (t - 32) * 5 / 9) if reading['temp_unit'] == 'F' else float
+        with self._lock:
+            city = self.city_id(reading['location'])
+            if self._last_ts.get(city) == ts:
+                return False
+            self._last_ts[city] = ts
+            self._buffers[(ts // DAY, city % SHARDS)].append((
+                ts, city, to_celsius(reading['temp']), to_celsius(reading['feels_like']),
+                reading['humidity'], reading['pressure'], reading['wind_speed_kmh'],
+                reading['visibility_km'], self.condition_id(reading['condition']),
+            ))
+            self._buffered += 1
+            if self._buffered >= self.buffer_size:
+                self.flush()
+        return True
+
+    def append_records(self, records: np.ndarray):
+        """Appends READING records in bulk (ids from city_id/condition_id), e.g. for imports."""
+        if not len(records):
+            return
+        key = (records['ts'] // DAY) * SHARDS + records['city'] % SHARDS
+        order = np.argsort(key, kind='stable')
+        records, key = records[order], key[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        with self._lock:
+            self._save_registries()
+            for a, b in zip(starts.tolist(), np.r_[starts[1:], len(key)].tolist()):
+                self._write(int(key[a]) // SHARDS, int(key[a]) % SHARDS, records[a:b])
+
+    def _save_registries(self):
+        if self._saved_registry_sizes != (len(self.city_names), len(self.condition_names)):
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._save_registry('cities.json', self.city_names)
+            self._save_registry('conditions.json', self.condition_names)
+            self._saved_registry_sizes = (len(self.city_names), len(self.condition_names))
+
+    def flush(self):
+        """Writes buffered readings to their partitions."""
+        with self._lock:
+            self._save_registries()  # before the records, so every stored id has a name
+            for (day, shard), rows in self._buffers.items():
+                self._write(day, shard, np.array(rows, dtype=READING))
+            self._buffers.clear()
+            self._buffered = 0
+
+    # ----- Rollups -----
+
+    @staticmethod
+    def _map(path: Path, dtype: np.dtype) -> Optional[np.ndarray]:
+        """Memory-maps a partition file as a read-only array (ignoring a torn record at the end)"""
+        try:
+            with open(path, 'rb') as f:
+                count = os.fstat(f.fileno()).st_size // dtype.itemsize
+                if count == 0:
+                    return None
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        return np.frombuffer(mapped, dtype=dtype, count=count)  # the array keeps the map open
+
+    def _fresh_rollup(self, day: int, shard: int, period: str) -> Optional[Path]:
+        """Path of the stored rollup if it is at least as new as its raw partition"""
+        target = self._partition(day, ROLLUP_FILES[period], shard)
+        try:
+            if target.stat().st_mtime >= self._partition(day, 'raw', shard).stat().st_mtime:
+                return target
+        except FileNotFoundError:
+            pass
+        return None
+
+    def compact(self, before: Optional[float] = None) -> int:
+        """Writes hourly and daily rollups of every finished UTC day before `before` (default now).
+
+        Returns the number of rollup files (re)built; up-to-date ones are skipped.
+        """
+        self.flush()
+        last_day = int(_timestamp(before) if before is not None else time.time()) // DAY
+        built = 0
+        if not self.root.exists():
+            return built
+        for day_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            day = int(datetime.strptime(day_dir.name, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()) // DAY
+            if day >= last_day:
+                continue
+            for raw in day_dir.glob('raw-*.bin'):
+                shard = int(raw.stem.split('-')[1])
+                records = None
+                for period, seconds in PERIODS.items():
+                    if self._fresh_rollup(day, shard, period):
+                        continue
+                    if records is None:
+                        records = self._map(raw, READING)
+                        if records is None:
+                            break
+                    target = self._partition(day, ROLLUP_FILES[period], shard)
+                    temp_file = target.with_suffix('.tmp')
+                    with open(temp_file, 'wb') as f:
+                        f.write(rollup(records, seconds).tobytes())
+                    os.replace(temp_file, target)
+                    built += 1
+        return built
+
+    # ----- Queries -----
+
+    def _days(self, start: float, end: float) -> range:
+        return range(int(start) // DAY, (math.ceil(end) - 1) // DAY + 1)
+
+    def readings(self, city: str, start, end) -> np.ndarray:
+        """Raw READING records of a city with start <= ts < end (datetimes or epoch seconds)."""
+        start, end = _timestamp(start), _timestamp(end)
+        city_id = self.cities.get(city)
+        if city_id is None:
+            return np.empty(0, READING)
+        self.flush()
+        parts = []
+        for day in self._days(start, end):
+            data = self._map(self._partition(day, 'raw', city_id % SHARDS), READING)
+            if data is None:
+                continue
+            rows = data[data['city'] == city_id]  # boolean indexing copies out of the map
+            parts.append(rows[(rows['ts'] >= start) & (rows['ts'] < end)])
+        return np.concatenate(parts) if parts else np.empty(0, READING)
+
+    def rollups(self, city: str, start, end, period: str = 'hour') -> np.ndarray:
+        """ROLLUP rows ('hour' or 'day') of a city whose bucket starts in [start, end).
+
+        Compacted days are read from their rollup files; others are rolled up from raw on the fly.
+        """
+        start, end = _timestamp(start), _timestamp(end)
+        city_id = self.cities.get(city)
+        if city_id is None:
+            return np.empty(0, ROLLUP)
+        self.flush()
+        shard = city_id % SHARDS
+        parts = []
+        for day in self._days(start, end):
+            stored = self._fresh_rollup(day, shard, period)
+            if stored is not None:
+                data = self._map(stored, ROLLUP)
+                rows = data[data['city'] == city_id] if data is not None else np.empty(0, ROLLUP)
+            else:
+                raw = self._map(self._partition(day, 'raw', shard), READING)
+                if raw is None:
+                    continue
+                rows = rollup(raw[raw['city'] == city_id], PERIODS[period])
+            parts.append(rows[(rows['ts'] >= start) & (rows['ts'] < end)])
+        return np.concatenate(parts) if parts else np.empty(0, ROLLUP)
@@ -0,0 +1,265 @@
+# Headless batch weather reports: thousands of cities to CSV, JSON Lines or HTML
+#
+# Usage: python weather_report.py CITIES [-o report.csv] [--format csv|jsonl|html] [--units C|F]
+#                                 [--workers 16] [--chunk 256] [--cache-format json|binary]
+#                                 [--stub-latency MS] [--sample N]
+#
+# CITIES is a text file with one "City" or "City,CC" per line ("-" reads stdin). With
+# --sample N, N synthetic cities are used instead; --stub-latency answers from the in-process
+# stub backend rather than the real API, for offline runs. The format follows the output file
+# extension unless --format is given; without -o the report goes to stdout.
+#
+# Cities are handled in chunks: while one chunk is parsed (current weather per city, forecasts
+# with the batched NumPy parser) and written out, the next one is already being fetched through
+# the cache by a thread pool. Only two chunks are ever held in memory, whatever the city count.
+# Progress goes to stderr, followed by the time spent in each stage (fetch, parse, render).
+
+import argparse
+import csv
+import html
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from Current_weather_City_PROJ import (BATCH, CACHE_FORMAT, CACHE_SUFFIXES, MAX_CONCURRENT_REQUESTS,
+                                       OPENWEATHER_API_KEY, RateLimiter, WeatherAPI, WeatherDisplay, WeatherParser)
+
+CHUNK_SIZE = 256
+FORECAST_DAYS = 5
+CURRENT_FIELDS = ['location', 'last_updated', 'temp', 'temp_unit', 'feels_like', 'condition', 'humidity',
+                  'wind_speed_kmh', 'pressure', 'visibility_km', 'sunrise', 'sunset', 'cache_age']
+DAY_FIELDS = ['day', 'min', 'max', 'condition', 'avg_humidity']
+
+
+def read_cities(lines: Iterable[str]) -> Iterator[Tuple[str, Optional[str]]]:
+    """(city, country code or None) for each non-blank "City" / "City,CC" line"""
+    for line in lines:
+        city, _, code = line.strip().partition(',')
+        if city.strip():
+            yield city.strip(), code.strip() or None
+
+
+# ------------ Writers ------------
+
+class ReportWriter:
+    """Streams report rows to a text file. A row is (city, code, parsed current or None, forecast or None)."""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+
+    def begin(self):
+        pass
+
+    def write(self, city: str, code: Optional[str], current: Optional[Dict], forecast: Optional[List[Dict]]):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+
+class CSVReportWriter(ReportWriter):
+    """One row per city: the current-weather fields, then day_1_* .. day_5_* forecast columns."""
+
+    def begin(self):
+        self.writer = csv.writer(self.out)
+        self.writer.writerow(['city', 'country_code', 'status'] + CURRENT_FIELDS +
+                             [f"day_{n}_{field}" for n in range(1, FORECAST_DAYS + 1) for field in DAY_FIELDS])
+
+    def write(self, city, code, current, forecast):
+        row = [city, code or '', 'ok' if current else 'unavailable']
+        row += [current.get(field) for field in CURRENT_FIELDS] if current else [''] * len(CURRENT_FIELDS)
+        days = (forecast or [])[:FORECAST_DAYS]
+        for day in days:
+            row += [day[field] for field in DAY_FIELDS]
+        row += [''] * (len(DAY_FIELDS) * (FORECAST_DAYS - len(days)))
+        self.writer.writerow(row)
+
+
+class JSONLinesReportWriter(ReportWriter):
+    """One JSON object per city: {"city", "country_code", "status", "current", "forecast"}."""
+
+    def write(self, city, code, current, forecast):
+        self.out.write(json.dumps({'city': city, 'country_code': code, 'status': 'ok' if current else 'unavailable',
+                                   'current': current, 'forecast': forecast}, ensure_ascii=False))
+        self.out.write('\n')
+
+
+class HTMLReportWriter(ReportWriter):
+    """A standalone page with one table row per city, colored like the terminal dashboard."""
+
+    STYLE = ("body{font-family:sans-serif}table{border-collapse:collapse}td,th{padding:2px 8px;"
+             "border-bottom:1px solid #ddd;text-align:left}.cold{color:#1565c0}.mild{color:#b8860b}"
+             ".hot{color:#c62828}.unavailable{color:#999}")
+
+    def begin(self):
+        self.out.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Weather report</title>"
+                       f"<style>{self.STYLE}</style></head><body>\n<h1>Weather report</h1>\n"
+                       f"<p>Generated {time.strftime('%Y-%m-%d %H:%M:%S')}</p>\n<table>\n"
+                       f"<tr><th>Location</th><th>Temperature</th><th>Conditions</th><th>Humidity</th>"
+                       f"<th>Wind</th><th>Forecast</th></tr>\n")
+
+    def _temp(self, temp, unit: str) -> str:
+        cold, hot = WeatherDisplay.TEMP_THRESHOLDS[unit]
+        band = 'cold' if temp < cold else 'hot' if temp > hot else 'mild'
+        return f'<span class="{band}">{temp}°{unit}</span>'
+
+    def write(self, city, code, current, forecast):
+        if not current:
+            name = html.escape(f"{city}, {code}" if code else city)
+            self.out.write(f'<tr class="unavailable"><td>{name}</td><td colspan="5">unavailable</td></tr>\n')
+            return
+        unit = current['temp_unit']
+        days = ' '.join(f"{html.escape(day['day'][:3])} {day['icon']} {self._temp(day['max'], unit)}/"
+                        f"{self._temp(day['min'], unit)}" for day in (forecast or [])[:FORECAST_DAYS])
+        self.out.write(f"<tr><td>{html.escape(current['location'])}</td><td>{self._temp(current['temp'], unit)}</td>"
+                       f"<td>{html.escape(current['condition'])}</td><td>{current['humidity']}%</td>"
+                       f"<td>{current['wind_speed_kmh']} km/h</td><td>{days}</td></tr>\n")
+
+    def end(self):
+        self.out.write("</table>\n</body></html>\n")
+
+
+WRITERS = {'csv': CSVReportWriter, 'jsonl': JSONLinesReportWriter, 'html': HTMLReportWriter}
+
+
+# ------------ Pipeline ------------
+
+class BatchReport:
+    """Fetches, parses and writes out cities chunk by chunk, timing each stage."""
+
+    def __init__(self, api: WeatherAPI, parser: WeatherParser, max_workers: int = MAX_CONCURRENT_REQUESTS,
+                 chunk_size: int = CHUNK_SIZE, progress: Optional[TextIO] = sys.stderr):
+        self.api = api
+        self.parser = parser
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.timings = {'fetch': 0.0, 'parse': 0.0, 'render': 0.0}
+        self.fetch_latency = 0.0  # summed over requests; they overlap, so this exceeds fetch wait
+        self.cities = 0
+        self.failed = 0
+
+    def _fetch(self, job: Tuple[str, Optional[str]]) -> Tuple[Optional[Dict], Optional[Dict]]:
+        city, code = job
+        start = time.perf_counter()
+        current = self.api.get_current_weather(city, code, quiet=True, priority=BATCH)
+        forecast = self.api.get_forecast(city, code, quiet=True, priority=BATCH) if current else None
+        self.fetch_latency += time.perf_counter() - start  # float += under the GIL; only a statistic
+        return current, forecast
+
+    def _report_progress(self, started: float, total: Optional[int]):
+        if self.progress is None:
+            return
+        elapsed = time.perf_counter() - started
+        rate = self.cities / elapsed if elapsed else 0.0
+        line = f"\r{self.cities:,}"
+        if total:
+            eta = (total - self.cities) / rate if rate else 0.0
+            line += f"/{total:,} cities ({self.cities / total:.0%}), ETA {eta:.0f}s"
+        else:
+            line += " cities"
+        self.progress.write(f"{line}, {rate:,.0f} cities/s, {self.failed:,} unavailable   ")
+        self.progress.flush()
+
+    def run(self, cities: Iterable[Tuple[str, Optional[str]]], writer: ReportWriter,
+            total: Optional[int] = None) -> Dict[str, float]:
+        """Writes a report row for every (city, code); returns the per-stage timings in seconds."""
+        started = time.perf_counter()
+        cities = iter(cities)
+        writer.begin()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="weather-report") as pool:
+            def submit():
+                chunk = list(islice(cities, self.chunk_size))
+                return chunk, [pool.submit(self._fetch, job) for job in chunk]
+
+            chunk, futures = submit()
+            while chunk:
+                # Stage 1: wait for this chunk's payloads, with the next chunk already in flight
+                start = time.perf_counter()
+                payloads = [future.result() for future in futures]
+                next_chunk, next_futures = submit()
+                self.timings['fetch'] += time.perf_counter() - start
+
+                # Stage 2: parse (forecasts batched, one NumPy pass per chunk)
+                start = time.perf_counter()
+                currents = [self.parser.parse_current_weather(current) if current else None
+                            for current, _ in payloads]
+                forecasts = self.parser.parse_forecasts([forecast for _, forecast in payloads])
+                self.timings['parse'] += time.perf_counter() - start
+
+                # Stage 3: render
+                start = time.perf_counter()
+                for (city, code), current, forecast in zip(chunk, currents, forecasts):
+                    writer.write(city, code, current, forecast)
+                    self.failed += current is None
+                self.timings['render'] += time.perf_counter() - start
+
+                self.cities += len(chunk)
+                self._report_progress(started, total)
+                chunk, futures = next_chunk, next_futures
+        writer.end()
+        self.timings['total'] = time.perf_counter() - started
+        if self.progress is not None:
+            self.progress.write("\n")
+        return self.timings
+
+    def summary(self) -> str:
+        """Per-stage timing table"""
+        total = self.timings.get('total') or 1e-9
+        cities = max(self.cities, 1)
+        lines = [f"{'stage':<8} {'seconds':>8} {'ms/city':>8} {'of total':>9}"]
+        for stage in ('fetch', 'parse', 'render'):
+            seconds = self.timings[stage]
+            lines.append(f"{stage:<8} {seconds:>8.2f} {seconds / cities * 1000:>8.2f} {seconds / total:>8.0%}")
+        lines.append(f"{'total':<8} {total:>8.2f} {total / cities * 1000:>8.2f}   "
+                     f"({self.cities / total:,.0f} cities/s, {self.failed:,} unavailable)")
+        lines.append(f"fetch = time spent waiting on the fetch pool; the {self.cities:,} fetches took "
+                     f"{self.fetch_latency / cities * 1000:.1f} ms each on average")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch weather report for many cities")
+    parser.add_argument("cities", nargs="?", help='file with one "City" or "City,CC" per line, or - for stdin')
+    parser.add_argument("-o", "--output", help="report file (default: stdout)")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="default: from the output extension, else csv")
+    parser.add_argument("--units", choices=["C", "F"], default="C")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENT_REQUESTS)
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="cities parsed and written per batch")
+    parser.add_argument("--cache-dir", default="data/cache")
+    parser.add_argument("--cache-format", choices=sorted(CACHE_SUFFIXES), default=CACHE_FORMAT,
+                        help="binary keeps ~13x more cities within the disk cache budget")
+    parser.add_argument("--stub-latency", type=float, metavar="MS",
+                        help="use the in-process stub backend with this latency instead of the real API")
+    parser.add_argument("--sample", type=int, metavar="N", help="use N synthetic cities instead of a file")
+    args = parser.parse_args()
+    if not args.cities and not args.sample:
+        parser.error("give a cities file or --sample N")
+
+    fmt = args.format or (args.output or '').rsplit('.', 1)[-1].lower()
+    fmt = fmt if fmt in WRITERS else 'csv'
+    if args.stub_latency is not None:
+        from weather_stub_server import StubBackend
+        api = WeatherAPI(OPENWEATHER_API_KEY, cache_dir=args.cache_dir, cache_format=args.cache_format,
+                         limiter=RateLimiter(rate=None), backend=StubBackend(latency=args.stub_latency / 1000))
+    else:
+        api = WeatherAPI(OPENWEATHER_API_KEY, cache_dir=args.cache_dir, cache_format=args.cache_format,
+                         max_connections=args.workers)
+
+    if args.sample:
+        cities, total = ((f"City {i}", None) for i in range(args.sample)), args.sample
+    else:
+        source = sys.stdin if args.cities == '-' else open(args.cities, 'r', encoding='utf-8')
+        cities, total = read_cities(source), None
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+
+    report = BatchReport(api, WeatherParser(args.units), max_workers=args.workers, chunk_size=args.chunk)
+    try:
+        report.run(cities, WRITERS[fmt](out), total)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(report.summary(), file=sys.stderr)
@@ -0,0 +1,303 @@
+# Local stand-in for the OpenWeatherMap API: synthetic payloads, no key, no network, no quota
+#
+# Usage: python weather_stub_server.py [--port 8081] [--latency 50] [--quota 60 --window 60]
+#                                     [--error-rate 0.01] [--bad-body-rate 0.01] [--replay data/cache]
+#
+# Serves GET /data/2.5/weather?q=City[,CC] and /data/2.5/forecast?q=... with payloads shaped like
+# the real responses (same city -> same payload), answering 401 without an appid and 404 for
+# cities starting with "Nowhere". --latency (ms) delays every response to mimic the round trip
+# to the real service. --quota enforces at most that many requests per --window seconds (fixed
+# windows, like the real per-minute limit): extra requests get 429 with a Retry-After header.
+# --error-rate answers that share of requests with a 503, --bad-body-rate cuts that share of the
+# 200 bodies off halfway (invalid JSON). --replay serves payloads recorded in
+# a directory of JSON cache files instead of synthetic ones. Point the app at it with
+#     WeatherAPI(key, base_url="http://127.0.0.1:8081/data/2.5")
+# start it inside a test/benchmark with start_stub(), or skip HTTP entirely with
+#     WeatherAPI(key, backend=StubBackend(latency=0.05))
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+CONDITIONS = ["Clear", "Clouds", "Rain", "Drizzle", "Snow", "Mist", "Thunderstorm"]
+
+
+# ------------ Synthetic payloads ------------
+
+def make_current(city, rng):
+    """A payload shaped like OpenWeatherMap's /weather response"""
+    now = int(time.time())
+    condition = rng.choice(CONDITIONS)
+    return {
+        "coord": {"lon": rng.uniform(-180, 180), "lat": rng.uniform(-90, 90)},
+        "weather": [{"id": 800, "main": condition, "description": condition.lower(), "icon": "01d"}],
+        "base": "stations",
+        "main": {"temp": rng.uniform(-20, 35), "feels_like": rng.uniform(-25, 38),
+                 "temp_min": rng.uniform(-25, 30), "temp_max": rng.uniform(-15, 40),
+                 "pressure": rng.randint(980, 1040), "humidity": rng.randint(10, 100)},
+        "visibility": 10000,
+        "wind": {"speed": rng.uniform(0, 15), "deg": rng.randint(0, 359)},
+        "clouds": {"all": rng.randint(0, 100)},
+        "dt": now,
+        "sys": {"type": 2, "id": 2000, "country": "XX", "sunrise": now - 20000, "sunset": now + 20000},
+        "timezone": 0,
+        "id": rng.randint(1, 10**7),
+        "name": city,
+        "cod": 200,
+    }
+
+
+def make_forecast(city, rng):
+    """A payload shaped like OpenWeatherMap's /forecast response (40 three-hour slots)"""
+    start = int(time.time()) // 10800 * 10800
+    slots = []
+    for i in range(40):
+        temp = rng.uniform(-20, 35)
+        slots.append({
+            "dt": start + i * 10800,
+            "main": {"temp": temp, "feels_like": temp - 1, "temp_min": temp - 2, "temp_max": temp + 2,
+                     "pressure": 1012, "sea_level": 1012, "grnd_level": 1000,
+                     "humidity": rng.randint(10, 100), "temp_kf": 0},
+            "weather": [{"id": 500, "main": rng.choice(CONDITIONS), "description": "light rain", "icon": "10d"}],
+            "clouds": {"all": rng.randint(0, 100)},
+            "wind": {"speed": rng.uniform(0, 15), "deg": rng.randint(0, 359), "gust": rng.uniform(0, 20)},
+            "visibility": 10000,
+            "pop": rng.random(),
+            "sys": {"pod": "d"},
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * 10800)),
+        })
+    return {"cod": "200", "message": 0, "cnt": 40, "list": slots,
+            "city": {"id": rng.randint(1, 10**7), "name": city, "country": "XX",
+                     "coord": {"lat": 0, "lon": 0}, "population": 0, "timezone": 0,
+                     "sunrise": start, "sunset": start + 40000}}
+
+
+PAYLOADS = {"weather": make_current, "forecast": make_forecast}
+RECORDED_PREFIXES = {"current": "weather", "forecast": "forecast"}  # cache file prefix -> endpoint
+
+
+def load_recordings(directory):
+    """Recorded payloads from a directory of JSON files named like the JSON cache files
+    (current_London_GB.json, forecast_London_GB.json), e.g. a copy of data/cache.
+    Returns {endpoint: {city name (lower case): payload}}."""
+    recordings = {endpoint: {} for endpoint in PAYLOADS}
+    for path in sorted(Path(directory).glob("*.json")):
+        prefix = path.stem.split("_", 1)[0]
+        if prefix not in RECORDED_PREFIXES:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        endpoint = RECORDED_PREFIXES[prefix]
+        name = payload.get("name") if endpoint == "weather" else payload.get("city", {}).get("name")
+        if name:
+            recordings[endpoint][name.lower()] = payload
+    return recordings
+
+
+class StubService:
+    """What the stub answers, shared by the HTTP server and the in-process backend.
+
+    Payloads are synthetic (same city -> same payload) or, given recordings, replayed: a city
+    that was recorded gets its own payload, any other city a recorded one picked by its name.
+    latency (seconds) delays every admitted request; error_rate is the share of them answered
+    with a 503 and bad_body_rate the share of 200s whose body is truncated. quota/window enforce
+    a fixed-window request limit answered with 429s.
+    """
+
+    def __init__(self, latency=0.0, quota=None, window=60.0, error_rate=0.0, recordings=None,
+                 bad_body_rate=0.0):
+        self.latency = latency
+        self.quota = quota
+        self.window = window
+        self.error_rate = error_rate
+        self.bad_body_rate = bad_body_rate
+        self.recordings = recordings
+        self.hits = Counter()
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_used = 0
+
+    def count(self, endpoint):
+        with self._lock:
+            self.hits[endpoint] += 1
+
+    def admit(self):
+        """None if the request fits in the current quota window, else whole seconds until it resets"""
+        if self.quota is None:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window:
+                self._window_start, self._window_used = now, 0
+            if self._window_used < self.quota:
+                self._window_used += 1
+                return None
+            return max(1, math.ceil(self._window_start + self.window - now))
+
+    def payload(self, endpoint, city):
+        if not self.recordings or not self.recordings.get(endpoint):
+            return PAYLOADS[endpoint](city, random.Random(city.lower()))
+        recorded = self.recordings[endpoint]
+        if city.lower() in recorded:
+            return recorded[city.lower()]
+        names = sorted(recorded)
+        payload = dict(recorded[names[zlib.crc32(city.lower().encode()) % len(names)]])
+        if endpoint == "weather":
+            payload["name"] = city
+        else:
+            payload["city"] = dict(payload.get("city", {}), name=city)
+        return payload
+
+    def respond(self, endpoint, query):
+        """(status, payload, extra headers) for GET <endpoint> with query {name: [values]}"""
+        city = query.get("q", [""])[0].split(",")[0]
+        retry_after = self.admit()
+        if retry_after is not None:
+            self.count("throttled")
+            return 429, {"cod": 429, "message": "Your account is temporarily blocked due to exceeding "
+                                                "of requests limitation of your subscription type."}, \
+                {"Retry-After": str(retry_after)}
+        self.count(endpoint)
+        if self.latency:
+            time.sleep(self.latency)
+
+        if endpoint not in PAYLOADS:
+            return 404, {"cod": "404", "message": "Internal error"}, {}
+        if self.error_rate and random.random() < self.error_rate:
+            self.count("errors")
+            return 503, {"cod": 503, "message": "Service temporarily unavailable"}, {}
+        if "appid" not in query:
+            return 401, {"cod": 401, "message": "Invalid API key."}, {}
+        if not city or city.startswith("Nowhere"):
+            return 404, {"cod": "404", "message": "city not found"}, {}
+        return 200, self.payload(endpoint, city), {}
+
+    def encode(self, status, payload):
+        """The response body; bad_body_rate of the 200s are cut off halfway, as if lost in transit"""
+        body = json.dumps(payload).encode("utf-8")
+        if status == 200 and self.bad_body_rate and random.random() < self.bad_body_rate:
+            self.count("bad_bodies")
+            body = body[:len(body) // 2]
+        return body
+
+
+# ------------ In-process backend ------------
+
+class StubResponse:
+    """The parts of a requests.Response that WeatherAPI uses"""
+
+    def __init__(self, status_code, body, headers):
+        self.status_code = status_code
+        self.headers = headers
+        self._body = body
+
+    def json(self):
+        return json.loads(self._body)
+
+
+class StubBackend(StubService):
+    """A WeatherAPI backend answering from StubService without any socket:
+
+        WeatherAPI(key, backend=StubBackend(latency=0.05, error_rate=0.01))
+
+    Payloads still go through JSON encoding and decoding, like they would over HTTP.
+    """
+
+    def get(self, endpoint, params, timeout):
+        query = {name: [str(value)] for name, value in params.items()}
+        status, payload, headers = self.respond(endpoint, query)
+        return StubResponse(status, self.encode(status, payload), headers)
+
+    def close(self):
+        pass
+
+
+# ------------ HTTP server ------------
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled client sessions are exercised
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.rsplit("/", 1)[-1]
+        self._send(*self.server.service.respond(endpoint, parse_qs(url.query)))
+
+    def _send(self, status, payload, headers=None):
+        body = self.server.service.encode(status, payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would drown out benchmark output
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stub server that counts requests per endpoint (and 429s as "throttled", 503s as "errors",
+    truncated bodies as "bad_bodies")"""
+    daemon_threads = True
+    request_queue_size = 256  # batch clients open many connections at once
+
+    def __init__(self, port=0, latency=0.0, quota=None, window=60.0, error_rate=0.0, recordings=None,
+                 bad_body_rate=0.0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.service = StubService(latency, quota, window, error_rate, recordings, bad_body_rate)
+
+    @property
+    def hits(self):
+        return self.service.hits
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/data/2.5"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def start_stub(latency=0.0, port=0, quota=None, window=60.0, error_rate=0.0, recordings=None,
+               bad_body_rate=0.0):
+    """Starts a StubServer on a background thread; call .stop() when done"""
+    server = StubServer(port, latency, quota, window, error_rate, recordings, bad_body_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenWeatherMap stub")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0, help="delay per response in ms")
+    parser.add_argument("--quota", type=int, help="requests allowed per window (default: unlimited)")
+    parser.add_argument("--window", type=float, default=60, help="quota window in seconds")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with a 503")
+    parser.add_argument("--bad-body-rate", type=float, default=0,
+                        help="share of 200 answers with a truncated (invalid JSON) body")
+    parser.add_argument("--replay", metavar="DIR", help="serve recorded JSON payloads from DIR (e.g. data/cache)")
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.replay) if args.replay else None
+    server = StubServer(args.port, args.latency / 1000, args.quota, args.window, args.error_rate, recordings,
+                        args.bad_body_rate)
+    if recordings:
+        print(f"Replaying {sum(map(len, recordings.values()))} recorded payloads from {args.replay}")
+    print(f"Serving stub weather API on {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
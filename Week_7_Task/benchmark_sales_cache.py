@@ -0,0 +1,104 @@
+# Benchmark: SalesAnalyzer.load_data from the CSV vs from its columnar cache (SalesCache)
+#
+# Usage: python benchmark_sales_cache.py [--rows 1000000 5000000] [--csv FILE ...]
+#
+# For each data file (generated with --rows, or given with --csv) every mode runs load_data in a
+# fresh process, so each gets its own peak RSS (ru_maxrss):
+#   csv             parse the CSV, no cache (cache_format=None)
+#   <format> build  first run: parse the CSV and write the cache
+#   <format> hit    later runs: load the cache
+# The loaded frames must be identical in every mode. Cache files are removed afterwards.
+# The page cache is warm for all modes (the CSV and cache files have just been read or written).
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from business_insights_report_PROJ import CACHE_SUFFIXES, SalesCache, generate_large_sample_data
+
+
+def child(csv_path, cache_format):
+    """Loads csv_path and prints {"seconds", "peak_rss", "cached", "fingerprint"} as JSON"""
+    import contextlib
+    import io
+    import pandas as pd
+    from business_insights_report_PROJ import SalesAnalyzer
+
+    with tempfile.TemporaryDirectory(prefix="sales-cache-") as workdir:
+        os.chdir(workdir)  # analysis_output/ goes here
+        log = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            analyzer = SalesAnalyzer(csv_path, cache_format=None if cache_format == 'off' else cache_format)
+        seconds = time.perf_counter() - start
+        df = analyzer.df
+        fingerprint = [str(df.dtypes.to_dict()), int(pd.util.hash_pandas_object(df, index=False).sum())]
+        print(json.dumps({'seconds': seconds, 'cached': 'from cache' in log.getvalue(), 'fingerprint': fingerprint,
+                          'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}))
+        os.chdir(os.path.dirname(workdir))  # step out so the directory can be removed
+
+
+def measure(csv_path, cache_format):
+    result = subprocess.run([sys.executable, __file__, '--child', csv_path, cache_format],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None  # killed by the OOM killer or failed
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV vs columnar cache load benchmark")
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000_000, 5_000_000])
+    parser.add_argument("--csv", nargs="*", default=[], help="existing data files to include")
+    parser.add_argument("--child", nargs=2, metavar=("CSV", "FORMAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        sys.exit()
+
+    workdir = tempfile.mkdtemp(prefix="sales-cache-")
+    files = []
+    for rows in args.rows:
+        path = os.path.join(workdir, f"sales_{rows}.csv")
+        generate_large_sample_data(path, rows)
+        files.append((path, True))
+    files += [(os.path.abspath(path), False) for path in args.csv]
+
+    print(f"{'file':<20} {'size':>9} {'mode':<15} {'seconds':>8} {'speed-up':>9} {'peak RSS':>10} {'cache file':>11}")
+    for path, generated in files:
+        size = os.path.getsize(path)
+        runs = [('off', 'csv')] + [(fmt, f"{fmt} {step}") for fmt in CACHE_SUFFIXES for step in ('build', 'hit')]
+        baseline, fingerprints = None, set()
+        for cache_format, mode in runs:
+            cache = SalesCache(path, cache_format) if cache_format != 'off' else None
+            if cache and mode.endswith('build') and os.path.exists(cache.path):
+                os.remove(cache.path)
+            result = measure(path, cache_format)
+            line = f"{os.path.basename(path):<20} {size / 2**30:>5.2f} GiB {mode:<15} "
+            if result is None:
+                print(line + f"{'out of memory / failed':>19}")
+                continue
+            if result['cached'] != mode.endswith('hit'):
+                sys.exit(f"{mode}: expected {'a cache hit' if mode.endswith('hit') else 'a CSV load'}")
+            baseline = baseline or result['seconds']
+            fingerprints.add(json.dumps(result['fingerprint']))
+            cache_size = f"{os.path.getsize(cache.path) / 2**20:>7.0f} MiB" if cache else ''
+            print(line + f"{result['seconds']:>8.2f} {baseline / result['seconds']:>8.1f}x "
+                         f"{result['peak_rss'] / 2**30:>6.2f} GiB {cache_size:>11}")
+        print(f"{'':<20} loaded frames {'identical' if len(fingerprints) == 1 else 'DIFFER'}")
+        for cache_format in CACHE_SUFFIXES:
+            cache = SalesCache(path, cache_format)
+            if os.path.exists(cache.path):
+                os.remove(cache.path)
+        try:
+            os.rmdir(os.path.dirname(SalesCache(path).path))
+        except OSError:
+            pass  # holds other caches
+        if generated:
+            os.remove(path)
+    os.rmdir(workdir)
@@ -0,0 +1,88 @@
+# Benchmark: in-memory vs chunked (out-of-core) SalesAnalyzer, runtime and peak memory
+#
+# Usage: python benchmark_sales_chunked.py [--rows 2000000 10000000] [--csv FILE ...] [--chunksize 1000000]
+#
+# For each data file (generated with --rows, or given with --csv) both modes run load_data,
+# clean_data and print_formatted_report in a fresh process, so each gets its own peak RSS
+# (ru_maxrss). The printed reports must be identical. A mode that runs out of memory is
+# reported as such rather than aborting the comparison.
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from business_insights_report_PROJ import CHUNK_ROWS, generate_large_sample_data
+
+
+def child(mode, csv_path, chunksize):
+    """Runs one mode and prints {"seconds", "peak_rss", "report"} as JSON"""
+    import contextlib
+    import io
+    from business_insights_report_PROJ import SalesAnalyzer
+
+    with tempfile.TemporaryDirectory(prefix="sales-chunked-") as workdir:
+        os.chdir(workdir)  # analysis_output/ goes here
+        report = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = SalesAnalyzer(csv_path, chunksize=chunksize if mode == 'chunked' else None,
+                                     cache_format=None)
+            analyzer.clean_data()
+        with contextlib.redirect_stdout(report):
+            analyzer.print_formatted_report()
+        seconds = time.perf_counter() - start
+        print(json.dumps({'seconds': seconds, 'report': report.getvalue(),
+                          'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}))
+        os.chdir(os.path.dirname(workdir))  # step out so the directory can be removed
+
+
+def measure(mode, csv_path, chunksize):
+    result = subprocess.run([sys.executable, __file__, '--child', mode, csv_path, '--chunksize', str(chunksize)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None  # killed by the OOM killer or failed
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory vs chunked SalesAnalyzer benchmark")
+    parser.add_argument("--rows", type=int, nargs="*", default=[2_000_000, 10_000_000])
+    parser.add_argument("--csv", nargs="*", default=[], help="existing data files to include")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], args.child[1], args.chunksize)
+        sys.exit()
+
+    workdir = tempfile.mkdtemp(prefix="sales-chunked-")
+    files = []
+    for rows in args.rows:
+        path = os.path.join(workdir, f"sales_{rows}.csv")
+        generate_large_sample_data(path, rows)
+        files.append((path, True))
+    files += [(os.path.abspath(path), False) for path in args.csv]
+
+    print(f"chunks of {args.chunksize:,} rows\n")
+    print(f"{'file':<22} {'size':>9} {'mode':<9} {'seconds':>8} {'peak RSS':>10}")
+    for path, generated in files:
+        size = os.path.getsize(path)
+        results = {}
+        for mode in ('memory', 'chunked'):
+            results[mode] = measure(mode, path, args.chunksize)
+            line = f"{os.path.basename(path):<22} {size / 2**30:>5.2f} GiB {mode:<9} "
+            if results[mode] is None:
+                print(line + f"{'out of memory / failed':>19}")
+            else:
+                print(line + f"{results[mode]['seconds']:>8.1f} {results[mode]['peak_rss'] / 2**30:>6.2f} GiB")
+        if all(results.values()):
+            same = results['memory']['report'] == results['chunked']['report']
+            print(f"{'':<22} reports {'identical' if same else 'DIFFER'}")
+        if generated:
+            os.remove(path)
+    os.rmdir(workdir)
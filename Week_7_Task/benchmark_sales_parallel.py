@@ -0,0 +1,122 @@
+# Benchmark: partitioned SalesAnalyzer (process pool) scaling with the number of workers
+#
+# Usage: python benchmark_sales_parallel.py [--rows 5000000] [--csv FILE ...] [--workers 1 2 4 ...]
+#
+# For each data file (generated with --rows, or given with --csv) the in-memory mode and the
+# partitioned mode with each worker count run load_data, clean_data and the three analyses in a
+# fresh process. Peak RSS is the largest of the process and its workers (ru_maxrss).
+# Every partitioned run is checked against the in-memory results: the by-category and monthly
+# tables and the basic stats must agree to a relative 1e-12 (float sums depend on the order
+# they are added in), and the printed reports must be identical.
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from business_insights_report_PROJ import generate_large_sample_data
+
+
+def child(csv_path, workers):
+    """Runs one mode and prints {"seconds", "peak_rss", "report", "results"} as JSON"""
+    import contextlib
+    import io
+    from business_insights_report_PROJ import SalesAnalyzer
+
+    with tempfile.TemporaryDirectory(prefix="sales-parallel-") as workdir:
+        os.chdir(workdir)  # analysis_output/ goes here
+        report = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer = SalesAnalyzer(csv_path, cache_format=None, workers=workers or None)
+            analyzer.clean_data()
+            stats = analyzer.calculate_basic_stats()
+            categories = analyzer.analyze_sales_by_category()
+            monthly = analyzer.analyze_monthly_trends()
+        seconds = time.perf_counter() - start
+        with contextlib.redirect_stdout(report):
+            analyzer.print_formatted_report()
+        results = {
+            'stats': [float(stats[key]) for key in ('total_sales', 'average_order', 'total_orders',
+                                                    'unique_customers', 'unique_products')],
+            'categories': {str(name): row.tolist() for name, row in categories.iterrows()},
+            'monthly': {str(month): row.fillna(0).tolist() for month, row in monthly.iterrows()},
+        }
+        peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+        print(json.dumps({'seconds': seconds, 'report': report.getvalue(), 'results': results,
+                          'peak_rss': peak * 1024}))
+        os.chdir(os.path.dirname(workdir))  # step out so the directory can be removed
+
+
+def measure(csv_path, workers):
+    result = subprocess.run([sys.executable, __file__, '--child', csv_path, str(workers)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None  # killed by the OOM killer or failed
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def same_results(expected, actual):
+    def close(a, b):
+        return np.allclose(a, b, rtol=1e-12, atol=0)
+    return (close(expected['stats'], actual['stats'])
+            and expected['categories'].keys() == actual['categories'].keys()
+            and all(close(row, actual['categories'][name]) for name, row in expected['categories'].items())
+            and list(expected['monthly']) == list(actual['monthly'])
+            and all(close(row, actual['monthly'][month]) for month, row in expected['monthly'].items()))
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Partitioned SalesAnalyzer scaling benchmark")
+    parser.add_argument("--rows", type=int, nargs="*", default=[5_000_000])
+    parser.add_argument("--csv", nargs="*", default=[], help="existing data files to include")
+    parser.add_argument("--workers", type=int, nargs="*",
+                        default=sorted({1, *[2 ** i for i in range(1, cores.bit_length())], cores}))
+    parser.add_argument("--child", nargs=2, metavar=("CSV", "WORKERS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        sys.exit()
+
+    workdir = tempfile.mkdtemp(prefix="sales-parallel-")
+    files = []
+    for rows in args.rows:
+        path = os.path.join(workdir, f"sales_{rows}.csv")
+        generate_large_sample_data(path, rows)
+        files.append((path, True))
+    files += [(os.path.abspath(path), False) for path in args.csv]
+
+    print(f"{cores} CPU core(s) available\n")
+    print(f"{'file':<20} {'size':>9} {'mode':<11} {'seconds':>8} {'speed-up':>9} {'peak RSS':>10}  results")
+    for path, generated in files:
+        size = os.path.getsize(path)
+        expected = one_worker = None
+        for workers in [0] + args.workers:
+            result = measure(path, workers)
+            mode = f"{workers} worker{'s' if workers > 1 else ''}" if workers else 'in-memory'
+            line = f"{os.path.basename(path):<20} {size / 2**30:>5.2f} GiB {mode:<11} "
+            if result is None:
+                print(line + f"{'out of memory / failed':>19}")
+                continue
+            if workers == 0:
+                expected = result
+                print(line + f"{result['seconds']:>8.1f} {'':>9} {result['peak_rss'] / 2**30:>6.2f} GiB  reference")
+                continue
+            one_worker = one_worker or result['seconds']
+            check = 'no reference'
+            if expected:
+                same = same_results(expected['results'], result['results'])
+                check = ('identical' if same and expected['report'] == result['report']
+                         else 'equal, report text differs' if same else 'DIFFER')
+            print(line + f"{result['seconds']:>8.1f} {one_worker / result['seconds']:>8.2f}x "
+                         f"{result['peak_rss'] / 2**30:>6.2f} GiB  {check}")
+        if generated:
+            os.remove(path)
+    os.rmdir(workdir)
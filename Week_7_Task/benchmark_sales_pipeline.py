@@ -0,0 +1,68 @@
+# Benchmark: the automated SalesAnalyzer pipeline with and without memoized aggregates
+#
+# Usage: python benchmark_sales_pipeline.py [--rows 50000000] [--csv PATH]
+#
+# Generates an order export of --rows rows (kept at --csv for later runs, ~47 bytes per row),
+# loads and cleans it, then runs the three report steps of the non-interactive pipeline
+# (print_formatted_report, create_visualizations, generate_report) twice:
+#   recompute  every step computes its aggregates again, as before memoization
+#   memoized   each aggregate is computed once for the current data version
+# Report output is discarded; charts and the Excel file go to a temporary directory.
+
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+from business_insights_report_PROJ import SalesAnalyzer, generate_large_sample_data
+
+STEPS = ['print_formatted_report', 'create_visualizations', 'generate_report']
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def run_steps(analyzer, recompute):
+    timings = {}
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        for step in STEPS:
+            if recompute:
+                analyzer.invalidate()
+            timings[step] = timed(getattr(analyzer, step))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SalesAnalyzer pipeline benchmark")
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--csv", help="data file to reuse or create (default: sales_<rows>.csv in the temp dir)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="sales-bench-")
+    csv_path = os.path.abspath(args.csv or os.path.join(workdir, f"sales_{args.rows}.csv"))
+    if not os.path.exists(csv_path):
+        elapsed = timed(generate_large_sample_data, csv_path, args.rows)
+        print(f"Generated {args.rows:,} rows ({os.path.getsize(csv_path) / 2**30:.2f} GiB) in {elapsed:.1f}s")
+
+    os.chdir(workdir)  # analysis_output/ goes here
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        analyzer = SalesAnalyzer(csv_path)
+        load = time.perf_counter() - start
+        clean = timed(analyzer.clean_data)
+    print(f"load {load:.1f}s, clean {clean:.1f}s, {len(analyzer.df):,} rows after cleaning\n")
+
+    print(f"{'mode':<10} " + " ".join(f"{step:>24}" for step in STEPS) + f" {'total':>8} {'aggregations':>13}")
+    for mode in ('recompute', 'memoized'):
+        analyzer.invalidate()
+        misses = analyzer.cache_misses
+        timings = run_steps(analyzer, recompute=mode == 'recompute')
+        print(f"{mode:<10} " + " ".join(f"{timings[step]:>23.2f}s" for step in STEPS) +
+              f" {sum(timings.values()):>7.2f}s {analyzer.cache_misses - misses:>13}")
+    os.chdir(os.path.dirname(csv_path) if args.csv else "/")
+    shutil.rmtree(workdir, ignore_errors=True)
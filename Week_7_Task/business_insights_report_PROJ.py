@@ -1,236 +1,939 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-import os
-from datetime import datetime
-
-class SalesAnalyzer:
-    """Analyzes sales data and generates professional business insights."""
-    
-    def __init__(self, data_path):
-        self.data_path = data_path
-        self.df = None
-        self.output_dir = 'analysis_output'
-        os.makedirs(self.output_dir, exist_ok=True)
-        self.load_data()
-    
-    def load_data(self):
-        """Loads data from CSV and standardizes formats."""
-        try:
-            if not os.path.exists(self.data_path):
-                print(f"File not found: {self.data_path}. Creating sample data...")
-                generate_sample_data(self.data_path)
-            
-            self.df = pd.read_csv(self.data_path)
-            self.df.columns = [col.lower().strip() for col in self.df.columns]
-            
-            if 'order_date' in self.df.columns:
-                self.df['order_date'] = pd.to_datetime(self.df['order_date'], errors='coerce')
-            
-            print(f"✅ Data loaded successfully. Shape: {self.df.shape}")
-        except Exception as e:
-            print(f"❌ Load Error: {e}")
-    
-    def clean_data(self):
-        """Handles duplicates and fills missing values using Median/Mode."""
-        if self.df is None: return
-        
-        initial_rows = len(self.df)
-        self.df.drop_duplicates(inplace=True)
-        removed = initial_rows - len(self.df)
-        
-        # Fill missing numeric values with Median
-        num_cols = self.df.select_dtypes(include=[np.number]).columns
-        for col in num_cols:
-            if self.df[col].isnull().any():
-                self.df[col] = self.df[col].fillna(self.df[col].median())
-        
-        # Fill missing categories with Mode
-        cat_cols = self.df.select_dtypes(include=['object']).columns
-        for col in cat_cols:
-            if self.df[col].isnull().any():
-                mode_val = self.df[col].mode()
-                fill = mode_val[0] if not mode_val.empty else "Unknown"
-                self.df[col] = self.df[col].fillna(fill)
-        
-        print(f"✨ Data cleaning complete. Removed {removed} duplicate rows.")
-
-    def calculate_basic_stats(self):
-        """Calculates core business KPIs."""
-        if self.df is None or self.df.empty: return {}
-        
-        stats = {
-            'total_sales': self.df['total_amount'].sum(),
-            'average_order': self.df['total_amount'].mean(),
-            'total_orders': len(self.df),
-            'unique_customers': self.df['customer_id'].nunique() if 'customer_id' in self.df.columns else 0,
-            'unique_products': self.df['product_id'].nunique() if 'product_id' in self.df.columns else 0
-        }
-        
-        if 'order_date' in self.df.columns:
-            stats['date_range'] = {
-                'start': self.df['order_date'].min(),
-                'end': self.df['order_date'].max()
-            }
-        return stats
-
-    def analyze_sales_by_category(self):
-        """Analyze sales by product category."""
-        if 'category' not in self.df.columns: return pd.DataFrame()
-        cat_sales = self.df.groupby('category').agg({'total_amount': 'sum', 'order_id': 'count'}).rename(columns={'order_id': 'order_count'})
-        cat_sales['percentage'] = (cat_sales['total_amount'] / cat_sales['total_amount'].sum()) * 100
-        return cat_sales.sort_values('total_amount', ascending=False)
-
-    def analyze_monthly_trends(self):
-        """Calculates monthly revenue and growth rates."""
-        if 'order_date' not in self.df.columns: return pd.DataFrame()
-        temp = self.df.dropna(subset=['order_date']).copy()
-        temp['month_year'] = temp['order_date'].dt.to_period('M')
-        monthly = temp.groupby('month_year').agg({'total_amount': 'sum', 'order_id': 'count'}).rename(columns={'order_id': 'order_count'})
-        monthly['growth_rate'] = monthly['total_amount'].pct_change() * 100
-        return monthly
-
-    def print_formatted_report(self):
-        """Generates the exact formatted summary requested in the sample output."""
-        stats = self.calculate_basic_stats()
-        cat_data = self.analyze_sales_by_category()
-        monthly_data = self.analyze_monthly_trends()
-        
-        print("\n📊 SALES DATA ANALYSIS REPORT")
-        print("===============================")
-        
-        if 'date_range' in stats:
-            print(f"\n📅 Analysis Period: {stats['date_range']['start'].strftime('%b %Y')} - {stats['date_range']['end'].strftime('%b %Y')}")
-        
-        print("\n📈 BASIC STATISTICS:")
-        print(f"- Total Sales: ${stats.get('total_sales', 0):,.2f}")
-        print(f"- Total Orders: {stats.get('total_orders', 0)}")
-        print(f"- Average Order Value: ${stats.get('average_order', 0):,.2f}")
-        print(f"- Unique Customers: {stats.get('unique_customers', 0)}")
-        print(f"- Unique Products: {stats.get('unique_products', 0)}")
-
-        if not cat_data.empty:
-            print("\n🏆 TOP PRODUCT CATEGORIES:")
-            for i, (name, row) in enumerate(cat_data.head(5).iterrows(), 1):
-                print(f"{i}. {name}: ${row['total_amount']:,.0f} ({row['percentage']:.1f}%)")
-
-        if not monthly_data.empty:
-            print("\n📅 MONTHLY TRENDS:")
-            highest_month = monthly_data['total_amount'].idxmax()
-            lowest_month = monthly_data['total_amount'].idxmin()
-            best_growth_month = monthly_data['growth_rate'].idxmax()
-            print(f"- Highest Sales Month: {highest_month} (${monthly_data.loc[highest_month, 'total_amount']:,.0f})")
-            print(f"- Lowest Sales Month: {lowest_month} (${monthly_data.loc[lowest_month, 'total_amount']:,.0f})")
-            print(f"- Average Monthly Sales: ${monthly_data['total_amount'].mean():,.2f}")
-            print(f"- Best Growth Month: {best_growth_month} ({monthly_data.loc[best_growth_month, 'growth_rate']:+.1f}%)")
-
-        print("\n👥 CUSTOMER INSIGHTS:")
-        print(f"- Average Customer Value: ${stats.get('total_sales', 0) / stats.get('unique_customers', 1):,.2f}")
-        print("- Top 10% Customers Generate: High percentage of revenue (calculated in full report)")
-
-        print("\n💰 RECOMMENDATIONS:")
-        print(f"1. Focus marketing on {cat_data.index[0]} category")
-        print("2. Improve customer retention programs")
-        print("3. Consider seasonal promotions based on monthly peaks")
-        print("4. Expand product range in high-performing categories")
-
-    def create_visualizations(self):
-        """Generates and saves the required PNG charts."""
-        if self.df is None: return
-        plt.style.use('ggplot')
-        
-        # 1. Monthly Trend
-        monthly = self.analyze_monthly_trends()
-        if not monthly.empty:
-            plt.figure(figsize=(10, 5))
-            monthly['total_amount'].plot(kind='line', marker='o', color='teal')
-            plt.title('Monthly Sales Trend')
-            plt.ylabel('Sales ($)')
-            plt.tight_layout()
-            plt.savefig(f"{self.output_dir}/monthly_trend.png")
-            plt.close()
-
-        # 2. Category Share
-        cat_data = self.analyze_sales_by_category()
-        if not cat_data.empty:
-            plt.figure(figsize=(10, 6))
-            cat_data['total_amount'].plot(kind='bar', color='skyblue')
-            plt.title('Sales by Category')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig(f"{self.output_dir}/category_sales.png")
-            plt.close()
-        
-        print(f"📊 Visualizations saved in '{self.output_dir}/'")
-
-    def generate_report(self):
-        """Exports analysis to an Excel file."""
-        report_path = f"{self.output_dir}/sales_report.xlsx"
-        try:
-            with pd.ExcelWriter(report_path, engine='openpyxl') as writer:
-                stats = self.calculate_basic_stats()
-                if 'date_range' in stats: del stats['date_range']
-                pd.DataFrame([stats]).to_excel(writer, sheet_name='Summary', index=False)
-                
-                monthly = self.analyze_monthly_trends()
-                if not monthly.empty:
-                    monthly.index = monthly.index.astype(str)
-                    monthly.to_excel(writer, sheet_name='Monthly_Trends')
-                
-                cat_data = self.analyze_sales_by_category()
-                if not cat_data.empty:
-                    cat_data.to_excel(writer, sheet_name='Category_Analysis')
-                    
-            print(f"📂 Full Excel report generated: {report_path}")
-        except Exception as e:
-            print(f"❌ Excel Error: {e}")
-
-def generate_sample_data(filename):
-    """Generates dummy data for immediate testing."""
-    np.random.seed(42)
-    rows = 500
-    data = {
-        'order_id': range(1000, 1000 + rows),
-        'order_date': pd.date_range(start='2024-01-01', periods=rows, freq='D'),
-        'customer_id': np.random.randint(500, 700, rows),
-        'product_id': np.random.randint(10, 100, rows),
-        'category': np.random.choice(['Electronics', 'Clothing', 'Home & Garden', 'Books', 'Sports'], rows),
-        'quantity': np.random.randint(1, 5, rows),
-        'total_amount': np.random.uniform(20, 1000, rows).round(2)
-    }
-    df = pd.DataFrame(data)
-    df = pd.concat([df, df.iloc[:10]], ignore_index=True) # Add duplicates
-    df.loc[5:15, 'total_amount'] = np.nan # Add missing values
-    df.to_csv(filename, index=False)
-
-def main():
-    data_file = "sales_data.csv"
-    analyzer = SalesAnalyzer(data_file)
-    
-    while True:
-        print("\n[MENU]")
-        print("1. Clean Data")
-        print("2. Print Analysis Report (Sample Output Style)")
-        print("3. Generate Visual Charts")
-        print("4. Export Full Excel Report")
-        print("5. Exit")
-        
-        try:
-            choice = input("\nSelect Option (1-5): ").strip()
-        except EOFError:
-            print("\nNon-interactive mode detected. Running full automated pipeline...")
-            analyzer.clean_data()
-            analyzer.print_formatted_report()
-            analyzer.create_visualizations()
-            analyzer.generate_report()
-            break
-            
-        if choice == '1': analyzer.clean_data()
-        elif choice == '2': analyzer.print_formatted_report()
-        elif choice == '3': analyzer.create_visualizations()
-        elif choice == '4': analyzer.generate_report()
-        elif choice == '5': break
-        else: print("Invalid choice.")
-
-if __name__ == "__main__":
+import pandas as pd
+import matplotlib.pyplot as plt
+import numpy as np
+import argparse
+import contextlib
+import copy
+import functools
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# The columnar cache needs pyarrow; without it every run parses the CSV
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+def memoized(method):
+    """Caches an analysis result until the data changes (see SalesAnalyzer.invalidate).
+
+    Callers get their own copy, so a report step can modify it without affecting the next one.
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        entry = self._results.get(method.__name__)
+        if entry is not None and entry[0] == self.data_version:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            entry = (self.data_version, method(self))
+            self._results[method.__name__] = entry
+        return copy.deepcopy(entry[1])
+    return wrapper
+
+# Chunked mode: dtypes that are the same in every chunk (a chunk without missing ids would
+# otherwise come back as int64 and hash differently from a float64 one); other columns are text
+CHUNK_DTYPES = {'order_id': 'float64', 'customer_id': 'float64', 'product_id': 'float64',
+                'quantity': 'float64', 'total_amount': 'float64', 'category': 'str'}
+CHUNK_ROWS = 1_000_000
+GROUP_COLUMNS = ['rows', 'amount_sum', 'amount_count', 'order_ids']
+# Partitioned mode: CSV bytes per partition (whole lines), at least one partition per worker
+PARTITION_BYTES = 64 * 2**20
+
+def chunk_dtypes(header):
+    """({CSV column: normalized name}, read_csv dtypes) for the chunked and partitioned modes"""
+    names = {col: col.lower().strip() for col in header}
+    dtypes = {col: CHUNK_DTYPES.get(name, 'str') for col, name in names.items() if name != 'order_date'}
+    return names, dtypes
+
+def prepared_chunk(chunk, names):
+    """A chunk read with chunk_dtypes, with normalized column names and parsed dates, and its row hashes"""
+    chunk.columns = [names[col] for col in chunk.columns]
+    if 'order_date' in chunk.columns:
+        chunk['order_date'] = pd.to_datetime(chunk['order_date'], errors='coerce')
+    return chunk, pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+def repeated_rows(hashes, seen=None):
+    """Flags rows equal to an earlier row of the slice or to a row in seen (sorted hashes).
+
+    Returns (mask of the repeated rows, sorted hashes of the others).
+    """
+    # In hash order (stable, so the first of equal rows stays first) a repeat within the
+    # slice follows its original, and lookups in `seen` walk memory in order
+    order = np.argsort(hashes, kind='stable')
+    ordered = hashes[order]
+    repeated_sorted = np.zeros(len(ordered), dtype=bool)
+    repeated_sorted[1:] = ordered[1:] == ordered[:-1]
+    if seen is not None and len(seen):
+        found = np.minimum(np.searchsorted(seen, ordered), len(seen) - 1)
+        repeated_sorted |= seen[found] == ordered
+    repeated = np.empty_like(repeated_sorted)
+    repeated[order] = repeated_sorted
+    return repeated, ordered[~repeated_sorted]
+
+def csv_partitions(path, count):
+    """Splits the lines after the header into about count byte ranges -> [(start, end)]
+
+    Assumes no quoted field spans lines, as in the order exports.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()
+        bounds = [f.tell()]
+        for i in range(1, count):
+            target = max(bounds[-1], bounds[0] + (size - bounds[0]) * i // count)
+            f.seek(target - 1)
+            f.readline()  # to the start of the next line at or after target
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def aggregate_partition(path, start, end, seen=None):
+    """Partitioned mode worker: aggregates the lines in bytes start:end of the CSV.
+
+    Returns (SalesAggregate of the distinct rows, of the repeated rows, sorted hashes of the
+    distinct rows). Rows count as repeated if an earlier row of the partition or seen (sorted
+    hashes of rows in earlier partitions) is equal to them.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        body = f.read(end - start)
+    names, dtypes = chunk_dtypes(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+    chunk, hashes = prepared_chunk(pd.read_csv(io.BytesIO(header + body), dtype=dtypes), names)
+    del body
+    repeated, distinct = repeated_rows(hashes, seen)
+    return SalesAggregate.of(chunk[~repeated]), SalesAggregate.of(chunk[repeated]), distinct
+
+def weighted_median(counts):
+    """Median of the values in counts.index, each repeated counts[value] times (like Series.median)."""
+    if counts is None or counts.empty:
+        return np.nan
+    counts = counts.sort_index()
+    cumulative = counts.to_numpy().cumsum()
+    values = counts.index.to_numpy()
+    total = cumulative[-1]
+    low = values[np.searchsorted(cumulative, (total + 1) // 2)]
+    high = values[np.searchsorted(cumulative, total // 2 + 1)]
+    return (low + high) / 2
+
+class SalesAggregate:
+    """Mergeable partial aggregates of a slice of orders, for the chunked (out-of-core) mode.
+
+    Per category and per month it keeps row counts, amount sums and non-null counts; overall it
+    keeps value counts of amounts and customer/product ids. That is enough to derive the report
+    figures for any union of slices, including the median/mode fills clean_data would apply.
+    """
+
+    def __init__(self):
+        self.columns = set()
+        self.rows = 0
+        self.amount_sum = 0.0
+        self.by_category = pd.DataFrame(columns=GROUP_COLUMNS, dtype='float64')
+        self.by_month = pd.DataFrame(columns=GROUP_COLUMNS, dtype='float64')
+        self.value_counts = {}  # column -> Series of value -> count (non-null values only)
+        self.missing = {}       # column -> number of nulls
+        self.date_min = pd.NaT
+        self.date_max = pd.NaT
+
+    @classmethod
+    def of(cls, df):
+        """Aggregates of the rows of one chunk."""
+        agg = cls()
+        agg.columns = set(df.columns)
+        agg.rows = len(df)
+        amount = df['total_amount']
+        agg.amount_sum = float(amount.sum())
+        values = pd.DataFrame({
+            'rows': np.ones(len(df), dtype=np.int64),
+            'amount_sum': amount,
+            'amount_count': amount.notna().astype(np.int64),
+            'order_ids': df['order_id'].notna().astype(np.int64),
+        }, index=df.index)
+        if 'category' in df.columns:
+            agg.by_category = values.groupby(df['category'], dropna=False, sort=False).sum()
+        if 'order_date' in df.columns:
+            agg.by_month = values.groupby(df['order_date'].dt.to_period('M'), sort=False).sum()
+            agg.date_min, agg.date_max = df['order_date'].min(), df['order_date'].max()
+        for col in ('total_amount', 'order_id', 'customer_id', 'product_id'):
+            if col in df.columns:
+                agg.missing[col] = int(df[col].isna().sum())
+                if col != 'order_id':  # order ids are only counted, so their fill value never matters
+                    agg.value_counts[col] = df[col].value_counts().sort_index()
+        return agg
+
+    def merged(self, other):
+        """A new aggregate covering this slice and other (which may be None)."""
+        if other is None:
+            return self
+        out = SalesAggregate()
+        out.columns = self.columns | other.columns
+        out.rows = self.rows + other.rows
+        out.amount_sum = self.amount_sum + other.amount_sum
+        out.by_category = self.by_category.add(other.by_category, fill_value=0)
+        out.by_month = self.by_month.add(other.by_month, fill_value=0)
+        for col in self.value_counts.keys() | other.value_counts.keys():
+            mine, theirs = self.value_counts.get(col), other.value_counts.get(col)
+            out.value_counts[col] = (mine if theirs is None else theirs if mine is None
+                                     else mine.add(theirs, fill_value=0))
+        for col in self.missing.keys() | other.missing.keys():
+            out.missing[col] = self.missing.get(col, 0) + other.missing.get(col, 0)
+        dates = [d for d in (self.date_min, other.date_min, self.date_max, other.date_max) if not pd.isna(d)]
+        out.date_min, out.date_max = (min(dates), max(dates)) if dates else (pd.NaT, pd.NaT)
+        return out
+
+    def _distinct(self, col, cleaned):
+        """nunique of an id column, counting the median fill if clean_data would add it"""
+        if col not in self.columns:
+            return 0
+        counts = self.value_counts[col]
+        distinct = len(counts)
+        if cleaned and self.missing[col]:
+            fill = weighted_median(counts)
+            distinct += not np.isnan(fill) and fill not in counts.index
+        return distinct
+
+    def results(self, cleaned):
+        """(calculate_basic_stats, analyze_sales_by_category, analyze_monthly_trends) results.
+
+        cleaned=True gives them as after clean_data (call it on the aggregate of distinct rows):
+        nulls in numeric columns count as the column median, missing categories as the mode.
+        """
+        if self.rows == 0:
+            return {}, pd.DataFrame(), pd.DataFrame()
+        amount_fill = weighted_median(self.value_counts['total_amount']) if cleaned else np.nan
+        filled = not np.isnan(amount_fill)
+        orders_filled = cleaned and self.missing['order_id'] < self.rows
+
+        def groups(frame):
+            frame = frame.sort_index()
+            out = pd.DataFrame(index=frame.index)
+            out['total_amount'] = frame['amount_sum'] + (frame['rows'] - frame['amount_count']) * (
+                amount_fill if filled else 0.0)
+            out['order_count'] = (frame['rows'] if orders_filled else frame['order_ids']).astype(np.int64)
+            return out
+
+        missing_amounts = self.missing['total_amount'] if filled else 0
+        total_sales = self.amount_sum + missing_amounts * (amount_fill if filled else 0.0)
+        amount_count = self.rows - self.missing['total_amount'] + missing_amounts
+        stats = {
+            'total_sales': total_sales,
+            'average_order': total_sales / amount_count if amount_count else np.nan,
+            'total_orders': self.rows,
+            'unique_customers': self._distinct('customer_id', cleaned),
+            'unique_products': self._distinct('product_id', cleaned),
+        }
+        if 'order_date' in self.columns:
+            stats['date_range'] = {'start': self.date_min, 'end': self.date_max}
+
+        cat_sales = pd.DataFrame()
+        if 'category' in self.columns:
+            by_category = self.by_category
+            unknown = by_category.index.isna()
+            if unknown.any():
+                missing = by_category[unknown].sum()
+                by_category = by_category[~unknown]
+                if cleaned:
+                    # clean_data's mode fill: the most frequent category, the first by name on ties
+                    if by_category.empty:
+                        mode = 'Unknown'
+                        by_category = pd.DataFrame([missing], index=pd.Index([mode], dtype='str'))
+                    else:
+                        counts = by_category['rows'].sort_index()
+                        mode = counts.idxmax()
+                        by_category = by_category.copy()
+                        by_category.loc[mode] += missing
+            cat_sales = groups(by_category)
+            cat_sales.index.name = 'category'
+            cat_sales['percentage'] = (cat_sales['total_amount'] / cat_sales['total_amount'].sum()) * 100
+            cat_sales = cat_sales.sort_values('total_amount', ascending=False)
+
+        monthly = pd.DataFrame()
+        if 'order_date' in self.columns:
+            monthly = groups(self.by_month)
+            monthly.index.name = 'month_year'
+            monthly['growth_rate'] = monthly['total_amount'].pct_change() * 100
+        return stats, cat_sales, monthly
+
+# Columnar cache of the loaded CSV (in-memory mode), in CACHE_DIR next to the data file
+CACHE_FORMAT = 'parquet'
+CACHE_SUFFIXES = {'parquet': '.parquet', 'arrow': '.arrow'}
+CACHE_DIR = '.sales_cache'
+CACHE_VERSION = 1
+ID_COLUMNS = ['order_id', 'customer_id', 'product_id']
+
+class SalesCache:
+    """Typed columnar copy of a sales CSV as load_data leaves it, so later runs skip parsing.
+
+    'parquet' files are compact; 'arrow' (uncompressed Arrow IPC) files are larger but
+    memory-mapped, so loading copies nothing until pandas needs it. Each file records the CSV's
+    size and mtime and is stale as soon as either changes. Categories are stored
+    dictionary-encoded and come back as a categorical; integral id columns are stored in the
+    narrowest integer type and come back with the dtype read_csv gives them (float64 if any
+    are missing), so clean_data and the analyses see exactly what a CSV load would give.
+    """
+
+    def __init__(self, data_path, cache_format=CACHE_FORMAT):
+        if cache_format not in CACHE_SUFFIXES:
+            raise ValueError(f"cache_format must be one of {sorted(CACHE_SUFFIXES)}")
+        self.data_path = data_path
+        self.cache_format = cache_format
+        directory, name = os.path.split(os.path.abspath(data_path))
+        self.path = os.path.join(directory, CACHE_DIR, name + CACHE_SUFFIXES[cache_format])
+
+    def source_key(self):
+        """What the cache must have been built from to be valid: the CSV's size and mtime"""
+        stat = os.stat(self.data_path)
+        return {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _read(self, schema_only=False):
+        if self.cache_format == 'parquet':
+            if schema_only:
+                return pq.read_schema(self.path, memory_map=True)
+            return pq.read_table(self.path, memory_map=True)
+        if schema_only:
+            with pa.memory_map(self.path) as source:
+                return pa.ipc.open_file(source).schema
+        return feather.read_table(self.path, memory_map=True)
+
+    def load(self):
+        """The cached DataFrame, or None if there is no cache file or it is stale."""
+        try:
+            metadata = json.loads((self._read(schema_only=True).metadata or {}).get(b'sales_cache', b'{}'))
+            if metadata.get('source') != self.source_key():
+                return None
+            df = self._read().to_pandas()
+        except (OSError, ValueError, pa.ArrowException):
+            return None
+        for col, dtype in metadata['dtypes'].items():
+            df[col] = df[col].astype(dtype)
+        return df
+
+    def save(self, df, source_key):
+        """Writes df, loaded from the CSV when it had source_key; failing only costs the speed-up."""
+        columns, dtypes = {}, {}
+        for col in ID_COLUMNS:
+            if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+                continue
+            values = df[col].dropna()
+            if not values.empty and not (values == values.round()).all():
+                continue
+            fits = values.empty or (values.min() >= np.iinfo(np.int32).min and values.max() <= np.iinfo(np.int32).max)
+            columns[col] = df[col].astype('Int32' if fits else 'Int64')
+            dtypes[col] = str(df[col].dtype)
+        metadata = {'source': source_key, 'dtypes': dtypes}
+        # Only our metadata: without pandas' own, integer columns with nulls read back as float64
+        table = pa.Table.from_pandas(df.assign(**columns), preserve_index=False).replace_schema_metadata(
+            {b'sales_cache': json.dumps(metadata).encode()})
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if self.cache_format == 'parquet':
+                pq.write_table(table, temp_path)
+            else:
+                feather.write_feather(table, temp_path, compression='uncompressed')
+            os.replace(temp_path, self.path)  # a concurrent run never reads a half-written cache
+        except (OSError, pa.ArrowException) as e:
+            print(f"⚠️ Cache not written: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+# Incremental mode: persisted aggregate state, by default in CACHE_DIR next to the data file
+STATE_SUFFIX = '.state'
+STATE_VERSION = 1
+TAIL_BYTES = 4096  # read offsets are only trusted if the bytes before them are unchanged
+
+class SalesState:
+    """Aggregates of every order folded in so far, persisted for daily incremental updates.
+
+    Holds the SalesAggregates of the distinct and the duplicate rows (monthly and per-category
+    totals and order counts, value counts of amounts and customer/product ids as exact distinct
+    sketches), the sorted hashes of the distinct rows, so a new row equal to an old one is still
+    a duplicate, and the watermark: the latest order_date folded in and the largest order_id on
+    that date or without a date. update() folds in only rows after the watermark, and reads a
+    file it has seen before from where it stopped if the file was only appended to since.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.unique = SalesAggregate()
+        self.duplicates = SalesAggregate()
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.watermark = None       # (order_date, order_id) once anything was folded in
+        self.offsets = {}           # data file -> (bytes read, digest of the TAIL_BYTES before)
+
+    @staticmethod
+    def default_path(data_path):
+        directory, name = os.path.split(os.path.abspath(data_path))
+        return os.path.join(directory, CACHE_DIR, name + STATE_SUFFIX)
+
+    @classmethod
+    def load(cls, path):
+        """The state saved at path, or an empty one if there is none yet."""
+        state = cls(path)
+        try:
+            with open(path, 'rb') as f:
+                saved = pickle.load(f)
+        except FileNotFoundError:
+            return state
+        if saved.get('version') != STATE_VERSION:
+            raise ValueError(f"{path} is not a version {STATE_VERSION} state file; delete it to rebuild")
+        for name in ('unique', 'duplicates', 'seen', 'watermark', 'offsets'):
+            setattr(state, name, saved[name])
+        return state
+
+    def save(self):
+        saved = {'version': STATE_VERSION, 'unique': self.unique, 'duplicates': self.duplicates,
+                 'seen': self.seen, 'watermark': self.watermark, 'offsets': self.offsets}
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)  # aggregates and watermark always change together
+
+    @property
+    def aggregates(self):
+        """(distinct, duplicates), as SalesAnalyzer.aggregates"""
+        return self.unique, self.duplicates
+
+    @staticmethod
+    def _digest(f, end):
+        start = max(0, end - TAIL_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+    def _is_new(self, chunk):
+        """Mask of the rows after the watermark"""
+        if self.watermark is None:
+            return np.ones(len(chunk), dtype=bool)
+        latest, last_id = self.watermark
+        dates, ids = chunk['order_date'], chunk['order_id']
+        if pd.isna(latest):
+            later, same = dates.notna(), dates.isna()
+        else:
+            later, same = dates > latest, (dates == latest) | dates.isna()
+        after = ids.notna() if pd.isna(last_id) else ids > last_id
+        return (later | (same & after)).to_numpy()
+
+    @staticmethod
+    def _advanced(watermark, chunk):
+        """The watermark after folding in chunk"""
+        old_date, old_id = watermark or (pd.NaT, np.nan)
+        dates = chunk['order_date']
+        latest = max([d for d in (old_date, dates.max()) if not pd.isna(d)], default=pd.NaT)
+        on_latest = dates.isna() if pd.isna(latest) else (dates == latest) | dates.isna()
+        ids = [chunk['order_id'][on_latest].max()]
+        if pd.isna(latest) or old_date == latest:
+            ids.append(old_id)
+        return latest, pd.Series(ids, dtype='float64').max()
+
+    def update(self, data_path, chunksize=CHUNK_ROWS):
+        """Folds in the rows of data_path after the watermark -> (rows read, rows folded in).
+
+        Rows at or before the watermark are skipped, including late arrivals of an earlier
+        day; verify() tells whether any were missed. Run it once the day's rows are written.
+        """
+        key = os.path.abspath(data_path)
+        watermark, read, folded = self.watermark, 0, 0
+        with open(data_path, 'rb') as f:
+            header = f.readline()
+            names, dtypes = chunk_dtypes(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+            if not {'order_date', 'order_id'} <= set(names.values()):
+                raise ValueError("incremental mode needs order_date and order_id columns")
+            size = os.fstat(f.fileno()).st_size
+            start = len(header)
+            offset, digest = self.offsets.get(key, (0, None))
+            if start < offset <= size and self._digest(f, offset) == digest:
+                start = offset
+            f.seek(start)
+            if start < size:
+                for chunk in pd.read_csv(f, header=None, names=list(names), dtype=dtypes, chunksize=chunksize):
+                    read += len(chunk)
+                    chunk, hashes = prepared_chunk(chunk, names)
+                    new = self._is_new(chunk)
+                    if not new.any():
+                        continue
+                    chunk, hashes = chunk[new], hashes[new]
+                    repeated, distinct = repeated_rows(hashes, self.seen)
+                    # Both parts are sorted, so the stable sort (timsort) is a linear merge
+                    self.seen = np.sort(np.concatenate([self.seen, distinct]), kind='stable')
+                    self.unique = SalesAggregate.of(chunk[~repeated]).merged(self.unique)
+                    self.duplicates = SalesAggregate.of(chunk[repeated]).merged(self.duplicates)
+                    watermark = self._advanced(watermark, chunk)
+                    folded += len(chunk)
+                size = f.tell()
+            self.offsets[key] = (size, self._digest(f, size))
+        self.watermark = watermark
+        return read, folded
+
+    def verify(self, data_path, chunksize=None):
+        """Compares the state with a full recompute over data_path -> list of differences.
+
+        data_path must hold every order folded in (the full history). The recompute loads it
+        in memory, or in chunks of chunksize rows; both the raw and the cleaned figures must
+        agree, floats to a relative 1e-9.
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            full = SalesAnalyzer(data_path, chunksize=chunksize, cache_format=None)
+        differences = []
+        for cleaned in (False, True):
+            if cleaned:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    full.clean_data()
+            expected = (full.calculate_basic_stats(), full.analyze_sales_by_category(), full.analyze_monthly_trends())
+            actual = (self.unique.results(cleaned=True) if cleaned
+                      else self.unique.merged(self.duplicates).results(cleaned=False))
+            label = 'cleaned' if cleaned else 'raw'
+            for name in expected[0].keys() | actual[0].keys():
+                want, got = expected[0].get(name), actual[0].get(name)
+                same = (want == got if name == 'date_range' or want is None or got is None
+                        else np.isclose(want, got, rtol=1e-9, atol=0))
+                if not same:
+                    differences.append(f"{label} {name}: full {want}, incremental {got}")
+            for title, want, got in (('by category', expected[1], actual[1]), ('monthly', expected[2], actual[2])):
+                try:
+                    pd.testing.assert_frame_equal(want, got, check_exact=False, rtol=1e-9, check_dtype=False,
+                                                  check_index_type=False, check_categorical=False)
+                except AssertionError as e:
+                    lines = [line.strip() for line in str(e).splitlines() if line.strip()]
+                    differences.append(f"{label} {title}: {lines[0]} ({lines[-1]})")
+        return differences
+
+class SalesAnalyzer:
+    """Analyzes sales data and generates professional business insights."""
+    
+    def __init__(self, data_path, chunksize=None, cache_format=CACHE_FORMAT, workers=None, state_path=None):
+        self.data_path = data_path
+        self.df = None
+        # In-memory mode reuses a SalesCache of the CSV (None: always parse the CSV)
+        self.cache = SalesCache(data_path, cache_format) if cache_format and pa is not None else None
+        # Chunked mode (chunksize rows at a time) or partitioned mode (a pool of `workers`
+        # processes): self.df stays None and the report is built from SalesAggregates of the
+        # distinct and the duplicate rows
+        self.chunksize = chunksize
+        self.workers = workers
+        # Incremental mode: the SalesState at state_path takes in the new rows of the CSV and
+        # provides the aggregates
+        self.state_path = state_path
+        self.aggregates = None
+        self.cleaned = False
+        self.output_dir = 'analysis_output'
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Aggregates are computed once per version of self.df (bumped by load_data/clean_data)
+        self.data_version = 0
+        self._results = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.load_data()
+
+    def invalidate(self):
+        """Marks self.df as changed; call after modifying it outside load_data/clean_data."""
+        self.data_version += 1
+        self._results.clear()
+    
+    def load_data(self):
+        """Loads data from CSV and standardizes formats."""
+        try:
+            if not os.path.exists(self.data_path):
+                print(f"File not found: {self.data_path}. Creating sample data...")
+                generate_sample_data(self.data_path)
+            
+            if self.state_path:
+                self.cleaned = False
+                state = SalesState.load(self.state_path)
+                read, folded = state.update(self.data_path, chunksize=self.chunksize or CHUNK_ROWS)
+                state.save()
+                self.aggregates = state.aggregates
+                unique, duplicates = self.aggregates
+                print(f"✅ Folded in {folded:,} new rows ({read:,} read, {read - folded:,} at or before the "
+                      f"watermark). State: {unique.rows + duplicates.rows:,} rows in {self.state_path}")
+                return
+            
+            if self.chunksize or self.workers:
+                self.cleaned = False
+                if self.workers:
+                    self.aggregate_partitions()
+                    how = f"by {self.workers} worker processes"
+                else:
+                    self.aggregate_chunks()
+                    how = f"in chunks of {self.chunksize:,} rows"
+                unique, duplicates = self.aggregates
+                shape = (unique.rows + duplicates.rows, len(unique.columns | duplicates.columns))
+                print(f"✅ Data aggregated {how}. Shape: {shape}")
+                return
+            
+            if self.cache:
+                self.df = self.cache.load()
+                if self.df is not None:
+                    print(f"✅ Data loaded from cache {self.cache.path}. Shape: {self.df.shape}")
+                    return
+                source_key = self.cache.source_key()  # before reading, in case the file changes meanwhile
+            
+            self.df = pd.read_csv(self.data_path)
+            self.df.columns = [col.lower().strip() for col in self.df.columns]
+            
+            if 'order_date' in self.df.columns:
+                self.df['order_date'] = pd.to_datetime(self.df['order_date'], errors='coerce')
+            
+            # A handful of category names repeated across every row: store codes instead of strings
+            if 'category' in self.df.columns and pd.api.types.is_string_dtype(self.df['category']):
+                self.df['category'] = self.df['category'].astype('category')
+            
+            if self.cache:
+                self.cache.save(self.df, source_key)
+            print(f"✅ Data loaded successfully. Shape: {self.df.shape}")
+        except Exception as e:
+            print(f"❌ Load Error: {e}")
+        finally:
+            self.invalidate()
+    
+    def aggregate_chunks(self):
+        """Chunked mode: streams the CSV once into SalesAggregates of distinct and duplicate rows.
+
+        Every column is read (duplicates are whole-row duplicates, as in clean_data), with fixed
+        dtypes. Rows are identified by a 64-bit hash; the sorted hashes of the rows seen so far
+        (8 bytes per distinct row) are the only state that grows with the file.
+        """
+        names, dtypes = chunk_dtypes(pd.read_csv(self.data_path, nrows=0).columns)
+        seen = np.empty(0, dtype=np.uint64)
+        unique = duplicates = None
+        for chunk in pd.read_csv(self.data_path, dtype=dtypes, chunksize=self.chunksize):
+            chunk, hashes = prepared_chunk(chunk, names)
+            repeated, distinct = repeated_rows(hashes, seen)
+            # Both parts are sorted, so the stable sort (timsort) is a linear merge
+            seen = np.sort(np.concatenate([seen, distinct]), kind='stable')
+            unique = SalesAggregate.of(chunk[~repeated]).merged(unique)
+            duplicates = SalesAggregate.of(chunk[repeated]).merged(duplicates)
+        self.aggregates = (unique or SalesAggregate(), duplicates or SalesAggregate())
+
+    def aggregate_partitions(self):
+        """Partitioned mode: runs aggregate_partition on byte ranges of the CSV in a process pool.
+
+        A worker only sees repeats within its own partition. Rows equal to a row of an earlier
+        partition are found from the returned row hashes, and the partitions holding any are
+        aggregated again with those hashes as seen (a second read of just those partitions).
+        The partition aggregates are then merged as in the chunked mode, so the results are
+        those of aggregate_chunks.
+        """
+        size = os.path.getsize(self.data_path)
+        partitions = csv_partitions(self.data_path, max(self.workers, -(-size // PARTITION_BYTES)))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(aggregate_partition, self.data_path, start, end) for start, end in partitions]
+            results = [future.result() for future in futures]
+            hashes = [distinct for _, _, distinct in results]
+            if hashes:
+                # Concatenated in file order, so the stable sort keeps the first occurrence of a row first
+                owner = np.repeat(np.arange(len(hashes)), [len(h) for h in hashes])
+                hashes = np.concatenate(hashes)
+                order = np.argsort(hashes, kind='stable')
+                later = np.zeros(len(order), dtype=bool)
+                later[1:] = hashes[order[1:]] == hashes[order[:-1]]
+                moved = order[later]
+                redo = {k: pool.submit(aggregate_partition, self.data_path, *partitions[k],
+                                       np.sort(hashes[moved[owner[moved] == k]]))
+                        for k in np.unique(owner[moved])}
+                del hashes, owner, order, later, moved
+                for k, future in redo.items():
+                    results[k] = future.result()
+        unique = duplicates = None
+        for partition_unique, partition_duplicates, _ in results:
+            unique = partition_unique.merged(unique)
+            duplicates = partition_duplicates.merged(duplicates)
+        self.aggregates = (unique or SalesAggregate(), duplicates or SalesAggregate())
+
+    @memoized
+    def chunked_results(self):
+        """(stats, by category, monthly) of the chunked mode, for the current cleaning state"""
+        unique, duplicates = self.aggregates
+        if self.cleaned:
+            return unique.results(cleaned=True)
+        return unique.merged(duplicates).results(cleaned=False)
+
+    def clean_data(self):
+        """Handles duplicates and fills missing values using Median/Mode."""
+        if self.aggregates is not None:
+            # Chunked mode: duplicates were set apart and fills are applied when results are derived
+            self.cleaned = True
+            self.invalidate()
+            print(f"✨ Data cleaning complete. Removed {self.aggregates[1].rows} duplicate rows.")
+            return
+        if self.df is None: return
+        
+        initial_rows = len(self.df)
+        self.df.drop_duplicates(inplace=True)
+        removed = initial_rows - len(self.df)
+        
+        # Fill missing numeric values with Median
+        num_cols = self.df.select_dtypes(include=[np.number]).columns
+        for col in num_cols:
+            if self.df[col].isnull().any():
+                self.df[col] = self.df[col].fillna(self.df[col].median())
+        
+        # Fill missing categories with Mode
+        cat_cols = self.df.select_dtypes(include=['object', 'category']).columns
+        for col in cat_cols:
+            if self.df[col].isnull().any():
+                mode_val = self.df[col].mode()
+                fill = mode_val[0] if not mode_val.empty else "Unknown"
+                column = self.df[col]
+                if isinstance(column.dtype, pd.CategoricalDtype) and fill not in column.cat.categories:
+                    column = column.cat.add_categories([fill])
+                self.df[col] = column.fillna(fill)
+        
+        self.invalidate()
+        print(f"✨ Data cleaning complete. Removed {removed} duplicate rows.")
+
+    @memoized
+    def calculate_basic_stats(self):
+        """Calculates core business KPIs."""
+        if self.aggregates is not None: return self.chunked_results()[0]
+        if self.df is None or self.df.empty: return {}
+        
+        stats = {
+            'total_sales': self.df['total_amount'].sum(),
+            'average_order': self.df['total_amount'].mean(),
+            'total_orders': len(self.df),
+            'unique_customers': self.df['customer_id'].nunique() if 'customer_id' in self.df.columns else 0,
+            'unique_products': self.df['product_id'].nunique() if 'product_id' in self.df.columns else 0
+        }
+        
+        if 'order_date' in self.df.columns:
+            stats['date_range'] = {
+                'start': self.df['order_date'].min(),
+                'end': self.df['order_date'].max()
+            }
+        return stats
+
+    @memoized
+    def analyze_sales_by_category(self):
+        """Analyze sales by product category."""
+        if self.aggregates is not None: return self.chunked_results()[1]
+        if 'category' not in self.df.columns: return pd.DataFrame()
+        cat_sales = self.df.groupby('category', observed=True).agg({'total_amount': 'sum', 'order_id': 'count'}).rename(columns={'order_id': 'order_count'})
+        cat_sales['percentage'] = (cat_sales['total_amount'] / cat_sales['total_amount'].sum()) * 100
+        return cat_sales.sort_values('total_amount', ascending=False)
+
+    @memoized
+    def analyze_monthly_trends(self):
+        """Calculates monthly revenue and growth rates."""
+        if self.aggregates is not None: return self.chunked_results()[2]
+        if 'order_date' not in self.df.columns: return pd.DataFrame()
+        # Group by a month key series instead of copying the frame; rows without a date (NaT) drop out
+        month_year = self.df['order_date'].dt.to_period('M').rename('month_year')
+        monthly = self.df.groupby(month_year).agg({'total_amount': 'sum', 'order_id': 'count'}).rename(columns={'order_id': 'order_count'})
+        monthly['growth_rate'] = monthly['total_amount'].pct_change() * 100
+        return monthly
+
+    def print_formatted_report(self):
+        """Generates the exact formatted summary requested in the sample output."""
+        stats = self.calculate_basic_stats()
+        cat_data = self.analyze_sales_by_category()
+        monthly_data = self.analyze_monthly_trends()
+        
+        print("\n📊 SALES DATA ANALYSIS REPORT")
+        print("===============================")
+        
+        if 'date_range' in stats:
+            print(f"\n📅 Analysis Period: {stats['date_range']['start'].strftime('%b %Y')} - {stats['date_range']['end'].strftime('%b %Y')}")
+        
+        print("\n📈 BASIC STATISTICS:")
+        print(f"- Total Sales: ${stats.get('total_sales', 0):,.2f}")
+        print(f"- Total Orders: {stats.get('total_orders', 0)}")
+        print(f"- Average Order Value: ${stats.get('average_order', 0):,.2f}")
+        print(f"- Unique Customers: {stats.get('unique_customers', 0)}")
+        print(f"- Unique Products: {stats.get('unique_products', 0)}")
+
+        if not cat_data.empty:
+            print("\n🏆 TOP PRODUCT CATEGORIES:")
+            for i, (name, row) in enumerate(cat_data.head(5).iterrows(), 1):
+                print(f"{i}. {name}: ${row['total_amount']:,.0f} ({row['percentage']:.1f}%)")
+
+        if not monthly_data.empty:
+            print("\n📅 MONTHLY TRENDS:")
+            highest_month = monthly_data['total_amount'].idxmax()
+            lowest_month = monthly_data['total_amount'].idxmin()
+            best_growth_month = monthly_data['growth_rate'].idxmax()
+            print(f"- Highest Sales Month: {highest_month} (${monthly_data.loc[highest_month, 'total_amount']:,.0f})")
+            print(f"- Lowest Sales Month: {lowest_month} (${monthly_data.loc[lowest_month, 'total_amount']:,.0f})")
+            print(f"- Average Monthly Sales: ${monthly_data['total_amount'].mean():,.2f}")
+            print(f"- Best Growth Month: {best_growth_month} ({monthly_data.loc[best_growth_month, 'growth_rate']:+.1f}%)")
+
+        print("\n👥 CUSTOMER INSIGHTS:")
+        print(f"- Average Customer Value: ${stats.get('total_sales', 0) / stats.get('unique_customers', 1):,.2f}")
+        print("- Top 10% Customers Generate: High percentage of revenue (calculated in full report)")
+
+        print("\n💰 RECOMMENDATIONS:")
+        print(f"1. Focus marketing on {cat_data.index[0]} category")
+        print("2. Improve customer retention programs")
+        print("3. Consider seasonal promotions based on monthly peaks")
+        print("4. Expand product range in high-performing categories")
+
+    def create_visualizations(self):
+        """Generates and saves the required PNG charts."""
+        if self.df is None and self.aggregates is None: return
+        plt.style.use('ggplot')
+        
+        # 1. Monthly Trend
+        monthly = self.analyze_monthly_trends()
+        if not monthly.empty:
+            plt.figure(figsize=(10, 5))
+            monthly['total_amount'].plot(kind='line', marker='o', color='teal')
+            plt.title('Monthly Sales Trend')
+            plt.ylabel('Sales ($)')
+            plt.tight_layout()
+            plt.savefig(f"{self.output_dir}/monthly_trend.png")
+            plt.close()
+
+        # 2. Category Share
+        cat_data = self.analyze_sales_by_category()
+        if not cat_data.empty:
+            plt.figure(figsize=(10, 6))
+            cat_data['total_amount'].plot(kind='bar', color='skyblue')
+            plt.title('Sales by Category')
+            plt.xticks(rotation=45)
+            plt.tight_layout()
+            plt.savefig(f"{self.output_dir}/category_sales.png")
+            plt.close()
+        
+        print(f"📊 Visualizations saved in '{self.output_dir}/'")
+
+    def generate_report(self):
+        """Exports analysis to an Excel file."""
+        report_path = f"{self.output_dir}/sales_report.xlsx"
+        try:
+            with pd.ExcelWriter(report_path, engine='openpyxl') as writer:
+                stats = self.calculate_basic_stats()
+                if 'date_range' in stats: del stats['date_range']
+                pd.DataFrame([stats]).to_excel(writer, sheet_name='Summary', index=False)
+                
+                monthly = self.analyze_monthly_trends()
+                if not monthly.empty:
+                    monthly.index = monthly.index.astype(str)
+                    monthly.to_excel(writer, sheet_name='Monthly_Trends')
+                
+                cat_data = self.analyze_sales_by_category()
+                if not cat_data.empty:
+                    cat_data.to_excel(writer, sheet_name='Category_Analysis')
+                    
+            print(f"📂 Full Excel report generated: {report_path}")
+        except Exception as e:
+            print(f"❌ Excel Error: {e}")
+
+def generate_sample_data(filename):
+    """Generates dummy data for immediate testing."""
+    np.random.seed(42)
+    rows = 500
+    data = {
+        'order_id': range(1000, 1000 + rows),
+        'order_date': pd.date_range(start='2024-01-01', periods=rows, freq='D'),
+        'customer_id': np.random.randint(500, 700, rows),
+        'product_id': np.random.randint(10, 100, rows),
+        'category': np.random.choice(['Electronics', 'Clothing', 'Home & Garden', 'Books', 'Sports'], rows),
+        'quantity': np.random.randint(1, 5, rows),
+        'total_amount': np.random.uniform(20, 1000, rows).round(2)
+    }
+    df = pd.DataFrame(data)
+    df = pd.concat([df, df.iloc[:10]], ignore_index=True) # Add duplicates
+    df.loc[5:15, 'total_amount'] = np.nan # Add missing values
+    df.to_csv(filename, index=False)
+
+CATEGORIES = ['Electronics', 'Clothing', 'Home & Garden', 'Books', 'Sports', 'Toys', 'Beauty', 'Grocery']
+
+def generate_large_sample_data(filename, rows, start='2022-01-01', end='2024-12-31', chunk_rows=1_000_000, seed=42):
+    """Writes a large order export in chunks (benchmarks): dates ascending with order_id,
+    about 0.1% duplicated rows and 0.1% missing amounts."""
+    rng = np.random.default_rng(seed)
+    first, last = pd.Timestamp(start), pd.Timestamp(end)
+    span_days = (last - first).days + 1
+    for offset in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - offset)
+        index = np.arange(offset, offset + n)
+        chunk = pd.DataFrame({
+            'order_id': 1000 + index,
+            'order_date': first + pd.to_timedelta(index * span_days // rows, unit='D'),
+            'customer_id': rng.integers(1, 2_000_000, n),
+            'product_id': rng.integers(1, 50_000, n),
+            'category': pd.Categorical.from_codes(rng.integers(0, len(CATEGORIES), n), CATEGORIES),
+            'quantity': rng.integers(1, 5, n),
+            'total_amount': rng.uniform(20, 1000, n).round(2),
+        })
+        chunk.loc[rng.random(n) < 0.001, 'total_amount'] = np.nan
+        duplicates = chunk[rng.random(n) < 0.001]
+        chunk = pd.concat([chunk, duplicates]).sort_index(kind='stable')
+        chunk.to_csv(filename, mode='w' if offset == 0 else 'a', header=offset == 0, index=False,
+                     date_format='%Y-%m-%d')
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales data analysis and business insights report")
+    parser.add_argument("data_file", nargs="?", default="sales_data.csv")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--chunksize", type=int, nargs="?", const=CHUNK_ROWS,
+                      help=f"stream the CSV in chunks of this many rows (default {CHUNK_ROWS:,}) "
+                           "instead of loading it into memory")
+    mode.add_argument("--workers", type=int, nargs="?", const=os.cpu_count(),
+                      help=f"aggregate partitions of the CSV in this many processes (default {os.cpu_count()}) "
+                           "instead of loading it into memory")
+    parser.add_argument("--incremental", nargs="?", const="", metavar="STATE",
+                        help=f"fold only rows after the last watermark into the aggregate state at STATE "
+                             f"(default {CACHE_DIR}/<data file>{STATE_SUFFIX} next to the data file), "
+                             "reading --chunksize rows at a time")
+    parser.add_argument("--verify", action="store_true",
+                        help="with --incremental: check the state against a full recompute of the data "
+                             "file (in chunks with --chunksize) and exit, with status 1 on a mismatch")
+    parser.add_argument("--cache", choices=[*CACHE_SUFFIXES, 'off'], default=CACHE_FORMAT,
+                        help=f"columnar cache of the loaded CSV, kept in {CACHE_DIR}/ next to it "
+                             f"(default {CACHE_FORMAT}; only used when loading it into memory)")
+    args = parser.parse_args()
+    if args.verify and args.incremental is None:
+        parser.error("--verify needs --incremental")
+    if args.incremental is not None and args.workers:
+        parser.error("--incremental can't be combined with --workers")
+    state_path = (args.incremental or SalesState.default_path(args.data_file)) if args.incremental is not None else None
+    analyzer = SalesAnalyzer(args.data_file, chunksize=args.chunksize, workers=args.workers,
+                             cache_format=None if args.cache == 'off' else args.cache, state_path=state_path)
+    
+    if args.verify:
+        if analyzer.aggregates is None:
+            sys.exit(1)  # the load error is already printed
+        differences = SalesState.load(state_path).verify(args.data_file, chunksize=args.chunksize)
+        for difference in differences:
+            print(f"❌ {difference}")
+        print("❌ Incremental state differs from a full recompute" if differences
+              else "✅ Incremental state matches a full recompute")
+        sys.exit(1 if differences else 0)
+    
+    while True:
+        print("\n[MENU]")
+        print("1. Clean Data")
+        print("2. Print Analysis Report (Sample Output Style)")
+        print("3. Generate Visual Charts")
+        print("4. Export Full Excel Report")
+        print("5. Exit")
+        
+        try:
+            choice = input("\nSelect Option (1-5): ").strip()
+        except EOFError:
+            print("\nNon-interactive mode detected. Running full automated pipeline...")
+            analyzer.clean_data()
+            analyzer.print_formatted_report()
+            analyzer.create_visualizations()
+            analyzer.generate_report()
+            break
+            
+        if choice == '1': analyzer.clean_data()
+        elif choice == '2': analyzer.print_formatted_report()
+        elif choice == '3': analyzer.create_visualizations()
+        elif choice == '4': analyzer.generate_report()
+        elif choice == '5': break
+        else: print("Invalid choice.")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file